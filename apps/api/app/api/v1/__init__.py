@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1 import auth, resumes
+from app.api.v1 import ai, auth, files, jobs, resumes
 
 router = APIRouter()
 
@@ -10,6 +10,15 @@ router.include_router(auth.router, prefix="/auth", tags=["auth"])
 # Include resume routes
 router.include_router(resumes.router, prefix="/resumes", tags=["resumes"])
 
+# Include background job routes
+router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+
+# Include signed upload routes (no auth; the URL carries a signature)
+router.include_router(files.router, prefix="/files", tags=["files"])
+
+# Include AI service routes
+router.include_router(ai.router, prefix="/ai", tags=["ai"])
+
 
 @router.get("/")
 async def root() -> dict[str, str]:
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends
+
+from app.core.dependencies import get_current_user
+from app.models.user import User
+from app.services.ai_cache import ai_cache, template_cache
+from app.services.ai_service import ai_service
+from app.services.ats_scorer import score_resume
+from app.services.json_repair import parse_stats
+
+router = APIRouter()
+
+
+@router.get("/cache/stats")
+def get_cache_stats(
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """Get hit/miss counters and size of the AI result cache"""
+    return ai_cache.stats()
+
+
+@router.get("/templates/cache/stats")
+def get_template_cache_stats(
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """Get hit/miss counters and size of the filled-template cache"""
+    return template_cache.stats()
+
+
+@router.get("/templates/stats")
+def get_template_fill_stats(
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """Get calls, latency, token usage and prompt size of template fills"""
+    return ai_service.fill_stats()
+
+
+@router.get("/parse/stats")
+def get_parse_stats(
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """Get how many AI responses parsed cleanly, needed repair or failed"""
+    return parse_stats.stats()
+
+
+@router.get("/resilience/stats")
+def get_resilience_stats(
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """Get circuit state, p95 latency, retries and hedges per model"""
+    return ai_service.resilience.stats()
+
+
+@router.get("/scheduler/stats")
+def get_scheduler_stats(
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """Get active and queued calls and queue wait time per model"""
+    return ai_service.scheduler.stats()
+
+
+@router.get("/paths/stats")
+def get_path_stats(
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """Get calls, latency and token usage of the text-layer and VLM paths"""
+    return ai_service.path_stats()
+
+
+@router.post("/ats/score")
+def score_extracted_data(
+    extracted_data: dict,
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """Score extracted resume data with the local ATS rules (no AI call)"""
+    return score_resume(extracted_data)
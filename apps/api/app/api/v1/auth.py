@@ -11,7 +11,7 @@ router = APIRouter()
 
 
 @router.post("/signup", response_model=Token, status_code=status.HTTP_201_CREATED)
-async def signup(
+def signup(
     user_data: UserSignup,
     db: Session = Depends(get_db),
 ) -> dict[str, str]:
@@ -39,7 +39,7 @@ async def signup(
 
 
 @router.post("/login", response_model=Token)
-async def login(
+def login(
     login_data: UserLogin,
     db: Session = Depends(get_db),
 ) -> dict[str, str]:
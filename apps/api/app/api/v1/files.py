@@ -0,0 +1,53 @@
+import os
+import time
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+
+from app.core.file_serving import media_type_for, upload_response
+from app.core.http_cache import etag_matches, make_etag
+from app.core.security import verify_upload_signature
+from app.services.resume_service import ResumeService
+
+router = APIRouter()
+
+
+@router.get("/{name}")
+def get_signed_file(
+    name: str,
+    request: Request,
+    expires: int = Query(...),
+    signature: str = Query(...),
+):
+    """
+    Serve a stored upload through a signed URL from GET
+    /resumes/{id}/download-url
+
+    No Authorization header or database access: the signature alone grants
+    access until it expires. Supports Range and If-None-Match like the
+    authenticated download.
+    """
+    if Path(name).name != name or not verify_upload_signature(name, expires, signature):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or expired link",
+        )
+
+    path = ResumeService.UPLOAD_DIR / name
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found",
+        ) from None
+
+    etag = make_etag("file", str(path), stat_result.st_size, stat_result.st_mtime_ns)
+    max_age = max(0, expires - int(time.time()))
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={max_age}"}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return upload_response(
+        str(path), stat_result, media_type_for(path.suffix.lstrip(".")), headers
+    )
@@ -1,35 +1,95 @@
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from fastapi.responses import FileResponse
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Literal
+from urllib.parse import urlencode
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
+from app.core.file_serving import media_type_for, upload_response
+from app.core.http_cache import (
+    IMMUTABLE,
+    REVALIDATE,
+    conditional,
+    etag_matches,
+    make_etag,
+)
+from app.core.security import sign_upload
+from app.core.sse import event_stream
+from app.core.uploads import FILE_UPLOAD_BODY, UploadTooLargeError, receive_upload
 from app.models.user import User
 from app.schemas.resume import (
     DashboardStats,
+    ExtractionVersionResponse,
     ResumeCreate,
+    ResumeFieldsListResponse,
     ResumeListResponse,
     ResumeResponse,
     ResumeUpdate,
 )
+from app.services.extraction_cache import extraction_cache
 from app.services.resume_service import ResumeService
 
 router = APIRouter()
 
 
-@router.get("", response_model=ResumeListResponse)
-async def list_resumes(
+@router.get("", response_model=ResumeListResponse | ResumeFieldsListResponse)
+def list_resumes(
+    limit: int = Query(settings.RESUME_PAGE_SIZE, ge=1, le=settings.RESUME_PAGE_MAX),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    fields: str | None = Query(
+        None, description="Comma-separated resume fields to return, e.g. id,title"
+    ),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get all resumes for the current user"""
+    """
+    Get a page of the current user's resumes, most recently updated first
+
+    Follow next_cursor for further pages. With fields, each resume holds
+    only those fields (and id), and only their columns are loaded.
+    """
     service = ResumeService(db)
-    resumes = service.get_user_resumes(current_user.id)
-    return ResumeListResponse(resumes=resumes, total=len(resumes))
+    field_list = None
+    if fields is not None:
+        field_list = [f.strip() for f in fields.split(",") if f.strip()]
+        if "id" not in field_list:
+            field_list.insert(0, "id")
+    try:
+        resumes, total, next_cursor = service.list_user_resumes(
+            current_user.id, limit, cursor, field_list
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+
+    if field_list is None:
+        return ResumeListResponse(resumes=resumes, total=total, next_cursor=next_cursor)
+    return ResumeFieldsListResponse(
+        resumes=[{f: getattr(resume, f) for f in field_list} for resume in resumes],
+        total=total,
+        next_cursor=next_cursor,
+    )
 
 
 @router.get("/stats", response_model=DashboardStats)
-async def get_stats(
+def get_stats(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -38,8 +98,16 @@ async def get_stats(
     return service.get_dashboard_stats(current_user.id)
 
 
+@router.get("/extracted/cache/stats")
+def get_extraction_cache_stats(
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """Get hit/miss counters and size of the in-memory extracted data cache"""
+    return extraction_cache.stats()
+
+
 @router.post("", response_model=ResumeResponse, status_code=status.HTTP_201_CREATED)
-async def create_resume(
+def create_resume(
     resume_data: ResumeCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -51,12 +119,14 @@ async def create_resume(
 
 
 @router.get("/{resume_id}", response_model=ResumeResponse)
-async def get_resume(
+def get_resume(
     resume_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get a specific resume by ID"""
+    """Get a specific resume by ID (conditional on If-None-Match)"""
     service = ResumeService(db)
     resume = service.get_resume_by_id(resume_id, current_user.id)
     if not resume:
@@ -64,11 +134,13 @@ async def get_resume(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Resume not found",
         )
-    return resume
+    body = ResumeResponse.model_validate(resume)
+    etag = make_etag("resume", body.model_dump_json())
+    return conditional(request, response, etag) or body
 
 
 @router.patch("/{resume_id}", response_model=ResumeResponse)
-async def update_resume(
+def update_resume(
     resume_id: int,
     update_data: ResumeUpdate,
     current_user: User = Depends(get_current_user),
@@ -86,7 +158,7 @@ async def update_resume(
 
 
 @router.delete("/{resume_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_resume(
+def delete_resume(
     resume_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -101,59 +173,94 @@ async def delete_resume(
         )
 
 
-@router.post("/{resume_id}/upload", response_model=ResumeResponse)
+@router.post(
+    "/{resume_id}/upload",
+    response_model=ResumeResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    openapi_extra=FILE_UPLOAD_BODY,
+)
 async def upload_resume_file(
     resume_id: int,
-    file: UploadFile = File(...),
+    request: Request,
+    response: Response,
+    analysis_mode: Literal["separate", "combined"] | None = Query(
+        None, description="Run AI tasks as separate calls or one combined call"
+    ),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Upload a file for a resume"""
+    """
+    Upload a file for a resume (multipart field "file")
+
+    The body is streamed to disk as it arrives and rejected with 413 once it
+    passes MAX_UPLOAD_BYTES. The file is stored immediately and AI analysis
+    is queued as a background job; poll GET /jobs/{analysis_job_id} for
+    progress.
+    """
+    # Database and file work is blocking; keep it off the event loop
     service = ResumeService(db)
-    resume = service.get_resume_by_id(resume_id, current_user.id)
+    resume = await run_in_threadpool(
+        service.get_resume_by_id, resume_id, current_user.id
+    )
     if not resume:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Resume not found",
         )
 
-    # Validate file type
-    if file.content_type not in service.ALLOWED_TYPES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid file type. Allowed: {list(service.ALLOWED_TYPES.values())}",
+    try:
+        upload = await receive_upload(
+            request,
+            service.UPLOAD_DIR,
+            settings.MAX_UPLOAD_BYTES,
+            service.ALLOWED_TYPES,
         )
-
-    # Read file content
-    content = await file.read()
-
-    # Check file size (max 10MB)
-    max_size = 10 * 1024 * 1024
-    if len(content) > max_size:
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=str(e),
+        ) from None
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File too large. Maximum size is 10MB",
-        )
+            detail=str(e),
+        ) from None
 
     try:
-        resume = service.upload_file(
-            resume, content, file.filename or "resume", file.content_type or ""
+        resume = await run_in_threadpool(
+            service.upload_file, resume, upload, analyze=False
         )
-        return resume
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e),
         )
+    finally:
+        upload.discard()
+
+    job = await run_in_threadpool(service.queue_analysis, resume, analysis_mode)
+    response.headers["Location"] = f"{settings.API_V1_STR}/jobs/{job.id}"
+    return resume
 
 
 @router.get("/{resume_id}/download")
-async def download_resume_file(
+def download_resume_file(
     resume_id: int,
+    request: Request,
+    v: str | None = Query(
+        None, description="file_version of the resume; makes the response immutable"
+    ),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Download the file for a resume"""
+    """
+    Download the file for a resume
+
+    Responses carry an ETag and answer If-None-Match with 304, and Range
+    requests with 206 partial content (PDF viewers fetch pages this way).
+    With ?v= set to the current file_version the URL names one stored
+    upload, so it may be cached for good.
+    """
     service = ResumeService(db)
     resume = service.get_resume_by_id(resume_id, current_user.id)
     if not resume:
@@ -168,22 +275,78 @@ async def download_resume_file(
             detail="No file uploaded for this resume",
         )
 
-    return FileResponse(
-        path=resume.file_path,
+    try:
+        stat_result = os.stat(resume.file_path)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found",
+        ) from None
+
+    etag = make_etag(
+        "file", resume.file_path, stat_result.st_size, stat_result.st_mtime_ns
+    )
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE if v and v == resume.file_version else REVALIDATE,
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return upload_response(
+        resume.file_path,
+        stat_result,
+        media_type_for(resume.file_type),
+        headers,
         filename=f"{resume.title}.{resume.file_type}",
-        media_type=f"application/{resume.file_type}"
-        if resume.file_type == "pdf"
-        else f"image/{resume.file_type}",
     )
 
 
+@router.get("/{resume_id}/download-url")
+def get_signed_download_url(
+    resume_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> dict:
+    """
+    Get a short-lived signed URL for a resume's file
+
+    The URL needs no Authorization header and is served without a database
+    lookup, so it can be handed to PDF viewers, <img> tags or a static file
+    handler; it stops working after SIGNED_URL_EXPIRE_SECONDS.
+    """
+    service = ResumeService(db)
+    resume = service.get_resume_by_id(resume_id, current_user.id)
+    if not resume:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found",
+        )
+
+    if not resume.file_path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No file uploaded for this resume",
+        )
+
+    name = Path(resume.file_path).name
+    expires = int(time.time()) + settings.SIGNED_URL_EXPIRE_SECONDS
+    query = urlencode({"expires": expires, "signature": sign_upload(name, expires)})
+    return {
+        "url": f"{settings.API_V1_STR}/files/{name}?{query}",
+        "expires_at": datetime.utcfromtimestamp(expires).isoformat() + "Z",
+    }
+
+
 @router.get("/{resume_id}/ats")
-async def get_ats_analysis(
+def get_ats_analysis(
     resume_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get detailed ATS analysis for a resume"""
+    """Get detailed ATS analysis for a resume (conditional on If-None-Match)"""
     service = ResumeService(db)
     resume = service.get_resume_by_id(resume_id, current_user.id)
     if not resume:
@@ -192,12 +355,20 @@ async def get_ats_analysis(
             detail="Resume not found",
         )
 
+    # A stored analysis is versioned by its own content
+    if resume.content:
+        not_modified = conditional(request, response, make_etag("ats", resume.content))
+        if not_modified:
+            return not_modified
     return service.get_ats_analysis(resume)
 
 
 @router.post("/{resume_id}/ats/reanalyze", response_model=ResumeResponse)
-async def reanalyze_ats(
+def reanalyze_ats(
     resume_id: int,
+    mode: Literal["llm", "local", "hybrid"] | None = Query(
+        None, description="Score with the VLM, local rules, or rules plus the VLM"
+    ),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -216,11 +387,11 @@ async def reanalyze_ats(
             detail="No file uploaded for this resume",
         )
 
-    return service.reanalyze_ats(resume)
+    return service.reanalyze_ats(resume, mode)
 
 
 @router.get("/{resume_id}/suggestions")
-async def get_ai_suggestions(
+def get_ai_suggestions(
     resume_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -237,13 +408,33 @@ async def get_ai_suggestions(
     return service.get_ai_suggestions(resume)
 
 
+@router.get("/{resume_id}/suggestions/stream")
+def stream_ai_suggestions(
+    resume_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Stream AI suggestions as Server-Sent Events (delta, partial, result)"""
+    service = ResumeService(db)
+    resume = service.get_resume_by_id(resume_id, current_user.id)
+    if not resume:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found",
+        )
+
+    return event_stream(service.stream_ai_suggestions(resume))
+
+
 @router.get("/{resume_id}/extracted")
-async def get_extracted_data(
+def get_extracted_data(
     resume_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get extracted structured data from a resume"""
+    """Get extracted structured data from a resume (conditional on If-None-Match)"""
     service = ResumeService(db)
     resume = service.get_resume_by_id(resume_id, current_user.id)
     if not resume:
@@ -252,11 +443,65 @@ async def get_extracted_data(
             detail="Resume not found",
         )
 
+    # Stored extractions never change; a new one gets a new id. The resume's
+    # created_at guards against SQLite reusing ids after a deletion.
+    extraction_id = service.latest_extraction_id(resume)
+    if extraction_id is not None:
+        etag = make_etag("extracted", resume.id, resume.created_at, extraction_id)
+        not_modified = conditional(request, response, etag)
+        if not_modified:
+            return not_modified
     return service.get_extracted_data(resume)
 
 
+@router.get(
+    "/{resume_id}/extracted/versions", response_model=list[ExtractionVersionResponse]
+)
+def list_extraction_versions(
+    resume_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """List stored versions of a resume's extracted data, newest first"""
+    service = ResumeService(db)
+    resume = service.get_resume_by_id(resume_id, current_user.id)
+    if not resume:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found",
+        )
+
+    return service.get_extraction_history(resume)
+
+
+@router.get("/{resume_id}/extracted/versions/{extraction_id}")
+def get_extraction_version(
+    resume_id: int,
+    extraction_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get one stored version of a resume's extracted data"""
+    service = ResumeService(db)
+    resume = service.get_resume_by_id(resume_id, current_user.id)
+    if not resume:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found",
+        )
+
+    extraction = service.get_extraction(resume, extraction_id)
+    if not extraction:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Extraction not found",
+        )
+
+    return extraction.data
+
+
 @router.post("/{resume_id}/extracted/reextract")
-async def reextract_data(
+def reextract_data(
     resume_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -279,8 +524,32 @@ async def reextract_data(
     return service.reextract_data(resume)
 
 
+@router.post("/{resume_id}/extracted/reextract/stream")
+def stream_reextract_data(
+    resume_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Stream a forced re-extraction as Server-Sent Events (delta, partial, result)"""
+    service = ResumeService(db)
+    resume = service.get_resume_by_id(resume_id, current_user.id)
+    if not resume:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found",
+        )
+
+    if not resume.file_path:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No file uploaded for this resume",
+        )
+
+    return event_stream(service.stream_reextract_data(resume))
+
+
 @router.post("/{resume_id}/fill-template")
-async def fill_template(
+def fill_template(
     resume_id: int,
     template_schema: dict,
     current_user: User = Depends(get_current_user),
@@ -303,3 +572,22 @@ async def fill_template(
         )
 
     return result
+
+
+@router.post("/{resume_id}/fill-template/stream")
+def stream_fill_template(
+    resume_id: int,
+    template_schema: dict,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Stream a template fill as Server-Sent Events (delta, partial, result)"""
+    service = ResumeService(db)
+    resume = service.get_resume_by_id(resume_id, current_user.id)
+    if not resume:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found",
+        )
+
+    return event_stream(service.stream_fill_template(resume, template_schema))
@@ -6,6 +6,9 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     CORS_ORIGINS: list[str] = ["http://localhost:3000"]
 
+    # Worker threads for blocking route work (DB, bcrypt, file I/O, AI calls)
+    THREADPOOL_WORKERS: int = 40
+
     # Database
     SQLITE_DB_PATH: str = "app.db"
 
@@ -26,6 +29,104 @@ class Settings(BaseSettings):
     NEBIUS_VLM_MODEL: str = "google/gemma-3-27b-it-fast"
     # LLM model for template filling (text generation)
     NEBIUS_LLM_MODEL: str = "moonshotai/Kimi-K2-Instruct"
+    # Connection pool shared by Nebius calls
+    AI_HTTP_MAX_CONNECTIONS: int = 20
+    AI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    AI_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    # Retries with exponential backoff and jitter on 408/409/429/5xx and
+    # connection errors, within each task's deadline
+    AI_MAX_RETRIES: int = 3
+    AI_BACKOFF_BASE_SECONDS: float = 0.5
+    AI_BACKOFF_MAX_SECONDS: float = 10.0
+    AI_DEADLINE_SECONDS: float = 120.0  # For calls without a task deadline
+    # Consecutive failures that open a model's circuit, and how long it stays open
+    AI_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    AI_CIRCUIT_RESET_SECONDS: float = 30.0
+    # Send a duplicate request when a call outlasts the model's p95 latency
+    AI_HEDGE_ENABLED: bool = False
+    AI_HEDGE_MIN_SAMPLES: int = 20  # Latency samples needed before hedging
+    # Per-model governor: requests per minute (token bucket, 0 = no limit)
+    # and calls in flight; interactive calls are admitted before background ones
+    AI_VLM_RATE_PER_MINUTE: int = 120
+    AI_VLM_MAX_CONCURRENCY: int = 8
+    AI_LLM_RATE_PER_MINUTE: int = 120
+    AI_LLM_MAX_CONCURRENCY: int = 8
+
+    # Page image encoding for VLM requests
+    VLM_IMAGE_DPI: int = 150  # PDF rasterization DPI
+    VLM_IMAGE_MAX_EDGE: int = 2000  # Longer side in pixels (0 = no cap)
+    VLM_IMAGE_FORMAT: str = "WEBP"  # PNG, JPEG or WEBP
+    VLM_IMAGE_QUALITY: int = 80  # JPEG/WebP quality
+    VLM_IMAGE_GRAYSCALE: bool = False
+    VLM_IMAGE_COLORS: int = 0  # Palette quantization (0 = off)
+    VLM_IMAGE_BYTE_BUDGET: int = 4 * 1024 * 1024  # Base64 bytes per request (0 = off)
+
+    # PDF rasterization: poppler processes per PDF and page limits. Tasks
+    # only send their first N pages (0 = every rendered page)
+    PDF_RENDER_THREADS: int = 4
+    PDF_MAX_PAGES: int = 10  # Pages rendered per PDF (0 = all)
+    EXTRACTION_MAX_PAGES: int = 0
+    ATS_MAX_PAGES: int = 3
+    SUGGESTIONS_MAX_PAGES: int = 0
+
+    # Text-layer fast path: PDFs with embedded text are analyzed by the LLM
+    # from pdftotext output instead of sending page images to the VLM
+    TEXT_LAYER_ENABLED: bool = True
+    TEXT_LAYER_MIN_CHARS: int = 200  # Non-whitespace characters required
+    TEXT_LAYER_TIMEOUT_SECONDS: float = 15.0
+
+    # AI result cache (keyed by file content, model and prompt)
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_DIR: str = "uploads/cache/ai"
+    AI_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # 256 MB
+    AI_CACHE_MAX_AGE_DAYS: int = 30
+    # Filled templates (same size and age limits)
+    TEMPLATE_CACHE_DIR: str = "uploads/cache/templates"
+    # Send template fill only the referenced, non-empty extracted sections as
+    # compact JSON (False sends the full pretty-printed data, for comparison)
+    TEMPLATE_FILL_PRUNE: bool = True
+
+    # Extracted data versions kept per resume (the latest one is always kept)
+    EXTRACTION_HISTORY_LIMIT: int = 10
+    # In-memory LRU of the latest extracted data per resume
+    EXTRACTION_CACHE_ENABLED: bool = True
+    EXTRACTION_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 64 MB
+
+    # Serve dashboard stats from the user_stats row maintained on every resume
+    # change (False computes them with an aggregate query on each request)
+    DASHBOARD_STATS_MATERIALIZED: bool = True
+
+    # Largest accepted upload; bodies are streamed to disk and cut off past it
+    MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    # Lifetime of signed upload URLs (GET /resumes/{id}/download-url)
+    SIGNED_URL_EXPIRE_SECONDS: int = 300
+    # Internal nginx location aliasing the upload directory, e.g.
+    # "/protected-uploads/". When set, downloads answer with X-Accel-Redirect
+    # and nginx sends the file (sendfile, Range) instead of Python
+    UPLOAD_ACCEL_REDIRECT_PREFIX: str = ""
+
+    # GET /resumes page size (default and maximum ?limit=)
+    RESUME_PAGE_SIZE: int = 50
+    RESUME_PAGE_MAX: int = 200
+
+    # Upload analysis: "separate" (one VLM call per task) or "combined"
+    # (extraction, ATS and suggestions in a single call)
+    AI_ANALYSIS_MODE: str = "separate"
+
+    # ATS scoring: "llm" (VLM scores every category), "local" (rule-based
+    # from extracted data, no AI call) or "hybrid" (rules plus the VLM for
+    # formatting and feedback)
+    ATS_SCORING_MODE: str = "llm"
+
+    # Background job queue for upload analysis
+    JOB_WORKERS: int = 2
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: float = 10.0
+    # A running job whose row has gone this long without progress or a
+    # heartbeat from its worker is assumed orphaned by a dead process and
+    # re-queued; live workers renew it every third of this
+    JOB_LEASE_SECONDS: float = 300.0
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,57 @@
+import os
+from pathlib import Path
+from urllib.parse import quote
+
+from fastapi import Response
+from fastapi.responses import FileResponse
+
+from app.core.config import settings
+
+
+def media_type_for(file_type: str | None) -> str:
+    """Content type of a stored upload from its pdf/png/jpg extension"""
+    if file_type == "pdf":
+        return "application/pdf"
+    return f"image/{file_type}"
+
+
+def content_disposition(filename: str) -> str:
+    """Attachment header for a file name, RFC 5987 encoded if not plain ASCII"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def upload_response(
+    path: str,
+    stat_result: os.stat_result,
+    media_type: str,
+    headers: dict[str, str],
+    filename: str | None = None,
+) -> Response:
+    """
+    Serve a stored upload
+
+    With UPLOAD_ACCEL_REDIRECT_PREFIX set, the body is left to nginx
+    (X-Accel-Redirect), which sends it with sendfile and handles Range itself.
+    Otherwise FileResponse answers Range and If-Range with 206 partial
+    content, and hands the path to servers that offer the ASGI pathsend
+    extension instead of streaming it through Python in chunks.
+    """
+    if settings.UPLOAD_ACCEL_REDIRECT_PREFIX:
+        accel_headers = {
+            **headers,
+            "X-Accel-Redirect": settings.UPLOAD_ACCEL_REDIRECT_PREFIX + Path(path).name,
+        }
+        if filename:
+            accel_headers["Content-Disposition"] = content_disposition(filename)
+        return Response(media_type=media_type, headers=accel_headers)
+
+    return FileResponse(
+        path=path,
+        filename=filename,
+        media_type=media_type,
+        headers=headers,
+        stat_result=stat_result,
+    )
@@ -0,0 +1,45 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+# Per-user data: cacheable by the browser only, revalidated on every use
+REVALIDATE = "private, no-cache"
+# A URL whose content can never change (e.g. a versioned stored upload)
+IMMUTABLE = "private, max-age=31536000, immutable"
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag over the given version parts (ids, timestamps, hashes)"""
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match names this ETag (weak comparison, as for GET)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = (tag.strip().removeprefix("W/") for tag in header.split(","))
+    return etag in tags
+
+
+def conditional(
+    request: Request,
+    response: Response,
+    etag: str,
+    cache_control: str = REVALIDATE,
+) -> Response | None:
+    """
+    Handle a conditional GET
+
+    Returns a 304 response when the client's copy is current; otherwise sets
+    ETag and Cache-Control on the route's response and returns None, and the
+    route builds its body as usual.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
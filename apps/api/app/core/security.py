@@ -1,5 +1,8 @@
-from datetime import datetime, timedelta
+import hashlib
+import hmac
 import logging
+import time
+from datetime import datetime, timedelta
 from typing import Any
 
 from jose import ExpiredSignatureError, JWTError, jwt
@@ -72,3 +75,25 @@ def decode_access_token(token: str) -> dict[str, Any] | None:
     except JWTError as e:
         logger.warning(f"JWT decode error: {e}")
         return None
+
+
+def sign_upload(name: str, expires: int) -> str:
+    """
+    Signature authorizing access to a stored upload until a Unix time
+
+    Args:
+        name: File name within the upload directory
+        expires: Unix time after which the signature is rejected
+
+    Returns:
+        Hex HMAC-SHA256 keyed with SECRET_KEY
+    """
+    message = f"upload|{name}|{expires}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def verify_upload_signature(name: str, expires: int, signature: str) -> bool:
+    """Check a signed upload URL; expired ones are rejected"""
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(sign_upload(name, expires), signature)
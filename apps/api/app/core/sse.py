@@ -0,0 +1,32 @@
+import json
+from collections.abc import Iterable, Iterator
+
+from fastapi.responses import StreamingResponse
+
+
+def format_event(event: str, data: dict) -> str:
+    """Serialize one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def event_stream(events: Iterable[tuple[str, dict]]) -> StreamingResponse:
+    """
+    Stream (event, data) pairs as text/event-stream
+
+    Sync iterables are consumed in the threadpool by Starlette, so blocking
+    AI calls inside them do not stall the event loop.
+    """
+
+    def body() -> Iterator[str]:
+        for event, data in events:
+            yield format_event(event, data)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop reverse proxies (nginx) from buffering the stream
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -0,0 +1,180 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# Room for multipart boundaries and part headers on top of the file itself
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+# OpenAPI body for routes that stream a "file" field with receive_upload,
+# since they take the raw request instead of an UploadFile parameter
+FILE_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the size limit"""
+
+
+@dataclass
+class ReceivedUpload:
+    """An upload written to a temporary file, ready to be moved into place"""
+
+    path: Path
+    filename: str
+    content_type: str
+    size: int
+    sha256: str
+
+    def discard(self) -> None:
+        """Remove the temporary file, if it has not been moved"""
+        self.path.unlink(missing_ok=True)
+
+
+class _FileSink:
+    """Writes a part to a temporary file while counting and hashing it"""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        fd, name = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+        self.file = os.fdopen(fd, "wb")
+        self.path = Path(name)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.digest = hashlib.sha256()
+
+    def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise UploadTooLargeError(_too_large_message(self.max_bytes))
+        self.digest.update(data)
+        self.file.write(data)
+
+
+def _too_large_message(max_bytes: int) -> str:
+    return f"File too large. Maximum size is {max_bytes // (1024 * 1024)}MB"
+
+
+async def receive_upload(
+    request: Request,
+    directory: Path,
+    max_bytes: int,
+    allowed_types: dict[str, str],
+    field: str = "file",
+) -> ReceivedUpload:
+    """
+    Stream a multipart file field to a temporary file in directory
+
+    The body is parsed as it arrives, so memory use is one network chunk and
+    oversized uploads are rejected (UploadTooLargeError) as soon as they pass
+    max_bytes, or up front from Content-Length. The file's type is checked
+    from its part headers before any of it is written. The temporary file is
+    in the destination directory so it can be renamed into place atomically.
+
+    Raises ValueError for a malformed form, a missing field or a type not in
+    allowed_types.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type"))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise ValueError("Expected a multipart/form-data upload")
+
+    max_body = max_bytes + FORM_OVERHEAD_BYTES
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_body:
+        raise UploadTooLargeError(_too_large_message(max_bytes))
+
+    headers: dict[bytes, bytes] = {}
+    header_field = bytearray()
+    header_value = bytearray()
+    sink: _FileSink | None = None
+    current: _FileSink | None = None
+    filename = ""
+    file_type = ""
+
+    def on_part_begin() -> None:
+        nonlocal current
+        headers.clear()
+        current = None
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header_value.extend(data[start:end])
+
+    def on_header_end() -> None:
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished() -> None:
+        nonlocal sink, current, filename, file_type
+        _, options = parse_options_header(headers.get(b"content-disposition"))
+        if sink or options.get(b"name") != field.encode() or b"filename" not in options:
+            return  # Other fields and repeated files are skipped
+        file_type = headers.get(b"content-type", b"").decode("latin-1")
+        if file_type not in allowed_types:
+            raise ValueError(
+                f"Invalid file type. Allowed: {list(allowed_types.values())}"
+            )
+        filename = options[b"filename"].decode("utf-8", "replace")
+        sink = current = _FileSink(directory, max_bytes)
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        if current:
+            current.write(data[start:end])
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+        },
+    )
+
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_body:
+                raise UploadTooLargeError(_too_large_message(max_bytes))
+            # Parsing, hashing and writing are blocking; keep them off the loop
+            await run_in_threadpool(parser.write, chunk)
+        parser.finalize()
+    except BaseException:
+        if sink:
+            sink.file.close()
+            sink.path.unlink(missing_ok=True)
+        raise
+
+    if not sink:
+        raise ValueError("No file uploaded")
+    sink.file.close()
+    return ReceivedUpload(
+        path=sink.path,
+        filename=filename,
+        content_type=file_type,
+        size=sink.size,
+        sha256=sink.digest.hexdigest(),
+    )
@@ -1,10 +1,13 @@
 import logging
 
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1 import router as api_v1_router
 from app.core.config import settings
+from app.services.ai_service import ai_service
+from app.services.job_queue import job_queue
 
 # Configure logging
 logging.basicConfig(
@@ -31,9 +34,29 @@ from app.core.database import Base, engine
 @app.on_event("startup")
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist; add indexes declared since
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    job_queue.start()
     logger.info(f"🚀 API ready at http://localhost:8000{settings.API_V1_STR}")
     logger.info(f"📄 Docs at http://localhost:8000/docs")
 
+
+@app.on_event("startup")
+async def configure_threadpool():
+    # Sync routes run in this pool; bound it so a burst of slow requests
+    # queues instead of spawning unbounded threads
+    limiter = to_thread.current_default_thread_limiter()
+    limiter.total_tokens = settings.THREADPOOL_WORKERS
+
+
+@app.on_event("shutdown")
+def stop_workers():
+    job_queue.stop()
+    ai_service.close()
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -1,3 +1,7 @@
+from app.models.extraction import ResumeExtraction
+from app.models.job import AnalysisJob
+from app.models.resume import Resume
+from app.models.stats import UserStats
 from app.models.user import User
 
-__all__ = ["User"]
+__all__ = ["User", "Resume", "ResumeExtraction", "AnalysisJob", "UserStats"]
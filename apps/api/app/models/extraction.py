@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+
+
+class ResumeExtraction(Base):
+    """One version of the structured data extracted from a resume's file"""
+
+    __tablename__ = "resume_extractions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id"), nullable=False)
+    # Extracted data; query with SQLite json_extract
+    data = Column(JSON, nullable=False)
+    extraction_version = Column(String(20), nullable=True)
+    model = Column(String(255), nullable=True)  # Model that produced the data
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Latest extraction per resume: WHERE resume_id = ? ORDER BY id DESC LIMIT 1
+    __table_args__ = (Index("ix_resume_extractions_resume_id_id", "resume_id", "id"),)
+
+    # Relationship to resume
+    resume = relationship("Resume", back_populates="extractions")
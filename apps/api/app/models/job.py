@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+
+
+class AnalysisJob(Base):
+    """Background job for analyzing an uploaded resume file"""
+
+    __tablename__ = "analysis_jobs"
+
+    # Job statuses
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    id = Column(Integer, primary_key=True, index=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    kind = Column(String(50), nullable=False, default="upload_analysis")
+    status = Column(String(20), nullable=False, default=QUEUED, index=True)
+    stage = Column(String(50), nullable=False, default=QUEUED)  # Progress label
+    progress = Column(Integer, nullable=False, default=0)  # 0-100
+    payload = Column(Text, nullable=True)  # Job options JSON
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    error = Column(Text, nullable=True)
+    run_after = Column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )  # Retry backoff
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    # Relationship to resume
+    resume = relationship("Resume", back_populates="analysis_jobs")
@@ -1,9 +1,20 @@
+import hashlib
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    exists,
+)
+from sqlalchemy.orm import column_property, relationship
 
 from app.core.database import Base
+from app.models.extraction import ResumeExtraction
 
 
 class Resume(Base):
@@ -17,7 +28,8 @@ class Resume(Base):
     file_path = Column(String(500), nullable=True)  # Path to uploaded file
     file_type = Column(String(10), nullable=True)  # pdf, png, etc.
     file_size = Column(Integer, nullable=True)  # Size in bytes
-    extracted_data_path = Column(String(500), nullable=True)  # Path to extracted JSON
+    # Legacy extracted data JSON file, imported into resume_extractions on first read
+    extracted_data_path = Column(String(500), nullable=True)
     ats_score = Column(Integer, default=0)  # ATS score 0-100
     thumbnail_color = Column(String(50), default="bg-blue-900/20")  # Tailwind class
     content = Column(Text, nullable=True)  # ATS analysis JSON (legacy)
@@ -26,5 +38,62 @@ class Resume(Base):
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
 
+    # Resume list pages: WHERE user_id = ? ORDER BY updated_at DESC, id DESC
+    # (SQLite indexes carry the rowid, so ties are already ordered by id)
+    __table_args__ = (Index("ix_resumes_user_id_updated_at", "user_id", "updated_at"),)
+
     # Relationship to user
     user = relationship("User", back_populates="resumes")
+
+    # Extracted data versions, oldest first
+    extractions = relationship(
+        "ResumeExtraction",
+        back_populates="resume",
+        cascade="all, delete-orphan",
+        order_by="ResumeExtraction.id",
+    )
+    # Loaded with the resume, without loading any extracted data
+    has_extraction = column_property(
+        exists()
+        .where(ResumeExtraction.resume_id == id)
+        .correlate_except(ResumeExtraction)
+    )
+
+    # Background analysis jobs, oldest first
+    analysis_jobs = relationship(
+        "AnalysisJob",
+        back_populates="resume",
+        cascade="all, delete-orphan",
+        order_by="AnalysisJob.id",
+    )
+
+    @property
+    def has_extracted_data(self) -> bool:
+        return bool(self.has_extraction or self.extracted_data_path)
+
+    @property
+    def file_version(self) -> str | None:
+        """
+        Identifies the stored upload; uploads are stored under a name derived
+        from their SHA-256, so a path only ever holds the same bytes and a
+        download URL carrying it (?v=) is immutable
+        """
+        if not self.file_path:
+            return None
+        key = f"{self.file_path}|{self.file_size}"
+        return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+    @property
+    def latest_job(self):
+        """Most recent analysis job for this resume, if any"""
+        return self.analysis_jobs[-1] if self.analysis_jobs else None
+
+    @property
+    def analysis_job_id(self) -> int | None:
+        job = self.latest_job
+        return job.id if job else None
+
+    @property
+    def analysis_status(self) -> str | None:
+        job = self.latest_job
+        return job.status if job else None
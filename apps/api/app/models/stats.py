@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, Date, DateTime, ForeignKey, Integer
+
+from app.core.database import Base
+
+
+class UserStats(Base):
+    """Dashboard aggregates of a user's resumes, refreshed on every change"""
+
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_resumes = Column(Integer, default=0, nullable=False)
+    ats_score_sum = Column(Integer, default=0, nullable=False)
+    highest_ats_score = Column(Integer, default=0, nullable=False)
+    # Resumes created on each of the 7 UTC days ending with the day of the
+    # last refresh, oldest first (week_start is the first day). Reads drop
+    # the days that have since left the window, so the count never goes stale
+    week_start = Column(Date, nullable=False)
+    daily_created = Column(JSON, default=list, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
@@ -1,3 +1,4 @@
+from app.schemas.job import JobResponse
 from app.schemas.user import Token, UserLogin, UserResponse, UserSignup
 
-__all__ = ["UserSignup", "UserLogin", "Token", "UserResponse"]
+__all__ = ["UserSignup", "UserLogin", "Token", "UserResponse", "JobResponse"]
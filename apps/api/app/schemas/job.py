@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class JobResponse(BaseModel):
+    """Schema for background job status response"""
+
+    id: int
+    resume_id: int
+    kind: str
+    status: str  # queued, running, succeeded, failed
+    stage: str
+    progress: int
+    attempts: int
+    max_attempts: int
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any
 
 from pydantic import BaseModel, Field
 
@@ -14,9 +14,9 @@ class ResumeCreate(BaseModel):
 class ResumeUpdate(BaseModel):
     """Schema for updating resume metadata"""
 
-    title: Optional[str] = Field(None, min_length=1, max_length=255)
-    ats_score: Optional[int] = Field(None, ge=0, le=100)
-    thumbnail_color: Optional[str] = None
+    title: str | None = Field(None, min_length=1, max_length=255)
+    ats_score: int | None = Field(None, ge=0, le=100)
+    thumbnail_color: str | None = None
 
 
 # Response schemas
@@ -26,28 +26,49 @@ class ResumeResponse(BaseModel):
     id: int
     user_id: int
     title: str
-    file_path: Optional[str] = None
-    file_type: Optional[str] = None
-    file_size: Optional[int] = None
-    extracted_data_path: Optional[str] = None
+    file_path: str | None = None
+    file_type: str | None = None
+    file_size: int | None = None
+    file_version: str | None = None  # Pass as ?v= to download for caching
+    extracted_data_path: str | None = None  # Legacy, not yet imported file
+    has_extracted_data: bool = False
     ats_score: int
     thumbnail_color: str
+    analysis_job_id: int | None = None
+    analysis_status: str | None = None  # Status of the latest analysis job
     created_at: datetime
     updated_at: datetime
 
-    @property
-    def has_extracted_data(self) -> bool:
-        return self.extracted_data_path is not None
-
     class Config:
         from_attributes = True
 
 
 class ResumeListResponse(BaseModel):
-    """Schema for list of resumes"""
+    """Schema for a page of resumes"""
 
     resumes: list[ResumeResponse]
+    total: int  # All of the user's resumes, not just this page
+    next_cursor: str | None = None  # Pass as ?cursor= for the next page
+
+
+class ResumeFieldsListResponse(BaseModel):
+    """Schema for a page of resumes with only the fields asked for (?fields=)"""
+
+    resumes: list[dict[str, Any]]
     total: int
+    next_cursor: str | None = None
+
+
+class ExtractionVersionResponse(BaseModel):
+    """Schema for one stored version of a resume's extracted data"""
+
+    id: int
+    extraction_version: str | None = None
+    model: str | None = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
 
 
 # Dashboard stats
@@ -90,6 +90,7 @@ class ExtractedResumeData(BaseModel):
     # Meta
     extraction_version: str = "1.0"
     extracted_at: str = ""
+    partial: bool = False  # Reply was cut off; only complete fields were kept
 
     # Core sections
     contact: ContactInfo = Field(default_factory=ContactInfo)
@@ -0,0 +1,246 @@
+"""Content-addressed cache for AI results"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+_bypass_reads: ContextVar[bool] = ContextVar("ai_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_cache(enabled: bool = True) -> Iterator[None]:
+    """
+    Skip cache lookups for the AI calls made in this block
+
+    Fresh results are still stored, replacing the old entries. Not for use
+    inside generators, whose context may change between steps.
+    """
+    token = _bypass_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass_reads.reset(token)
+
+
+def hash_text(text: str) -> str:
+    """SHA-256 hex digest of a string (used for prompts)"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def hash_json(value: Any) -> str:
+    """SHA-256 of a JSON value, independent of key order and whitespace"""
+    return hash_text(json.dumps(value, sort_keys=True, separators=(",", ":")))
+
+
+class AIResultCache:
+    """
+    Persistent cache for AI results, shared across users.
+
+    Entries are keyed by the SHA-256 of the input file bytes, the model name
+    and a hash of the prompt, so a byte-identical upload returns the stored
+    result instead of calling the model again. Entries are JSON files on disk,
+    evicted when older than ``max_age_seconds`` or when the cache grows past
+    ``max_bytes`` (oldest first).
+    """
+
+    MAX_FILE_HASHES = 1024
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        max_bytes: int,
+        max_age_seconds: float,
+        enabled: bool = True,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._file_hashes: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+        self._total_bytes: int | None = None
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def hash_file(self, file_path: str) -> str:
+        """SHA-256 of a file's bytes, memoized by path, size and mtime"""
+        stat = Path(file_path).stat()
+        memo_key = (str(file_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._file_hashes.get(memo_key)
+            if cached:
+                self._file_hashes.move_to_end(memo_key)
+                return cached
+
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        file_hash = digest.hexdigest()
+        with self._lock:
+            self._file_hashes[memo_key] = file_hash
+            while len(self._file_hashes) > self.MAX_FILE_HASHES:
+                self._file_hashes.popitem(last=False)
+        return file_hash
+
+    def make_key(self, task: str, file_hash: str, model: str, prompt: str) -> str:
+        """Build the cache key for a task over a file"""
+        raw = f"{task}:{file_hash}:{model}:{hash_text(prompt)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    # ------------------------------------------------------------------
+    # Get / set
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the cached result for a key, or None on miss/expiry"""
+        if not self.enabled or _bypass_reads.get():
+            return None
+
+        path = self._entry_path(key)
+        with self._lock:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+
+            if time.time() - stat.st_mtime > self.max_age_seconds:
+                self._remove(path, stat.st_size)
+                self.misses += 1
+                return None
+
+            try:
+                with open(path) as f:
+                    value = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._remove(path, stat.st_size)
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        """Store a result; errors and partial (truncated) results are never cached"""
+        if not self.enabled or value.get("error") or value.get("partial"):
+            return
+
+        path = self._entry_path(key)
+        payload = json.dumps(value)
+        with self._lock:
+            self._ensure_size_known()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            previous = path.stat().st_size if path.exists() else 0
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                f.write(payload)
+            tmp_path.replace(path)
+            self._total_bytes = (
+                (self._total_bytes or 0) - previous + path.stat().st_size
+            )
+            if self._total_bytes > self.max_bytes:
+                self._evict_to(int(self.max_bytes * 0.9))
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def _entries(self) -> list[Path]:
+        if not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob("*/*.json"))
+
+    def _ensure_size_known(self) -> None:
+        if self._total_bytes is None:
+            self._total_bytes = sum(p.stat().st_size for p in self._entries())
+
+    def _remove(self, path: Path, size: int) -> None:
+        path.unlink(missing_ok=True)
+        self.evictions += 1
+        if self._total_bytes is not None:
+            self._total_bytes = max(0, self._total_bytes - size)
+
+    def _evict_to(self, target_bytes: int) -> None:
+        """Drop expired entries, then oldest entries until under target_bytes"""
+        now = time.time()
+        entries = []
+        for path in self._entries():
+            stat = path.stat()
+            if now - stat.st_mtime > self.max_age_seconds:
+                self._remove(path, stat.st_size)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        for _, size, path in entries:
+            if (self._total_bytes or 0) <= target_bytes:
+                break
+            self._remove(path, size)
+
+    def prune(self) -> None:
+        """Apply age and size limits to the whole cache"""
+        with self._lock:
+            self._ensure_size_known()
+            self._evict_to(self.max_bytes)
+
+    def clear(self) -> None:
+        """Remove every cached entry"""
+        with self._lock:
+            for path in self._entries():
+                path.unlink(missing_ok=True)
+            self._total_bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and current cache size"""
+        with self._lock:
+            self._ensure_size_known()
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries()),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Singleton instance
+ai_cache = AIResultCache(
+    cache_dir=settings.AI_CACHE_DIR,
+    max_bytes=settings.AI_CACHE_MAX_BYTES,
+    max_age_seconds=settings.AI_CACHE_MAX_AGE_DAYS * 24 * 3600,
+    enabled=settings.AI_CACHE_ENABLED,
+)
+
+# Filled templates, keyed by extracted-data and template-schema hashes
+template_cache = AIResultCache(
+    cache_dir=settings.TEMPLATE_CACHE_DIR,
+    max_bytes=settings.AI_CACHE_MAX_BYTES,
+    max_age_seconds=settings.AI_CACHE_MAX_AGE_DAYS * 24 * 3600,
+    enabled=settings.AI_CACHE_ENABLED,
+)
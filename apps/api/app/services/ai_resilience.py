@@ -0,0 +1,370 @@
+"""Deadlines, retries, circuit breaking and hedging for AI provider calls"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TypeVar
+
+import openai
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Status codes worth another attempt: timeouts, conflicts, rate limits, 5xx
+RETRYABLE_STATUS = {408, 409, 429}
+
+# Latency samples kept per model for the hedging threshold
+LATENCY_WINDOW = 200
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a model whose circuit is open"""
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an error is transient (the provider may succeed on retry)"""
+    if isinstance(error, openai.APIConnectionError):  # Includes APITimeoutError
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+def retry_after(error: Exception) -> float | None:
+    """Seconds the provider asked us to wait (Retry-After header), if any"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return max(0.0, float(response.headers.get("retry-after", "")))
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given retry (0-based)"""
+    ceiling = min(
+        settings.AI_BACKOFF_MAX_SECONDS, settings.AI_BACKOFF_BASE_SECONDS * 2**attempt
+    )
+    return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated provider failures
+
+    After AI_CIRCUIT_FAILURE_THRESHOLD consecutive failures the circuit opens
+    and calls raise CircuitOpenError for AI_CIRCUIT_RESET_SECONDS. Then one
+    trial call is let through (half-open): success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._clock() - self._opened_at >= settings.AI_CIRCUIT_RESET_SECONDS:
+                return "half_open"
+            return "open"
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go to the provider now"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            waited = self._clock() - self._opened_at
+            if waited < settings.AI_CIRCUIT_RESET_SECONDS or self._trial_running:
+                raise CircuitOpenError("AI provider unavailable, circuit open")
+            self._trial_running = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def release_trial(self) -> None:
+        """End a half-open trial that proved nothing about the provider"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if (
+                self._trial_running
+                or self._failures >= settings.AI_CIRCUIT_FAILURE_THRESHOLD
+            ):
+                if self._opened_at is None:
+                    logger.warning(
+                        f"Opening AI circuit after {self._failures} failures"
+                    )
+                self._opened_at = self._clock()
+            self._trial_running = False
+
+
+class LatencyTracker:
+    """Recent successful call latencies, for the p95 hedging threshold"""
+
+    def __init__(self) -> None:
+        self._samples: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self) -> float | None:
+        """95th percentile latency, or None with too few samples"""
+        with self._lock:
+            if len(self._samples) < max(1, settings.AI_HEDGE_MIN_SAMPLES):
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class ResilientCaller:
+    """
+    Runs provider calls with a deadline, retries and a per-model circuit
+
+    ``fn`` receives the seconds left until the deadline, to pass as the
+    request timeout. Retryable errors (see is_retryable) are retried up to
+    AI_MAX_RETRIES times with backoff, honoring Retry-After, as long as the
+    wait fits in the deadline. With AI_HEDGE_ENABLED, a call still running
+    after the model's p95 latency gets a duplicate request and the first
+    successful reply wins.
+    """
+
+    def __init__(self) -> None:
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._latency: dict[str, LatencyTracker] = {}
+        self._counters: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._hedge_pool: ThreadPoolExecutor | None = None
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        with self._lock:
+            if model not in self._breakers:
+                self._breakers[model] = CircuitBreaker()
+                self._latency[model] = LatencyTracker()
+                self._counters[model] = dict.fromkeys(
+                    (
+                        "calls",
+                        "retries",
+                        "failures",
+                        "rejected",
+                        "hedged",
+                        "hedge_wins",
+                    ),
+                    0,
+                )
+            return self._breakers[model]
+
+    def _count(self, model: str, counter: str) -> None:
+        with self._lock:
+            self._counters[model][counter] += 1
+
+    def _hedge_after(self, model: str, remaining: float, hedge: bool) -> float | None:
+        """Seconds to wait before hedging this attempt, or None to not hedge"""
+        if not (hedge and settings.AI_HEDGE_ENABLED):
+            return None
+        p95 = self._latency[model].p95()
+        return p95 if p95 is not None and p95 < remaining else None
+
+    def _before_attempt(self, model: str, breaker: CircuitBreaker) -> None:
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            self._count(model, "rejected")
+            raise
+        self._count(model, "calls")
+
+    def _after_error(
+        self,
+        model: str,
+        breaker: CircuitBreaker,
+        error: Exception,
+        attempt: int,
+        deadline: float,
+    ) -> float:
+        """Record a failed attempt; returns the delay before retrying or re-raises"""
+        if not is_retryable(error):
+            if isinstance(error, openai.APIStatusError):
+                # The provider answered (e.g. 400), so it is up
+                breaker.record_success()
+            else:
+                # A local error (queue timeout, bad request data) never
+                # reached the provider; free the trial slot without a verdict
+                breaker.release_trial()
+            raise error
+        breaker.record_failure()
+        self._count(model, "failures")
+        delay = retry_after(error)
+        if delay is None:
+            delay = backoff_delay(attempt)
+        if attempt >= settings.AI_MAX_RETRIES or time.monotonic() + delay >= deadline:
+            raise error
+        logger.warning(f"{model} call failed ({error!r}), retrying in {delay:.2f}s")
+        self._count(model, "retries")
+        return delay
+
+    def _after_success(
+        self, model: str, breaker: CircuitBreaker, started: float
+    ) -> None:
+        breaker.record_success()
+        self._latency[model].record(time.monotonic() - started)
+
+    def call(
+        self,
+        model: str,
+        fn: Callable[[float], T],
+        deadline_seconds: float | None = None,
+        hedge: bool = True,
+    ) -> T:
+        """Run a blocking provider call"""
+        breaker = self.breaker(model)
+        deadline = time.monotonic() + (deadline_seconds or settings.AI_DEADLINE_SECONDS)
+        attempt = 0
+        while True:
+            self._before_attempt(model, breaker)
+            started = time.monotonic()
+            try:
+                result = self._attempt(model, fn, deadline, hedge)
+            except Exception as e:
+                time.sleep(self._after_error(model, breaker, e, attempt, deadline))
+                attempt += 1
+                continue
+            self._after_success(model, breaker, started)
+            return result
+
+    async def acall(
+        self,
+        model: str,
+        fn: Callable[[float], Awaitable[T]],
+        deadline_seconds: float | None = None,
+        hedge: bool = True,
+    ) -> T:
+        """Run an async provider call"""
+        breaker = self.breaker(model)
+        deadline = time.monotonic() + (deadline_seconds or settings.AI_DEADLINE_SECONDS)
+        attempt = 0
+        while True:
+            self._before_attempt(model, breaker)
+            started = time.monotonic()
+            try:
+                result = await self._aattempt(model, fn, deadline, hedge)
+            except asyncio.CancelledError:
+                breaker.release_trial()
+                raise
+            except Exception as e:
+                await asyncio.sleep(
+                    self._after_error(model, breaker, e, attempt, deadline)
+                )
+                attempt += 1
+                continue
+            self._after_success(model, breaker, started)
+            return result
+
+    def _attempt(
+        self, model: str, fn: Callable[[float], T], deadline: float, hedge: bool
+    ) -> T:
+        hedge_after = self._hedge_after(model, deadline - time.monotonic(), hedge)
+        if hedge_after is None:
+            return fn(deadline - time.monotonic())
+
+        with self._lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(thread_name_prefix="ai-hedge")
+            pool = self._hedge_pool
+        primary = pool.submit(fn, deadline - time.monotonic())
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        self._count(model, "hedged")
+        # The slower request cannot be cancelled; its reply is discarded
+        backup = pool.submit(fn, deadline - time.monotonic())
+        pending = {primary, backup}
+        error: Exception | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        self._count(model, "hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def _aattempt(
+        self,
+        model: str,
+        fn: Callable[[float], Awaitable[T]],
+        deadline: float,
+        hedge: bool,
+    ) -> T:
+        hedge_after = self._hedge_after(model, deadline - time.monotonic(), hedge)
+        if hedge_after is None:
+            return await fn(deadline - time.monotonic())
+
+        primary = asyncio.ensure_future(fn(deadline - time.monotonic()))
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        self._count(model, "hedged")
+        backup = asyncio.ensure_future(fn(deadline - time.monotonic()))
+        pending = {primary, backup}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self._count(model, "hedge_wins")
+                        return task.result()
+                    error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise error
+
+    def stats(self) -> dict:
+        """Circuit state, p95 latency and call counters per model"""
+        with self._lock:
+            models = list(self._breakers)
+        result = {}
+        for model in models:
+            p95 = self._latency[model].p95()
+            with self._lock:
+                counters = dict(self._counters[model])
+            result[model] = {
+                "circuit": self._breakers[model].state,
+                "p95_ms": int(p95 * 1000) if p95 is not None else None,
+                **counters,
+            }
+        return result
+
+    def close(self) -> None:
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False, cancel_futures=True)
+            self._hedge_pool = None
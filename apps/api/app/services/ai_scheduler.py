@@ -0,0 +1,292 @@
+"""Per-model rate limiting, concurrency limits and priority queueing of AI calls"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Coroutine, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Queue wait samples kept per priority class for the metrics
+WAIT_WINDOW = 500
+
+
+class Priority(IntEnum):
+    """Scheduling class of an AI call; lower values are served first"""
+
+    INTERACTIVE = 0  # A user is waiting on the reply (suggestions, template fill)
+    NORMAL = 1
+    BACKGROUND = 2  # Queued analysis jobs and bulk re-extraction
+
+
+# Set by background callers to demote every AI call they make
+_priority_override: ContextVar[Priority | None] = ContextVar(
+    "ai_priority", default=None
+)
+
+
+@contextmanager
+def ai_priority(priority: Priority) -> Iterator[None]:
+    """
+    Run the AI calls made in this block at the given priority
+
+    Not for use inside generators, whose context may change between steps.
+    """
+    token = _priority_override.set(priority)
+    try:
+        yield
+    finally:
+        _priority_override.reset(token)
+
+
+def effective_priority(default: Priority) -> Priority:
+    """The caller's ai_priority override, else the call's own priority"""
+    override = _priority_override.get()
+    return default if override is None else override
+
+
+async def _with_priority(priority: Priority | None, coro: Coroutine[Any, Any, T]) -> T:
+    if priority is not None:
+        # A task runs in its own copy of the context, so no reset is needed
+        _priority_override.set(priority)
+    return await coro
+
+
+def carry_priority(coro: Coroutine[Any, Any, T]) -> Coroutine[Any, Any, T]:
+    """Wrap a coroutine so it keeps the calling thread's ai_priority on another loop"""
+    return _with_priority(_priority_override.get(), coro)
+
+
+class TokenBucket:
+    """Request rate limit: ``rate`` tokens per second, holding at most ``capacity``"""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; returns 0, or the seconds until one is available"""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+
+class _Waiter:
+    __slots__ = ("priority", "enqueued", "grant", "granted", "cancelled", "waited")
+
+    def __init__(self, priority: Priority, grant) -> None:
+        self.priority = priority
+        self.enqueued = time.monotonic()
+        self.grant = grant
+        self.granted = False
+        self.cancelled = False
+        self.waited = 0.0
+
+
+class ModelGovernor:
+    """
+    Admits calls to one model in priority order
+
+    A call waits until it is first in the queue (by priority, then arrival),
+    fewer than ``max_concurrency`` calls are in flight and the token bucket
+    has a token. Slots are handed to the next waiter on release, so sync
+    threads and coroutines on the AI event loop share one queue.
+    """
+
+    def __init__(self, rate_per_minute: int, max_concurrency: int) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self._bucket = (
+            TokenBucket(rate_per_minute / 60, capacity=self.max_concurrency)
+            if rate_per_minute > 0
+            else None
+        )
+        self._active = 0
+        self._queue: list[tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._timer: threading.Timer | None = None
+        self._waits = {priority: deque(maxlen=WAIT_WINDOW) for priority in Priority}
+        self._admitted = dict.fromkeys(Priority, 0)
+        self._lock = threading.Lock()
+
+    def _enqueue(self, priority: Priority, grant) -> _Waiter:
+        waiter = _Waiter(priority, grant)
+        with self._lock:
+            heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+            self._dispatch()
+        return waiter
+
+    def _dispatch(self) -> None:
+        """Admit queued calls while slots and tokens allow; lock held"""
+        while self._queue and self._active < self.max_concurrency:
+            waiter = self._queue[0][2]
+            if waiter.cancelled:
+                heapq.heappop(self._queue)
+                continue
+            if self._bucket is not None:
+                delay = self._bucket.take()
+                if delay > 0:
+                    self._wake_after(delay)
+                    return
+            heapq.heappop(self._queue)
+            self._active += 1
+            waiter.granted = True
+            waiter.waited = time.monotonic() - waiter.enqueued
+            self._waits[waiter.priority].append(waiter.waited)
+            self._admitted[waiter.priority] += 1
+            waiter.grant()
+
+    def _wake_after(self, delay: float) -> None:
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._dispatch()
+
+    def _release(self) -> None:
+        with self._lock:
+            self._active -= 1
+            self._dispatch()
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """
+        Take a waiter that stopped waiting out of the queue
+
+        Returns True if it was granted a slot in the meantime, which the
+        caller must then use or release.
+        """
+        with self._lock:
+            if waiter.granted:
+                return True
+            waiter.cancelled = True
+            self._queue = [entry for entry in self._queue if entry[2] is not waiter]
+            heapq.heapify(self._queue)
+            return False
+
+    @contextmanager
+    def slot(self, priority: Priority, timeout: float | None = None) -> Iterator[float]:
+        """
+        Hold a call slot; yields the seconds spent queued
+
+        Raises TimeoutError if not admitted within timeout seconds, without
+        taking a rate limit token.
+        """
+        admitted = threading.Event()
+        waiter = self._enqueue(priority, admitted.set)
+        if not admitted.wait(timeout) and not self._abandon(waiter):
+            raise TimeoutError("Deadline passed while queued for the AI model")
+        try:
+            yield waiter.waited
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def aslot(
+        self, priority: Priority, timeout: float | None = None
+    ) -> AsyncIterator[float]:
+        """Async variant of slot, for coroutines on the AI event loop"""
+        loop = asyncio.get_running_loop()
+        admitted = loop.create_future()
+
+        def grant() -> None:
+            loop.call_soon_threadsafe(
+                lambda: admitted.done() or admitted.set_result(None)
+            )
+
+        waiter = self._enqueue(priority, grant)
+        try:
+            await asyncio.wait_for(admitted, timeout)
+        except TimeoutError:
+            if not self._abandon(waiter):
+                raise TimeoutError(
+                    "Deadline passed while queued for the AI model"
+                ) from None
+        except asyncio.CancelledError:
+            if self._abandon(waiter):
+                self._release()
+            raise
+        try:
+            yield waiter.waited
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            queued = [waiter for _, _, waiter in self._queue if not waiter.cancelled]
+            waits = {
+                priority: sorted(samples) for priority, samples in self._waits.items()
+            }
+            result = {
+                "active": self._active,
+                "max_concurrency": self.max_concurrency,
+                "queued": len(queued),
+            }
+            admitted = dict(self._admitted)
+        result["queue_wait"] = {
+            priority.name.lower(): {
+                "admitted": admitted[priority],
+                "avg_ms": int(sum(samples) / len(samples) * 1000) if samples else 0,
+                "p95_ms": int(samples[int(len(samples) * 0.95)] * 1000)
+                if samples
+                else 0,
+                "max_ms": int(samples[-1] * 1000) if samples else 0,
+            }
+            for priority, samples in waits.items()
+        }
+        return result
+
+
+class AIScheduler:
+    """One ModelGovernor per model, with limits from settings"""
+
+    def __init__(self) -> None:
+        self._governors: dict[str, ModelGovernor] = {}
+        self._lock = threading.Lock()
+
+    def governor(self, model: str) -> ModelGovernor:
+        with self._lock:
+            if model not in self._governors:
+                if model == settings.NEBIUS_VLM_MODEL:
+                    limits = (
+                        settings.AI_VLM_RATE_PER_MINUTE,
+                        settings.AI_VLM_MAX_CONCURRENCY,
+                    )
+                else:
+                    limits = (
+                        settings.AI_LLM_RATE_PER_MINUTE,
+                        settings.AI_LLM_MAX_CONCURRENCY,
+                    )
+                self._governors[model] = ModelGovernor(*limits)
+            return self._governors[model]
+
+    def slot(self, model: str, priority: Priority, timeout: float | None = None):
+        return self.governor(model).slot(priority, timeout)
+
+    def aslot(self, model: str, priority: Priority, timeout: float | None = None):
+        return self.governor(model).aslot(priority, timeout)
+
+    def stats(self) -> dict:
+        """Active and queued calls and queue wait per priority class, per model"""
+        with self._lock:
+            governors = dict(self._governors)
+        return {model: governor.stats() for model, governor in governors.items()}
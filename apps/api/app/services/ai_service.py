@@ -1,17 +1,45 @@
 """AI Service for resume analysis using Nebius API"""
 
-import base64
-import io
+import asyncio
+import copy
 import json
 import logging
-import re
+import threading
+import time
+from collections.abc import Coroutine, Generator, Iterator
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
+from typing import Any, TypeVar
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
 from pdf2image import convert_from_path
 from PIL import Image
 
 from app.core.config import settings
+from app.services.ai_cache import ai_cache, hash_json, hash_text, template_cache
+from app.services.ai_resilience import ResilientCaller
+from app.services.ai_scheduler import (
+    AIScheduler,
+    Priority,
+    carry_priority,
+    effective_priority,
+)
+from app.services.ats_scorer import merge_subjective, score_resume
+from app.services.image_encoding import encode_pages, profile_from_settings
+from app.services.json_repair import CLEAN, TRUNCATED, parse_json_object, parse_stats
+from app.services.page_images import page_image_store
+from app.services.partial_json import parse_partial_json
+from app.services.template_mapper import (
+    TEMPLATE_MAPPER_VERSION,
+    TemplateMapping,
+    apply_leftovers,
+    map_template,
+    normalize_schema,
+    prune_for_template,
+)
+from app.services.text_layer import text_layer_store
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +72,23 @@ You MUST respond with ONLY a valid JSON object in this exact format, no other te
   "missing_sections": ["section1", "section2"]
 }"""
 
+# Hybrid ATS scoring: the objective categories are scored locally
+ATS_SUBJECTIVE_PROMPT = """You are an expert ATS (Applicant Tracking System) analyzer.
+The objective parts of this resume's ATS score (contact information, summary,
+experience, skills, education and keywords) are computed separately. Judge only what
+needs a look at the resume itself.
+
+Analyze the resume image and evaluate:
+- **Formatting** (15 points): Clean layout, consistent fonts, proper sections, no
+  tables/graphics that ATS can't read
+
+You MUST respond with ONLY a valid JSON object in this exact format, no other text:
+{
+  "formatting": <number 0-15>,
+  "strengths": ["strength1", "strength2", "strength3"],
+  "improvements": ["improvement1", "improvement2", "improvement3"]
+}"""
+
 RESUME_SUGGESTIONS_PROMPT = """You are an expert resume coach. Analyze the resume image and provide specific, actionable suggestions to improve it.
 
 Focus on:
@@ -152,135 +197,798 @@ You MUST respond with ONLY a valid JSON object in this exact format:
 
 Extract ALL information visible in the resume. Be precise with dates, names, and details."""
 
-TEMPLATE_FILL_PROMPT = """You are an expert resume data mapper. Your job is to take extracted resume data and intelligently map it to fill a template's required fields.
+TEMPLATE_FILL_PROMPT = """You are an expert resume data mapper. Most fields of a resume
+template have already been filled from the extracted resume data; you fill the rest.
 
 You will receive:
 1. EXTRACTED DATA: Structured data from the user's resume
-2. TEMPLATE SCHEMA: The fields required by the target template
+2. REMAINING TEMPLATE FIELDS: Fields with no direct match, each with a path, label and
+   type
 
 Your task:
-- Map the extracted data to the template fields
-- If a template field has no direct match, find the best alternative or leave empty
+- For each remaining field, find the best value in the extracted data, or use "" ([] for
+  array fields) if nothing fits
 - Preserve the original content as much as possible
-- Format dates consistently
-- Ensure all required fields are filled if data is available
+- Paths containing "[]" belong to a list section: return a list with one value per entry
+  of that section, in order
+
+Respond with ONLY a valid JSON object mapping each field path to its value."""
+
+FULL_ANALYSIS_PROMPT = f"""You are an expert resume parser, ATS analyzer and resume
+coach. Analyze the resume image and complete three tasks in a single response: data
+extraction, ATS scoring and improvement suggestions.
+
+You MUST respond with ONLY a valid JSON object with exactly these three keys, no other
+text:
+{{
+  "extracted_data": <object in the EXTRACTION format>,
+  "ats": <object in the ATS format>,
+  "suggestions": <object in the SUGGESTIONS format>
+}}
+
+Each task below describes the format of one of the three objects. Where a task says to
+respond with only its own JSON object, put that object under its key instead.
+
+=== EXTRACTION ===
+{RESUME_EXTRACTION_PROMPT}
+
+=== ATS ===
+{ATS_SYSTEM_PROMPT}
+
+=== SUGGESTIONS ===
+{RESUME_SUGGESTIONS_PROMPT}"""
+
+
+@dataclass(frozen=True)
+class VisionTask:
+    """
+    An analysis task run over the pages of an uploaded file, either as page
+    images (VLM) or as text-layer text (LLM fast path)
+    """
+
+    name: str
+    prompt: str  # System prompt
+    instruction: str  # User message sent with the pages
+    max_tokens: int
+    temperature: float
+    max_pages: int = 0  # Only send the first N pages (0 = all rendered pages)
+    deadline_seconds: float = 120.0  # Total time for the call, retries included
+    priority: Priority = Priority.NORMAL  # Unless the caller sets ai_priority
+    version: str = ""  # Output format version; results of older versions are not reused
+
+    @property
+    def cache_namespace(self) -> str:
+        """Cache namespace; versioned and page-limited tasks see different input"""
+        namespace = f"{self.name}-v{self.version}" if self.version else self.name
+        return f"{namespace}-p{self.max_pages}" if self.max_pages else namespace
+
+
+# Stored with extracted data; bump when the extraction format changes so
+# scripts/reanalyze.py refreshes old data
+EXTRACTION_VERSION = "1.0"
+
+
+def prompt_signature(prompt: str) -> str:
+    """Short hash stored with extracted data to record which prompt produced it"""
+    return hash_text(prompt)[:16]
+
+
+# Extracted data from any other prompt is out of date
+EXTRACTION_PROMPT_SIGNATURES = frozenset(
+    prompt_signature(p) for p in (RESUME_EXTRACTION_PROMPT, FULL_ANALYSIS_PROMPT)
+)
+
+EXTRACTION_TASK = VisionTask(
+    name="extraction",
+    prompt=RESUME_EXTRACTION_PROMPT,
+    instruction="Extract all information from this resume:",
+    max_tokens=4000,
+    temperature=0.2,  # Lower temperature for more consistent extraction
+    max_pages=settings.EXTRACTION_MAX_PAGES,
+    deadline_seconds=120.0,
+    version=EXTRACTION_VERSION,
+)
+ATS_TASK = VisionTask(
+    name="ats",
+    prompt=ATS_SYSTEM_PROMPT,
+    instruction="Analyze this resume for ATS compatibility:",
+    max_tokens=1000,
+    temperature=0.3,
+    max_pages=settings.ATS_MAX_PAGES,
+    deadline_seconds=60.0,
+)
+ATS_SUBJECTIVE_TASK = VisionTask(
+    name="ats_subjective",
+    prompt=ATS_SUBJECTIVE_PROMPT,
+    instruction="Review the formatting of this resume:",
+    max_tokens=400,
+    temperature=0.3,
+    max_pages=settings.ATS_MAX_PAGES,
+    deadline_seconds=45.0,
+)
+SUGGESTIONS_TASK = VisionTask(
+    name="suggestions",
+    prompt=RESUME_SUGGESTIONS_PROMPT,
+    instruction="Analyze this resume and provide improvement suggestions:",
+    max_tokens=1500,
+    temperature=0.5,
+    max_pages=settings.SUGGESTIONS_MAX_PAGES,
+    deadline_seconds=90.0,
+    priority=Priority.INTERACTIVE,
+)
+FULL_ANALYSIS_TASK = VisionTask(
+    name="full",
+    prompt=FULL_ANALYSIS_PROMPT,
+    instruction="Extract, score and review this resume:",
+    max_tokens=6000,
+    temperature=0.2,
+    deadline_seconds=180.0,
+)
+
+EMPTY_EXTRACTION = {
+    "contact": {"full_name": "", "email": "", "phone": "", "location": ""},
+    "summary": "",
+    "work_experience": [],
+    "education": [],
+    "technical_skills": [],
+    "soft_skills": [],
+    "skills_by_category": {},
+    "projects": [],
+    "certifications": [],
+    "languages": [],
+    "publications": [],
+    "awards": [],
+    "volunteer": [],
+    "interests": [],
+}
+
+NOT_CONFIGURED = "AI service not configured. Set NEBIUS_API_KEY in .env"
+
+# ATS scoring modes: the VLM scores everything, rules score everything from
+# the extracted data, or rules plus the model for the subjective categories
+ATS_SCORING_MODES = ("llm", "local", "hybrid")
+
+# Sent with text-layer requests, whose system prompts describe a resume image
+TEXT_LAYER_NOTE = (
+    "The resume is provided as the text layer of the PDF instead of page images. "
+    "Treat it as the resume image; infer layout and formatting from line breaks "
+    "and spacing."
+)
+
+# Analysis paths: PDF text layer sent to the LLM, or page images sent to the VLM
+TEXT_PATH = "text"
+VISION_PATH = "vision"
+# Usage stats bucket for template fill calls
+FILL_PATH = "template_fill"
+FILL_DEADLINE_SECONDS = 60.0
 
-Respond with ONLY a valid JSON object containing the filled template data."""
+T = TypeVar("T")
+
+# Events yielded by the streaming methods: ("delta", {"text"}),
+# ("partial", {"data"}), ("result", final payload) or ("error", {"error"})
+StreamEvent = tuple[str, dict]
+
+
+def compact_json(value) -> str:
+    """JSON without indentation or spaces, to keep prompts small"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
 
 
 class AIService:
     """Service for AI-powered resume analysis"""
 
     def __init__(self):
+        self.image_profile = profile_from_settings()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_lock = threading.Lock()
+        self._path_stats = {
+            path: {
+                "calls": 0,
+                "total_ms": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+            }
+            for path in (TEXT_PATH, VISION_PATH, FILL_PATH)
+        }
+        # Size of the template fill data as sent and as the full pretty-printed dump
+        self._fill_chars = {"data_chars": 0, "full_data_chars": 0}
+        self._stats_lock = threading.Lock()
+        # Retries, deadlines and circuit breaking for every completion call;
+        # the SDK's own retries are disabled in its favor
+        self.resilience = ResilientCaller()
+        # Rate and concurrency limits per model, serving interactive calls first
+        self.scheduler = AIScheduler()
+
         if not settings.NEBIUS_API_KEY:
             self.client = None
+            self.async_client = None
         else:
             self.client = OpenAI(
                 base_url=settings.NEBIUS_BASE_URL,
                 api_key=settings.NEBIUS_API_KEY,
+                http_client=DefaultHttpxClient(limits=self._http_limits()),
+                max_retries=0,
+            )
+            # Async client used for concurrent calls; it lives on the AI event
+            # loop so every caller shares one connection pool
+            self.async_client = AsyncOpenAI(
+                base_url=settings.NEBIUS_BASE_URL,
+                api_key=settings.NEBIUS_API_KEY,
+                http_client=DefaultAsyncHttpxClient(limits=self._http_limits()),
+                max_retries=0,
             )
 
-    def _pdf_to_images(self, pdf_path: str) -> list[Image.Image]:
-        """Convert PDF to list of PIL Images"""
-        return convert_from_path(pdf_path)
-
-    def _image_to_base64(self, image: Image.Image, format: str = "PNG") -> str:
-        """Convert PIL Image to base64 string"""
-        buffer = io.BytesIO()
-        image.save(buffer, format=format)
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+    @staticmethod
+    def _http_limits() -> httpx.Limits:
+        """Connection pool limits for the Nebius HTTP clients"""
+        return httpx.Limits(
+            max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        )
+
+    # ------------------------------------------------------------------
+    # Event loop for the async client
+    # ------------------------------------------------------------------
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Start (once) the background event loop that owns the async client"""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="ai-event-loop", daemon=True
+                )
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    def run_async(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the AI event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(
+            carry_priority(coro), self._get_loop()
+        ).result()
+
+    def close(self) -> None:
+        """Close HTTP clients and stop the AI event loop"""
+        if self.client:
+            self.client.close()
+        if self._loop is not None:
+            if self.async_client:
+                self.run_async(self.async_client.close())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+        self.resilience.close()
+
+    # ------------------------------------------------------------------
+    # Completion calls
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _timeout_after_queue(timeout: float, waited: float) -> float:
+        """Request timeout left once a call leaves the scheduler queue"""
+        if timeout - waited <= 0:
+            raise TimeoutError("Deadline passed while queued for the AI model")
+        return timeout - waited
+
+    def _complete(
+        self,
+        request: dict,
+        deadline_seconds: float | None = None,
+        priority: Priority = Priority.NORMAL,
+    ):
+        """
+        Create a chat completion with retries, deadline and circuit breaker,
+        within the model's rate and concurrency limits
+        """
+        model = request["model"]
+        priority = effective_priority(priority)
+
+        def create(timeout: float):
+            with self.scheduler.slot(model, priority, timeout) as waited:
+                return self.client.chat.completions.create(
+                    **request, timeout=self._timeout_after_queue(timeout, waited)
+                )
+
+        return self.resilience.call(model, create, deadline_seconds)
+
+    async def _acomplete(
+        self,
+        request: dict,
+        deadline_seconds: float | None = None,
+        priority: Priority = Priority.NORMAL,
+    ):
+        """Async variant of _complete, for calls on the AI event loop"""
+        model = request["model"]
+        priority = effective_priority(priority)
+
+        async def create(timeout: float):
+            async with self.scheduler.aslot(model, priority, timeout) as waited:
+                return await self.async_client.chat.completions.create(
+                    **request, timeout=self._timeout_after_queue(timeout, waited)
+                )
+
+        return await self.resilience.acall(model, create, deadline_seconds)
+
+    def _open_stream(self, request: dict, deadline_seconds: float | None = None):
+        """
+        Start a streamed completion; only opening the stream is retried, as
+        deltas may already have reached the client when a stream breaks
+        """
+        return self.resilience.call(
+            request["model"],
+            lambda timeout: self.client.chat.completions.create(
+                **request,
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=timeout,
+            ),
+            deadline_seconds,
+            hedge=False,
+        )
+
+    # ------------------------------------------------------------------
+    # Page images
+    # ------------------------------------------------------------------
+
+    def _pdf_to_images(self, pdf_path: str, dpi: int) -> list[Image.Image]:
+        """
+        Convert PDF to list of PIL Images
 
-    def _file_to_base64_images(self, file_path: str) -> list[str]:
-        """Convert file (PDF or image) to list of base64 images"""
+        Pages are split across PDF_RENDER_THREADS poppler processes, and only
+        the first PDF_MAX_PAGES pages are rendered.
+        """
+        return convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            thread_count=max(1, settings.PDF_RENDER_THREADS),
+            last_page=settings.PDF_MAX_PAGES or None,
+        )
+
+    def _file_to_image_urls(self, file_path: str) -> list[str]:
+        """Get page image data URLs for a file, rendering only on first use"""
+        tag = f"{self.image_profile.tag}-p{settings.PDF_MAX_PAGES}"
+        return page_image_store.get_or_render(
+            file_path, self._render_image_urls, tag=tag
+        )
+
+    def _render_image_urls(self, file_path: str) -> list[str]:
+        """Convert file (PDF or image) to list of image data URLs"""
         path = Path(file_path)
         suffix = path.suffix.lower()
+        profile = self.image_profile
 
         if suffix == ".pdf":
-            images = self._pdf_to_images(file_path)
-            return [self._image_to_base64(img) for img in images]
+            images = self._pdf_to_images(file_path, profile.dpi)
+            return encode_pages(images, profile)
         elif suffix in [".png", ".jpg", ".jpeg"]:
             with Image.open(file_path) as img:
-                return [self._image_to_base64(img)]
+                return encode_pages([img], profile)
         else:
             raise ValueError(f"Unsupported file type: {suffix}")
 
-    def _parse_json_response(self, response_text: str) -> dict:
-        """Parse JSON from AI response, handling potential formatting issues"""
-        # Try to extract JSON from the response
-        # Sometimes the model might wrap it in markdown code blocks
-        json_match = re.search(r"```(?:json)?\s*([\s\S]*?)\s*```", response_text)
-        if json_match:
-            response_text = json_match.group(1)
-
-        # Try to find JSON object in the response
-        json_match = re.search(r"\{[\s\S]*\}", response_text)
-        if json_match:
-            response_text = json_match.group(0)
+    # ------------------------------------------------------------------
+    # Cache and response helpers
+    # ------------------------------------------------------------------
 
+    def _cache_key(
+        self, task: str, file_path: str, model: str, prompt: str
+    ) -> str | None:
+        """Content-addressed cache key for a task over a file"""
         try:
-            return json.loads(response_text)
-        except json.JSONDecodeError:
-            # Return a default response if parsing fails
+            return ai_cache.make_key(task, ai_cache.hash_file(file_path), model, prompt)
+        except OSError:
+            return None
+
+    def _cache_get(self, task: str, cache_key: str | None) -> dict | None:
+        """Look up a cached result, logging hits"""
+        if not cache_key:
+            return None
+        cached = ai_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"AI cache hit for {task} ({cache_key[:12]})")
+        return cached
+
+    def _parse_json_response(self, response_text: str) -> dict:
+        """
+        Parse the JSON object in an AI response, repairing it where possible
+
+        Replies cut off by max_tokens keep their complete fields instead of
+        being discarded, marked with "partial": True. Partial results are
+        returned and may be saved, so the user sees what was recovered, but
+        are never cached: the next call or re-extract asks the model again.
+        Every parse is counted by repair level.
+        """
+        result, level = parse_json_object(response_text)
+        parse_stats.record(level)
+        if result is None:
             return {"error": "Failed to parse AI response", "raw": response_text}
+        if level != CLEAN:
+            logger.warning(f"Parsed AI response with repair level '{level}'")
+        if level == TRUNCATED:
+            result["partial"] = True
+        return result
+
+    def _log_usage(
+        self, task: str, response, started: float, path: str | None = None
+    ) -> None:
+        """Log latency and token usage of a completion, per analysis path"""
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        usage = getattr(response, "usage", None)
+        if path is not None:
+            with self._stats_lock:
+                stats = self._path_stats[path]
+                stats["calls"] += 1
+                stats["total_ms"] += elapsed_ms
+                if usage is not None:
+                    stats["prompt_tokens"] += usage.prompt_tokens or 0
+                    stats["completion_tokens"] += usage.completion_tokens or 0
+            task = f"{task} [{path}]"
+        if usage is not None:
+            logger.info(
+                f"{task}: {elapsed_ms} ms, prompt_tokens={usage.prompt_tokens}, "
+                f"completion_tokens={usage.completion_tokens}"
+            )
+        else:
+            logger.info(f"{task}: {elapsed_ms} ms")
+
+    def _stats_snapshot(self, path: str) -> dict:
+        stats = self._path_stats[path]
+        calls = stats["calls"]
+        return {
+            **stats,
+            "avg_ms": int(stats["total_ms"] / calls) if calls else 0,
+            "avg_prompt_tokens": int(stats["prompt_tokens"] / calls) if calls else 0,
+        }
+
+    def path_stats(self) -> dict:
+        """Calls, latency and tokens spent on the text-layer and VLM paths"""
+        with self._stats_lock:
+            return {
+                path: self._stats_snapshot(path) for path in (TEXT_PATH, VISION_PATH)
+            }
 
-    def analyze_resume_ats(self, file_path: str) -> dict:
+    def fill_stats(self) -> dict:
         """
-        Analyze a resume for ATS compatibility.
+        Calls, latency and tokens of template fills, plus the size of the
+        extracted data sent versus the full pretty-printed dump
+        """
+        with self._stats_lock:
+            return {
+                **self._stats_snapshot(FILL_PATH),
+                **self._fill_chars,
+                "pruned": settings.TEMPLATE_FILL_PRUNE,
+            }
+
+    # ------------------------------------------------------------------
+    # Analysis tasks (extraction, ATS, suggestions)
+    # ------------------------------------------------------------------
+
+    def _select_path(self, file_path: str) -> tuple[str, str, list[str] | None]:
+        """
+        Choose how a file is analyzed
+
+        PDFs with a usable text layer go to the cheaper text LLM; image-only
+        PDFs and image uploads are rendered and sent to the VLM.
 
         Returns:
-            dict with score, breakdown, strengths, improvements, missing_sections
+            (path, model, text_pages)
         """
-        if not self.client:
+        text_pages = text_layer_store.get_pages(file_path)
+        if text_pages:
+            return TEXT_PATH, settings.NEBIUS_LLM_MODEL, text_pages
+        return VISION_PATH, settings.NEBIUS_VLM_MODEL, None
+
+    @staticmethod
+    def model_for_path(path: str | None) -> str:
+        """Model that analyzes files on the given analysis path"""
+        return (
+            settings.NEBIUS_LLM_MODEL
+            if path == TEXT_PATH
+            else settings.NEBIUS_VLM_MODEL
+        )
+
+    def _prepare_pages(self, file_path: str) -> None:
+        """Detect the text layer, rendering page images only if there is none"""
+        if not text_layer_store.get_pages(file_path):
+            self._file_to_image_urls(file_path)
+
+    def _task_request(
+        self, task: VisionTask, file_path: str, text_pages: list[str] | None
+    ) -> dict:
+        """Build chat completion arguments for the path chosen by _select_path"""
+        if text_pages:
+            return self._text_request(task, text_pages)
+        return self._vision_request(task, file_path)
+
+    def _text_request(self, task: VisionTask, text_pages: list[str]) -> dict:
+        """Build chat completion arguments for a task over a PDF's text layer"""
+        if task.max_pages:
+            text_pages = text_pages[: task.max_pages]
+        text = "\n\n".join(
+            f"--- Page {number} ---\n{page.strip()}"
+            for number, page in enumerate(text_pages, start=1)
+        )
+        return {
+            "model": settings.NEBIUS_LLM_MODEL,
+            "messages": [
+                {"role": "system", "content": task.prompt},
+                {
+                    "role": "user",
+                    "content": f"{task.instruction}\n\n{TEXT_LAYER_NOTE}\n\n{text}",
+                },
+            ],
+            "max_tokens": task.max_tokens,
+            "temperature": task.temperature,
+        }
+
+    def _vision_request(self, task: VisionTask, file_path: str) -> dict:
+        """Build chat completion arguments for a task over a file's pages"""
+        image_urls = self._file_to_image_urls(file_path)
+        if task.max_pages:
+            image_urls = image_urls[: task.max_pages]
+
+        # Build message content with images
+        content = [{"type": "text", "text": task.instruction}]
+        for url in image_urls:
+            content.append({"type": "image_url", "image_url": {"url": url}})
+
+        return {
+            "model": settings.NEBIUS_VLM_MODEL,
+            "messages": [
+                {"role": "system", "content": task.prompt},
+                {"role": "user", "content": content},
+            ],
+            "max_tokens": task.max_tokens,
+            "temperature": task.temperature,
+        }
+
+    def _vision_result(self, task: VisionTask, text: str) -> dict:
+        """Parse a task's completion and apply task-specific post-processing"""
+        result = self._parse_json_response(text)
+
+        if task is ATS_TASK and "score" in result:
+            # Ensure score is valid
+            result["score"] = max(0, min(100, int(result["score"])))
+        elif task is EXTRACTION_TASK and not result.get("error"):
+            # Add extraction metadata
+            result["extraction_version"] = EXTRACTION_VERSION
+            result["prompt_signature"] = prompt_signature(task.prompt)
+            result["extracted_at"] = datetime.utcnow().isoformat()
+
+        return result
+
+    def _vision_error(self, task: VisionTask, message: str) -> dict:
+        """Result returned for a task when the AI call fails"""
+        if task is ATS_SUBJECTIVE_TASK:
+            return {"error": message}
+        if task is ATS_TASK:
             return {
                 "score": 0,
-                "error": "AI service not configured. Set NEBIUS_API_KEY in .env",
+                "error": message,
                 "breakdown": {},
                 "strengths": [],
-                "improvements": ["Configure NEBIUS_API_KEY to enable ATS analysis"],
+                "improvements": [
+                    "Configure NEBIUS_API_KEY to enable ATS analysis"
+                    if message == NOT_CONFIGURED
+                    else "Error analyzing resume"
+                ],
                 "missing_sections": [],
             }
+        if task is SUGGESTIONS_TASK:
+            if message == NOT_CONFIGURED:
+                return {
+                    "suggestions": [],
+                    "overall_impression": "AI service not configured",
+                    "top_priority": (
+                        "Set NEBIUS_API_KEY in .env to enable AI suggestions"
+                    ),
+                }
+            return {
+                "suggestions": [],
+                "overall_impression": f"Error: {message}",
+                "top_priority": "Fix the error and try again",
+            }
+        return {"error": message, **copy.deepcopy(EMPTY_EXTRACTION)}
+
+    def _run_vision_task(self, task: VisionTask, file_path: str) -> dict:
+        """Run an analysis task with the sync client, using the result cache"""
+        if not self.client:
+            return self._vision_error(task, NOT_CONFIGURED)
+
+        path, model, text_pages = self._select_path(file_path)
+        cache_key = self._cache_key(task.cache_namespace, file_path, model, task.prompt)
+        cached = self._cache_get(task.name, cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            # Convert file to base64 images
-            base64_images = self._file_to_base64_images(file_path)
-
-            # Build message content with images
-            content = [{"type": "text", "text": "Analyze this resume for ATS compatibility:"}]
-            for b64_img in base64_images:
-                content.append({
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{b64_img}"},
-                })
-
-            # Call Nebius API
-            response = self.client.chat.completions.create(
-                model=settings.NEBIUS_VLM_MODEL,
-                messages=[
-                    {"role": "system", "content": ATS_SYSTEM_PROMPT},
-                    {"role": "user", "content": content},
-                ],
-                max_tokens=1000,
-                temperature=0.3,
+            request = self._task_request(task, file_path, text_pages)
+            logger.info(f"Calling {model} ({path} path) for {task.name}...")
+            started = time.perf_counter()
+            response = self._complete(request, task.deadline_seconds, task.priority)
+            self._log_usage(task.name, response, started, path)
+            result = self._vision_result(
+                task, response.choices[0].message.content or ""
             )
+            result["analysis_path"] = path
+        except Exception as e:
+            logger.error(f"{task.name} failed: {e}")
+            return self._vision_error(task, str(e))
+
+        if cache_key:
+            ai_cache.set(cache_key, result)
+        return result
+
+    async def _arun_vision_task(self, task: VisionTask, file_path: str) -> dict:
+        """Run an analysis task with the async client, using the result cache"""
+        if not self.async_client:
+            return self._vision_error(task, NOT_CONFIGURED)
+
+        # pdftotext, hashing, rasterizing and encoding all block; keep them off the loop
+        path, model, text_pages = await asyncio.to_thread(self._select_path, file_path)
+        cache_key = await asyncio.to_thread(
+            self._cache_key, task.cache_namespace, file_path, model, task.prompt
+        )
+        cached = self._cache_get(task.name, cache_key)
+        if cached is not None:
+            return cached
 
-            # Parse response
-            result = self._parse_json_response(response.choices[0].message.content or "")
+        try:
+            request = await asyncio.to_thread(
+                self._task_request, task, file_path, text_pages
+            )
+            logger.info(f"Calling {model} ({path} path) for {task.name}...")
+            started = time.perf_counter()
+            response = await self._acomplete(
+                request, task.deadline_seconds, task.priority
+            )
+            self._log_usage(task.name, response, started, path)
+            result = self._vision_result(
+                task, response.choices[0].message.content or ""
+            )
+            result["analysis_path"] = path
+        except Exception as e:
+            logger.error(f"{task.name} failed: {e}")
+            return self._vision_error(task, str(e))
+
+        if cache_key:
+            ai_cache.set(cache_key, result)
+        return result
+
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+
+    def _stream_completion(
+        self,
+        label: str,
+        request: dict,
+        path: str | None = None,
+        partials: bool = True,
+        deadline_seconds: float | None = None,
+        priority: Priority = Priority.NORMAL,
+    ) -> Generator[StreamEvent, None, str]:
+        """
+        Stream a completion, yielding delta and (optionally) partial events
 
-            # Ensure score is valid
-            if "score" in result:
-                result["score"] = max(0, min(100, int(result["score"])))
+        Returns the full reply text for the caller to validate into the final
+        payload (``text = yield from self._stream_completion(...)``). The
+        model's scheduler slot is held until the stream ends.
+        """
+        text = ""
+        partial = None
+        usage_chunk = None
+        budget = deadline_seconds or settings.AI_DEADLINE_SECONDS
+        with self.scheduler.slot(
+            request["model"], effective_priority(priority), budget
+        ) as waited:
+            started = time.perf_counter()
+            stream = self._open_stream(
+                request, self._timeout_after_queue(budget, waited)
+            )
+            for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    # Usage arrives on the last chunk, which has no choices
+                    usage_chunk = chunk
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                if not delta:
+                    continue
+                text += delta
+                yield "delta", {"text": delta}
+
+                # Only re-parse when a value may have just been completed
+                if partials and any(ch in delta for ch in ',}]"'):
+                    parsed = parse_partial_json(text)
+                    if parsed is not None and parsed != partial:
+                        partial = parsed
+                        yield "partial", {"data": parsed}
+
+        self._log_usage(label, usage_chunk, started, path)
+        return text
+
+    def _stream_task(self, task: VisionTask, file_path: str) -> Iterator[StreamEvent]:
+        """Streaming variant of _run_vision_task"""
+        if not self.client:
+            yield "result", self._vision_error(task, NOT_CONFIGURED)
+            return
 
-            return result
+        path, model, text_pages = self._select_path(file_path)
+        cache_key = self._cache_key(task.cache_namespace, file_path, model, task.prompt)
+        cached = self._cache_get(task.name, cache_key)
+        if cached is not None:
+            yield "result", cached
+            return
 
+        try:
+            request = self._task_request(task, file_path, text_pages)
+            logger.info(f"Streaming {model} ({path} path) for {task.name}...")
+            text = yield from self._stream_completion(
+                task.name,
+                request,
+                path,
+                deadline_seconds=task.deadline_seconds,
+                priority=task.priority,
+            )
+            result = self._vision_result(task, text)
+            result["analysis_path"] = path
         except Exception as e:
-            return {
-                "score": 0,
-                "error": str(e),
-                "breakdown": {},
-                "strengths": [],
-                "improvements": ["Error analyzing resume"],
-                "missing_sections": [],
-            }
+            logger.error(f"{task.name} stream failed: {e}")
+            yield "error", self._vision_error(task, str(e))
+            return
+
+        if cache_key:
+            ai_cache.set(cache_key, result)
+        yield "result", result
+
+    def stream_resume_suggestions(self, file_path: str) -> Iterator[StreamEvent]:
+        """Streaming variant of get_resume_suggestions"""
+        yield from self._stream_task(SUGGESTIONS_TASK, file_path)
+
+    def stream_extract_resume_data(self, file_path: str) -> Iterator[StreamEvent]:
+        """Streaming variant of extract_resume_data"""
+        yield from self._stream_task(EXTRACTION_TASK, file_path)
+
+    def analyze_resume_ats(self, file_path: str) -> dict:
+        """
+        Analyze a resume for ATS compatibility.
+
+        Returns:
+            dict with score, breakdown, strengths, improvements, missing_sections
+        """
+        return self._run_vision_task(ATS_TASK, file_path)
+
+    def _ats_mode(self, mode: str | None, extracted_data: dict | None) -> str:
+        """Resolve the ATS scoring mode; rules need a successful extraction"""
+        mode = mode or settings.ATS_SCORING_MODE
+        if mode not in ATS_SCORING_MODES:
+            raise ValueError(f"Unknown ATS scoring mode: {mode}")
+        if mode != "llm" and (not extracted_data or extracted_data.get("error")):
+            return "llm"
+        return mode
+
+    def score_resume_ats(
+        self, file_path: str, extracted_data: dict | None, mode: str | None = None
+    ) -> dict:
+        """
+        Score a resume for ATS compatibility using the given scoring mode.
+
+        "local" needs no AI call; "hybrid" only asks the model for the
+        subjective categories. Both fall back to "llm" when there is no
+        usable extracted data.
+        """
+        mode = self._ats_mode(mode, extracted_data)
+        if mode == "llm":
+            return self.analyze_resume_ats(file_path)
+
+        local = score_resume(extracted_data)
+        if mode == "local":
+            return local
+        return merge_subjective(
+            local, self._run_vision_task(ATS_SUBJECTIVE_TASK, file_path)
+        )
 
     def get_resume_suggestions(self, file_path: str) -> dict:
         """
@@ -289,46 +997,185 @@ class AIService:
         Returns:
             dict with suggestions, overall_impression, top_priority
         """
-        if not self.client:
-            return {
-                "suggestions": [],
-                "overall_impression": "AI service not configured",
-                "top_priority": "Set NEBIUS_API_KEY in .env to enable AI suggestions",
-            }
+        return self._run_vision_task(SUGGESTIONS_TASK, file_path)
 
-        try:
-            # Convert file to base64 images
-            base64_images = self._file_to_base64_images(file_path)
-
-            # Build message content with images
-            content = [{"type": "text", "text": "Analyze this resume and provide improvement suggestions:"}]
-            for b64_img in base64_images:
-                content.append({
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{b64_img}"},
-                })
-
-            # Call Nebius API
-            response = self.client.chat.completions.create(
-                model=settings.NEBIUS_VLM_MODEL,
-                messages=[
-                    {"role": "system", "content": RESUME_SUGGESTIONS_PROMPT},
-                    {"role": "user", "content": content},
-                ],
-                max_tokens=1500,
-                temperature=0.5,
-            )
+    def extract_resume_data(self, file_path: str) -> dict:
+        """
+        Extract structured data from a resume.
 
-            # Parse response
-            return self._parse_json_response(response.choices[0].message.content or "")
+        Returns:
+            dict with all extracted resume data (contact, experience, education, etc.)
+        """
+        return self._run_vision_task(EXTRACTION_TASK, file_path)
 
-        except Exception as e:
+    async def aanalyze_resume_ats(self, file_path: str) -> dict:
+        """Async variant of analyze_resume_ats"""
+        return await self._arun_vision_task(ATS_TASK, file_path)
+
+    async def aget_resume_suggestions(self, file_path: str) -> dict:
+        """Async variant of get_resume_suggestions"""
+        return await self._arun_vision_task(SUGGESTIONS_TASK, file_path)
+
+    async def aextract_resume_data(self, file_path: str) -> dict:
+        """Async variant of extract_resume_data"""
+        return await self._arun_vision_task(EXTRACTION_TASK, file_path)
+
+    async def aanalyze_upload(self, file_path: str) -> tuple[dict, dict]:
+        """
+        Run extraction and ATS analysis concurrently.
+
+        The text layer is detected (or page images rendered) once up front so
+        both calls share it; latency is the slower of the two calls rather than
+        their sum.
+
+        Returns:
+            (extracted_data, ats_result)
+        """
+        if self.async_client:
+            await asyncio.to_thread(self._prepare_pages, file_path)
+
+        mode = settings.ATS_SCORING_MODE
+        if mode == "local":
+            extracted_data = await self.aextract_resume_data(file_path)
+            if self._ats_mode(mode, extracted_data) == "local":
+                return extracted_data, score_resume(extracted_data)
+            return extracted_data, await self.aanalyze_resume_ats(file_path)
+
+        # The ATS call (full or subjective-only) does not need the extraction
+        ats_task = ATS_SUBJECTIVE_TASK if mode == "hybrid" else ATS_TASK
+        extracted_data, ats_result = await asyncio.gather(
+            self.aextract_resume_data(file_path),
+            self._arun_vision_task(ats_task, file_path),
+        )
+        if ats_task is ATS_SUBJECTIVE_TASK:
+            if self._ats_mode(mode, extracted_data) == "hybrid":
+                ats_result = merge_subjective(score_resume(extracted_data), ats_result)
+            else:
+                ats_result = await self.aanalyze_resume_ats(file_path)
+        return extracted_data, ats_result
+
+    def analyze_upload(self, file_path: str) -> tuple[dict, dict]:
+        """Blocking wrapper around aanalyze_upload for worker threads"""
+        return self.run_async(self.aanalyze_upload(file_path))
+
+    def analyze_resume_full(self, file_path: str) -> dict:
+        """
+        Run extraction, ATS scoring and suggestions in a single VLM call.
+
+        The combined reply is split into the same shapes returned by
+        extract_resume_data, analyze_resume_ats and get_resume_suggestions.
+        Any part that is missing or fails to parse is produced by the
+        matching per-task call instead.
+
+        Returns:
+            dict with extracted_data, ats, suggestions and fallback (list of
+            tasks that needed a per-task call)
+        """
+        if not self.client:
             return {
-                "suggestions": [],
-                "overall_impression": f"Error: {str(e)}",
-                "top_priority": "Fix the error and try again",
+                "extracted_data": self.extract_resume_data(file_path),
+                "ats": self.analyze_resume_ats(file_path),
+                "suggestions": self.get_resume_suggestions(file_path),
+                "fallback": [],
             }
 
+        task = FULL_ANALYSIS_TASK
+        path, model, text_pages = self._select_path(file_path)
+        cache_key = self._cache_key(task.cache_namespace, file_path, model, task.prompt)
+        result = self._cache_get(task.name, cache_key)
+
+        if result is None:
+            result = {}
+            try:
+                request = self._task_request(task, file_path, text_pages)
+                logger.info(f"Calling {model} ({path} path) for full analysis...")
+                started = time.perf_counter()
+                response = self._complete(request, task.deadline_seconds, task.priority)
+                self._log_usage("Full analysis", response, started, path)
+
+                result = self._parse_json_response(
+                    response.choices[0].message.content or ""
+                )
+            except Exception as e:
+                logger.error(f"Full analysis failed: {e}")
+
+        extracted_data = result.get("extracted_data")
+        ats = result.get("ats")
+        suggestions = result.get("suggestions")
+        fallback = []
+        if result.get("partial"):
+            # A cut-off combined reply may have cut off any of its sections
+            for section in (extracted_data, ats, suggestions):
+                if isinstance(section, dict):
+                    section["partial"] = True
+
+        if isinstance(extracted_data, dict) and isinstance(
+            extracted_data.get("contact"), dict
+        ):
+            extracted_data["extraction_version"] = EXTRACTION_VERSION
+            extracted_data["prompt_signature"] = prompt_signature(task.prompt)
+            extracted_data.setdefault("extracted_at", datetime.utcnow().isoformat())
+        else:
+            fallback.append("extraction")
+            extracted_data = self.extract_resume_data(file_path)
+
+        if isinstance(ats, dict) and "score" in ats:
+            try:
+                ats["score"] = max(0, min(100, int(ats["score"])))
+            except (TypeError, ValueError):
+                ats = None
+        if not (isinstance(ats, dict) and "score" in ats):
+            fallback.append("ats")
+            ats = self.analyze_resume_ats(file_path)
+
+        if not (
+            isinstance(suggestions, dict)
+            and isinstance(suggestions.get("suggestions"), list)
+        ):
+            fallback.append("suggestions")
+            suggestions = self.get_resume_suggestions(file_path)
+
+        for section in (extracted_data, ats, suggestions):
+            section.setdefault("analysis_path", path)
+
+        if fallback:
+            logger.warning(f"Full analysis fell back to per-task calls for: {fallback}")
+        elif cache_key and not result.get("partial"):
+            ai_cache.set(
+                cache_key,
+                {
+                    "extracted_data": extracted_data,
+                    "ats": ats,
+                    "suggestions": suggestions,
+                },
+            )
+            # Seed the per-task entries so later /suggestions, /extracted and
+            # /ats calls on the same file are served from the cache
+            for part, value in (
+                (EXTRACTION_TASK, extracted_data),
+                (ATS_TASK, ats),
+                (SUGGESTIONS_TASK, suggestions),
+            ):
+                task_key = self._cache_key(
+                    part.cache_namespace, file_path, model, part.prompt
+                )
+                if task_key:
+                    ai_cache.set(task_key, value)
+
+        # Rule-based modes rescore from the extraction; hybrid keeps the
+        # model's formatting view and feedback
+        mode = self._ats_mode(None, extracted_data)
+        if mode != "llm":
+            local = score_resume(extracted_data)
+            ats = local if mode == "local" else merge_subjective(local, ats)
+
+        return {
+            "extracted_data": extracted_data,
+            "ats": ats,
+            "suggestions": suggestions,
+            "fallback": fallback,
+        }
+
     def generate_text(
         self, system_prompt: str, user_message: str, image_path: str | None = None
     ) -> str:
@@ -344,31 +1191,32 @@ class AIService:
             Generated text response
         """
         if not self.client:
-            return "AI service not configured. Set NEBIUS_API_KEY in .env"
+            return NOT_CONFIGURED
 
         try:
             # Build user content
             if image_path:
-                base64_images = self._file_to_base64_images(image_path)
+                image_urls = self._file_to_image_urls(image_path)
                 content = [{"type": "text", "text": user_message}]
-                for b64_img in base64_images:
-                    content.append({
-                        "type": "image_url",
-                        "image_url": {"url": f"data:image/png;base64,{b64_img}"},
-                    })
+                for url in image_urls:
+                    content.append({"type": "image_url", "image_url": {"url": url}})
             else:
                 content = user_message
 
             # Use VLM if image provided, otherwise LLM
-            model = settings.NEBIUS_VLM_MODEL if image_path else settings.NEBIUS_LLM_MODEL
-            response = self.client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": content},
-                ],
-                max_tokens=2000,
-                temperature=0.7,
+            model = (
+                settings.NEBIUS_VLM_MODEL if image_path else settings.NEBIUS_LLM_MODEL
+            )
+            response = self._complete(
+                {
+                    "model": model,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": content},
+                    ],
+                    "max_tokens": 2000,
+                    "temperature": 0.7,
+                }
             )
 
             return response.choices[0].message.content or ""
@@ -376,93 +1224,103 @@ class AIService:
         except Exception as e:
             return f"Error: {str(e)}"
 
-    def extract_resume_data(self, file_path: str) -> dict:
+    def _fill_template_request(
+        self, extracted_data: dict, template_schema: dict, unresolved: list[dict]
+    ) -> dict:
         """
-        Extract structured data from a resume.
+        Build chat completion arguments for the fields the mapper left open
 
-        Returns:
-            dict with all extracted resume data (contact, experience, education, etc.)
+        Only the extracted sections the schema references are sent, without
+        empty values or metadata, as compact JSON.
         """
-        if not self.client:
-            return {
-                "error": "AI service not configured. Set NEBIUS_API_KEY in .env",
-                "contact": {"full_name": "", "email": "", "phone": "", "location": ""},
-                "summary": "",
-                "work_experience": [],
-                "education": [],
-                "technical_skills": [],
-                "soft_skills": [],
-                "skills_by_category": {},
-                "projects": [],
-                "certifications": [],
-                "languages": [],
-                "publications": [],
-                "awards": [],
-                "volunteer": [],
-                "interests": [],
-            }
+        full_data = json.dumps(extracted_data, indent=2)
+        if settings.TEMPLATE_FILL_PRUNE:
+            data = compact_json(prune_for_template(extracted_data, template_schema))
+            fields = compact_json(unresolved)
+        else:
+            data = full_data
+            fields = json.dumps(unresolved, indent=2)
+        with self._stats_lock:
+            self._fill_chars["data_chars"] += len(data)
+            self._fill_chars["full_data_chars"] += len(full_data)
 
-        try:
-            logger.info(f"Extracting data from: {file_path}")
-            # Convert file to base64 images
-            base64_images = self._file_to_base64_images(file_path)
-            logger.info(f"Converted to {len(base64_images)} image(s)")
-
-            # Build message content with images
-            content = [{"type": "text", "text": "Extract all information from this resume:"}]
-            for b64_img in base64_images:
-                content.append({
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{b64_img}"},
-                })
-
-            logger.info(f"Calling VLM ({settings.NEBIUS_VLM_MODEL}) for extraction...")
-            # Call Nebius API
-            response = self.client.chat.completions.create(
-                model=settings.NEBIUS_VLM_MODEL,
-                messages=[
-                    {"role": "system", "content": RESUME_EXTRACTION_PROMPT},
-                    {"role": "user", "content": content},
-                ],
-                max_tokens=4000,
-                temperature=0.2,  # Lower temperature for more consistent extraction
-            )
-            logger.info("Extraction complete, parsing response...")
+        user_message = f"""
+EXTRACTED RESUME DATA:
+{data}
 
-            # Parse response
-            result = self._parse_json_response(response.choices[0].message.content or "")
+REMAINING TEMPLATE FIELDS:
+{fields}
 
-            # Add extraction metadata
-            from datetime import datetime
-            result["extraction_version"] = "1.0"
-            result["extracted_at"] = datetime.utcnow().isoformat()
+Return only the JSON object of field path to value.
+"""
+        return {
+            "model": settings.NEBIUS_LLM_MODEL,
+            "messages": [
+                {"role": "system", "content": TEMPLATE_FILL_PROMPT},
+                {"role": "user", "content": user_message},
+            ],
+            "max_tokens": 1000,
+            "temperature": 0.3,
+        }
+
+    def _fill_template_result(
+        self, template_schema: dict, mapping: TemplateMapping, llm_fields: int
+    ) -> dict:
+        """Wrap the filled data with template and mapping metadata"""
+        return {
+            "template_id": template_schema.get("template_id", ""),
+            "filled_at": datetime.utcnow().isoformat(),
+            "data": mapping.data,
+            "mapping": {
+                "local_fields": mapping.mapped,
+                "llm_fields": llm_fields,
+                "leftovers": [field["path"] for field in mapping.unresolved],
+            },
+        }
+
+    def _apply_leftover_reply(self, mapping: TemplateMapping, text: str) -> int:
+        """Merge the model's values for unresolved fields; returns fields filled"""
+        values = self._parse_json_response(text)
+        if values.get("error"):
+            raise ValueError(
+                f"Could not parse leftover template fields: {values['error']}"
+            )
+        return apply_leftovers(mapping, values)
 
-            return result
+    def _fill_cache_key(self, extracted_data: dict, template_schema: dict) -> str:
+        """
+        Cache key for a template fill
 
-        except Exception as e:
-            logger.error(f"Extraction failed: {e}")
-            return {
-                "error": str(e),
-                "contact": {"full_name": "", "email": "", "phone": "", "location": ""},
-                "summary": "",
-                "work_experience": [],
-                "education": [],
-                "technical_skills": [],
-                "soft_skills": [],
-                "skills_by_category": {},
-                "projects": [],
-                "certifications": [],
-                "languages": [],
-                "publications": [],
-                "awards": [],
-                "volunteer": [],
-                "interests": [],
-            }
+        Built from the extracted data hash (which changes on every
+        re-extraction), the normalized schema hash, the LLM model and the
+        prompt and mapper versions.
+        """
+        schema_hash = hash_json(normalize_schema(template_schema))
+        return template_cache.make_key(
+            f"fill-v{TEMPLATE_MAPPER_VERSION}:{schema_hash}",
+            hash_json(extracted_data),
+            settings.NEBIUS_LLM_MODEL,
+            TEMPLATE_FILL_PROMPT,
+        )
+
+    def _fill_cache_get(self, cache_key: str, template_schema: dict) -> dict | None:
+        cached = template_cache.get(cache_key)
+        if cached is not None:
+            logger.info(
+                f"Template cache hit for '{template_schema.get('template_id')}' "
+                f"({cache_key[:12]})"
+            )
+        return cached
 
     def fill_template(self, extracted_data: dict, template_schema: dict) -> dict:
         """
         Map extracted resume data to fill a template's fields.
 
+        Fields are mapped locally by rules (see template_mapper); only fields
+        no rule could fill are sent to the LLM. Without an AI client the
+        locally mapped data is returned as is. Complete fills are cached
+        until the extracted data or the schema changes.
+
         Args:
             extracted_data: The extracted resume data JSON
             template_schema: The template's field schema
@@ -470,51 +1328,97 @@ class AIService:
         Returns:
             dict with filled template data
         """
+        cache_key = self._fill_cache_key(extracted_data, template_schema)
+        cached = self._fill_cache_get(cache_key, template_schema)
+        if cached is not None:
+            return cached
+
+        mapping = map_template(extracted_data, template_schema)
+        llm_fields = 0
+        complete = True
+        if mapping.unresolved:
+            complete = False
+            if self.client:
+                try:
+                    request = self._fill_template_request(
+                        extracted_data, template_schema, mapping.unresolved
+                    )
+                    logger.info(
+                        f"Filling {len(mapping.unresolved)} unmapped field(s) of "
+                        f"template '{template_schema.get('template_id')}' using LLM "
+                        f"({settings.NEBIUS_LLM_MODEL})..."
+                    )
+                    started = time.perf_counter()
+                    response = self._complete(
+                        request, FILL_DEADLINE_SECONDS, Priority.INTERACTIVE
+                    )
+                    self._log_usage("Template fill", response, started, FILL_PATH)
+                    llm_fields = self._apply_leftover_reply(
+                        mapping, response.choices[0].message.content or ""
+                    )
+                    complete = True
+                except Exception as e:
+                    # The locally mapped fields are still useful
+                    logger.error(f"Template filling failed: {e}")
+
+        result = self._fill_template_result(template_schema, mapping, llm_fields)
+        if complete:
+            template_cache.set(cache_key, result)
+        return result
+
+    def stream_fill_template(
+        self, extracted_data: dict, template_schema: dict
+    ) -> Iterator[StreamEvent]:
+        """
+        Streaming variant of fill_template
+
+        The locally mapped data is sent at once as a partial event; deltas
+        then stream the LLM reply for any unresolved fields.
+        """
+        cache_key = self._fill_cache_key(extracted_data, template_schema)
+        cached = self._fill_cache_get(cache_key, template_schema)
+        if cached is not None:
+            yield "result", cached
+            return
+
+        mapping = map_template(extracted_data, template_schema)
+        if not mapping.unresolved:
+            result = self._fill_template_result(template_schema, mapping, 0)
+            template_cache.set(cache_key, result)
+            yield "result", result
+            return
         if not self.client:
-            return {
-                "error": "AI service not configured. Set NEBIUS_API_KEY in .env",
-                "data": {},
-            }
+            yield "result", self._fill_template_result(template_schema, mapping, 0)
+            return
 
+        yield "partial", {"data": mapping.data}
         try:
-            user_message = f"""
-EXTRACTED RESUME DATA:
-{json.dumps(extracted_data, indent=2)}
-
-TEMPLATE SCHEMA:
-{json.dumps(template_schema, indent=2)}
-
-Map the extracted data to fill the template fields. Return only the filled data JSON.
-"""
-
-            logger.info(f"Filling template '{template_schema.get('template_id')}' using LLM ({settings.NEBIUS_LLM_MODEL})...")
-            response = self.client.chat.completions.create(
-                model=settings.NEBIUS_LLM_MODEL,
-                messages=[
-                    {"role": "system", "content": TEMPLATE_FILL_PROMPT},
-                    {"role": "user", "content": user_message},
-                ],
-                max_tokens=4000,
-                temperature=0.3,
+            request = self._fill_template_request(
+                extracted_data, template_schema, mapping.unresolved
             )
-            logger.info("Template filling complete")
-
-            result = self._parse_json_response(response.choices[0].message.content or "")
-
-            # Add metadata
-            from datetime import datetime
-            return {
-                "template_id": template_schema.get("template_id", ""),
-                "filled_at": datetime.utcnow().isoformat(),
-                "data": result,
-            }
-
+            logger.info(
+                f"Streaming {len(mapping.unresolved)} unmapped field(s) of template "
+                f"'{template_schema.get('template_id')}' using LLM "
+                f"({settings.NEBIUS_LLM_MODEL})..."
+            )
+            # Partial leftovers are keyed by field path, not template data
+            text = yield from self._stream_completion(
+                "Template fill",
+                request,
+                FILL_PATH,
+                partials=False,
+                deadline_seconds=FILL_DEADLINE_SECONDS,
+                priority=Priority.INTERACTIVE,
+            )
+            llm_fields = self._apply_leftover_reply(mapping, text)
         except Exception as e:
             logger.error(f"Template filling failed: {e}")
-            return {
-                "error": str(e),
-                "data": {},
-            }
+            yield "result", self._fill_template_result(template_schema, mapping, 0)
+            return
+
+        result = self._fill_template_result(template_schema, mapping, llm_fields)
+        template_cache.set(cache_key, result)
+        yield "result", result
 
 
 # Singleton instance
@@ -0,0 +1,418 @@
+"""Deterministic ATS scoring computed from extracted resume data"""
+
+import re
+from typing import Any
+
+# Category maxima, matching ATS_SYSTEM_PROMPT
+MAX_POINTS = {
+    "contact_info": 10,
+    "summary": 10,
+    "experience": 25,
+    "skills": 15,
+    "education": 10,
+    "formatting": 15,
+    "keywords": 15,
+}
+
+# Categories that need a look at the rendered resume; in hybrid mode the
+# model scores these and writes the strengths/improvements
+SUBJECTIVE_CATEGORIES = ("formatting",)
+
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+PHONE_DIGITS_RE = re.compile(r"\d")
+QUANTIFIED_RE = re.compile(r"\d|%|\$|€|£")
+DATE_PATTERNS = {
+    "month_year": re.compile(r"^[A-Za-z]{3,9}\.? \d{4}$"),
+    "numeric": re.compile(r"^\d{1,2}/\d{4}$"),
+    "iso": re.compile(r"^\d{4}-\d{2}$"),
+    "year": re.compile(r"^\d{4}$"),
+}
+CURRENT_DATES = {"present", "current", "now", "ongoing"}
+
+ACTION_VERBS = {
+    "achieved",
+    "analyzed",
+    "architected",
+    "automated",
+    "built",
+    "collaborated",
+    "combined",
+    "created",
+    "cut",
+    "decreased",
+    "delivered",
+    "deployed",
+    "designed",
+    "developed",
+    "directed",
+    "drove",
+    "engineered",
+    "established",
+    "expanded",
+    "generated",
+    "grew",
+    "implemented",
+    "improved",
+    "increased",
+    "initiated",
+    "introduced",
+    "launched",
+    "led",
+    "managed",
+    "mentored",
+    "migrated",
+    "negotiated",
+    "optimized",
+    "orchestrated",
+    "organized",
+    "oversaw",
+    "owned",
+    "pioneered",
+    "planned",
+    "produced",
+    "published",
+    "rebuilt",
+    "redesigned",
+    "reduced",
+    "refactored",
+    "resolved",
+    "saved",
+    "scaled",
+    "shipped",
+    "simplified",
+    "spearheaded",
+    "streamlined",
+    "supervised",
+    "taught",
+    "trained",
+    "transformed",
+    "wrote",
+}
+
+
+def _text(value: Any) -> str:
+    return value.strip() if isinstance(value, str) else ""
+
+
+def _items(value: Any) -> list:
+    return value if isinstance(value, list) else []
+
+
+def _words(text: str) -> int:
+    return len(text.split())
+
+
+def _ratio(part: int, whole: int) -> float:
+    return part / whole if whole else 0.0
+
+
+def _skills(data: dict) -> list[str]:
+    """Technical skills from the flat list and every category, de-duplicated"""
+    seen: dict[str, str] = {}
+    categories = data.get("skills_by_category")
+    grouped = categories.values() if isinstance(categories, dict) else []
+    for skill in [
+        *_items(data.get("technical_skills")),
+        *(s for g in grouped for s in _items(g)),
+    ]:
+        name = _text(skill)
+        if name:
+            seen.setdefault(name.lower(), name)
+    return list(seen.values())
+
+
+def _bullets(data: dict) -> list[str]:
+    bullets = []
+    for role in _items(data.get("work_experience")):
+        if isinstance(role, dict):
+            bullets.extend(
+                _text(b) for b in _items(role.get("bullet_points")) if _text(b)
+            )
+    return bullets
+
+
+def _date_style(value: str) -> str | None:
+    if value.lower() in CURRENT_DATES:
+        return "current"
+    for style, pattern in DATE_PATTERNS.items():
+        if pattern.match(value):
+            return style
+    return None
+
+
+def score_contact(data: dict, notes: dict) -> float:
+    contact = data.get("contact") if isinstance(data.get("contact"), dict) else {}
+    points = 0.0
+    if _text(contact.get("full_name")):
+        points += 3
+    else:
+        notes["improvements"].append("Add your full name at the top of the resume")
+    if EMAIL_RE.match(_text(contact.get("email"))):
+        points += 3
+    else:
+        notes["improvements"].append("Add a valid email address")
+    if len(PHONE_DIGITS_RE.findall(_text(contact.get("phone")))) >= 7:
+        points += 2
+    else:
+        notes["improvements"].append("Add a phone number")
+    if any(_text(contact.get(key)) for key in ("linkedin", "github", "portfolio")):
+        points += 2
+    else:
+        notes["improvements"].append("Link your LinkedIn profile, GitHub or portfolio")
+    if points == MAX_POINTS["contact_info"]:
+        notes["strengths"].append("Complete contact information")
+    return points
+
+
+def score_summary(data: dict, notes: dict) -> float:
+    words = _words(_text(data.get("summary")))
+    if not words:
+        notes["missing_sections"].append("Professional Summary")
+        notes["improvements"].append("Add a 2-4 sentence professional summary")
+        return 0
+    if 30 <= words <= 80:
+        notes["strengths"].append("Concise professional summary")
+        return 10
+    if words < 15:
+        notes["improvements"].append("Expand the summary to 30-80 words")
+        return 4
+    if words < 30:
+        return 7
+    notes["improvements"].append("Tighten the summary to under 80 words")
+    return 7 if words <= 120 else 5
+
+
+def score_experience(data: dict, notes: dict) -> float:
+    roles = [r for r in _items(data.get("work_experience")) if isinstance(r, dict)]
+    if not roles:
+        notes["missing_sections"].append("Work Experience")
+        notes["improvements"].append("Add work experience with measurable achievements")
+        return 0
+
+    points = 5.0
+    complete = sum(
+        1
+        for role in roles
+        if _text(role.get("job_title"))
+        and _text(role.get("company"))
+        and _text(role.get("start_date"))
+    )
+    points += 6 * _ratio(complete, len(roles))
+    if complete < len(roles):
+        notes["improvements"].append("Give every role a title, company and dates")
+
+    bullets = _bullets(data)
+    points += 5 * min(1.0, _ratio(len(bullets), 3 * len(roles)))
+    if len(bullets) < 3 * len(roles):
+        notes["improvements"].append("List at least three achievements per role")
+
+    quantified = sum(1 for b in bullets if QUANTIFIED_RE.search(b))
+    points += 5 * min(1.0, _ratio(quantified, len(bullets)) * 2)
+    if bullets and _ratio(quantified, len(bullets)) >= 0.5:
+        notes["strengths"].append("Achievements are backed by numbers")
+    elif bullets:
+        notes["improvements"].append(
+            "Quantify achievements with numbers, percentages or amounts"
+        )
+
+    action = sum(
+        1 for b in bullets if b.split()[0].lower().strip(".,;:-•*") in ACTION_VERBS
+    )
+    points += 4 * _ratio(action, len(bullets))
+    if bullets and _ratio(action, len(bullets)) >= 0.7:
+        notes["strengths"].append("Bullets start with strong action verbs")
+    elif bullets:
+        notes["improvements"].append(
+            "Start bullets with action verbs (led, built, improved)"
+        )
+    return points
+
+
+def score_skills(data: dict, notes: dict) -> float:
+    skills = _skills(data)
+    soft = [s for s in _items(data.get("soft_skills")) if _text(s)]
+    if not skills and not soft:
+        notes["missing_sections"].append("Skills")
+        notes["improvements"].append("Add a skills section")
+        return 0
+
+    points = 9 * min(1.0, len(skills) / 10) + min(3, len(soft))
+    categories = data.get("skills_by_category")
+    if (
+        isinstance(categories, dict)
+        and sum(1 for g in categories.values() if _items(g)) >= 2
+    ):
+        points += 3
+    elif skills:
+        notes["improvements"].append("Group skills into categories")
+    if len(skills) >= 10:
+        notes["strengths"].append("Broad technical skill set")
+    elif len(skills) < 5:
+        notes["improvements"].append("List more of your relevant technical skills")
+    return points
+
+
+def score_education(data: dict, notes: dict) -> float:
+    entries = [e for e in _items(data.get("education")) if isinstance(e, dict)]
+    if not entries:
+        notes["missing_sections"].append("Education")
+        return 2 if _items(data.get("certifications")) else 0
+
+    points = 6.0
+    if all(_text(e.get("degree")) and _text(e.get("institution")) for e in entries):
+        points += 2
+    if all(_text(e.get("end_date")) or _text(e.get("start_date")) for e in entries):
+        points += 1
+    if _items(data.get("certifications")) or any(
+        _text(e.get("gpa"))
+        or _items(e.get("honors"))
+        or _items(e.get("relevant_coursework"))
+        for e in entries
+    ):
+        points += 1
+    return points
+
+
+def score_formatting(data: dict, notes: dict) -> float:
+    """
+    Structural proxy for formatting: standard sections, consistent dates and
+    bullet lengths. Visual layout needs the model (hybrid mode).
+    """
+    points = 0.0
+    sections = ["contact", "work_experience", "education"]
+    present = sum(1 for key in sections if data.get(key)) + (1 if _skills(data) else 0)
+    points += 4 * present / (len(sections) + 1)
+
+    # Dates must follow one style within each section (year-only education
+    # next to "Jan 2020" experience is fine)
+    consistent = True
+    for key in ("work_experience", "education"):
+        dates = [
+            _text(entry.get(k))
+            for entry in _items(data.get(key))
+            if isinstance(entry, dict)
+            for k in ("start_date", "end_date")
+        ]
+        styles = {_date_style(d) for d in dates if d} - {"current"}
+        consistent &= len(styles) <= 1 and None not in styles
+    if consistent:
+        points += 5
+    else:
+        notes["improvements"].append("Use one date format throughout (e.g. Jan 2020)")
+
+    bullets = _bullets(data)
+    if bullets:
+        average = sum(_words(b) for b in bullets) / len(bullets)
+        if 8 <= average <= 30:
+            points += 4
+        else:
+            notes["improvements"].append("Keep bullets to one or two lines")
+    roles = [r for r in _items(data.get("work_experience")) if isinstance(r, dict)]
+    if not any(_words(_text(r.get("description"))) > 80 for r in roles):
+        points += 2
+    return points
+
+
+def score_keywords(data: dict, notes: dict) -> float:
+    """Skills backed by experience or projects, and the breadth of terms used"""
+    skills = _skills(data)
+    roles = [r for r in _items(data.get("work_experience")) if isinstance(r, dict)]
+    projects = [p for p in _items(data.get("projects")) if isinstance(p, dict)]
+
+    context = " ".join(
+        [_text(r.get("description")) for r in roles + projects]
+        + [_text(b) for e in roles + projects for b in _items(e.get("bullet_points"))]
+        + [_text(t) for e in roles + projects for t in _items(e.get("technologies"))]
+    ).lower()
+    backed = sum(
+        1 for s in skills if re.search(rf"(?<!\w){re.escape(s.lower())}(?!\w)", context)
+    )
+    points = 8 * _ratio(backed, len(skills))
+    if skills and _ratio(backed, len(skills)) < 0.5:
+        notes["improvements"].append(
+            "Mention your key skills in experience and project bullets"
+        )
+
+    if any(_items(r.get("technologies")) for r in roles):
+        points += 3
+    terms = {s.lower() for s in skills} | {
+        _text(t).lower()
+        for e in roles + projects
+        for t in _items(e.get("technologies"))
+    }
+    terms.discard("")
+    points += 4 * min(1.0, len(terms) / 15)
+    if points >= 12:
+        notes["strengths"].append("Keywords are used in context")
+    return points
+
+
+SCORERS = {
+    "contact_info": score_contact,
+    "summary": score_summary,
+    "experience": score_experience,
+    "skills": score_skills,
+    "education": score_education,
+    "formatting": score_formatting,
+    "keywords": score_keywords,
+}
+
+
+def score_resume(data: dict) -> dict:
+    """
+    Score extracted resume data in the ATS result format
+
+    Returns the same shape as AIService.analyze_resume_ats; identical input
+    always produces the identical score.
+    """
+    notes: dict[str, list[str]] = {
+        "strengths": [],
+        "improvements": [],
+        "missing_sections": [],
+    }
+    breakdown = {
+        category: round(min(MAX_POINTS[category], scorer(data, notes)))
+        for category, scorer in SCORERS.items()
+    }
+    return {
+        "score": sum(breakdown.values()),
+        "breakdown": breakdown,
+        "strengths": notes["strengths"][:5],
+        "improvements": notes["improvements"][:5],
+        "missing_sections": notes["missing_sections"],
+        "scoring": "local",
+    }
+
+
+def merge_subjective(local: dict, subjective: dict) -> dict:
+    """
+    Combine a local score with the model's view of the subjective categories
+
+    Categories in SUBJECTIVE_CATEGORIES and the strengths/improvements come
+    from the model; everything else stays deterministic. A failed model
+    result leaves the local score unchanged.
+    """
+    if subjective.get("error"):
+        return local
+
+    breakdown = dict(local["breakdown"])
+    source = subjective.get("breakdown", subjective)
+    for category in SUBJECTIVE_CATEGORIES:
+        try:
+            value = int(source[category])
+        except (KeyError, TypeError, ValueError):
+            continue
+        breakdown[category] = max(0, min(MAX_POINTS[category], value))
+
+    def combined(key: str) -> list[str]:
+        items = [i for i in _items(subjective.get(key)) if isinstance(i, str)]
+        return list(dict.fromkeys(items + local[key]))[:5]
+
+    return {
+        **local,
+        "score": sum(breakdown.values()),
+        "breakdown": breakdown,
+        "strengths": combined("strengths"),
+        "improvements": combined("improvements"),
+        "scoring": "hybrid",
+    }
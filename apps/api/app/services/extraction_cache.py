@@ -0,0 +1,100 @@
+"""In-process LRU cache of parsed extracted resume data"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from app.core.config import settings
+
+
+class ExtractionCache:
+    """
+    Keeps the latest extracted data of recently used resumes in memory, so
+    repeated /extracted and template fill requests skip loading and decoding
+    the JSON column.
+
+    Entries are keyed by resume id and remember the ResumeExtraction id they
+    were loaded from; a lookup with any other id is a miss, so a new
+    extraction is never shadowed by a stale entry, even one cached by another
+    request before the new row was committed. Least recently used entries are
+    evicted once the total size (measured as compact JSON) exceeds
+    ``max_bytes``.
+
+    Cached dicts are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_bytes: int, enabled: bool = True) -> None:
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._entries: OrderedDict[int, tuple[int, dict[str, Any], int]] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, resume_id: int, extraction_id: int) -> dict[str, Any] | None:
+        """Cached data for a resume if it was loaded from extraction_id"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(resume_id)
+            if entry is None or entry[0] != extraction_id:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(resume_id)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, resume_id: int, extraction_id: int, data: dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        size = len(json.dumps(data, separators=(",", ":"), ensure_ascii=False))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._pop(resume_id)
+            self._entries[resume_id] = (extraction_id, data, size)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._pop(oldest)
+                self.evictions += 1
+
+    def invalidate(self, resume_id: int) -> None:
+        """Drop a resume's entry (after re-extraction, upload or deletion)"""
+        with self._lock:
+            self._pop(resume_id)
+
+    def _pop(self, resume_id: int) -> None:
+        entry = self._entries.pop(resume_id, None)
+        if entry is not None:
+            self._total_bytes -= entry[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and current cache size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Singleton instance
+extraction_cache = ExtractionCache(
+    max_bytes=settings.EXTRACTION_CACHE_MAX_BYTES,
+    enabled=settings.EXTRACTION_CACHE_ENABLED,
+)
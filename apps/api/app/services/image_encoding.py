@@ -0,0 +1,154 @@
+"""Encoding of rendered resume pages into VLM image payloads"""
+
+import base64
+import io
+import logging
+from dataclasses import dataclass, replace
+
+from PIL import Image
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Lossy encoders accept a quality setting; PNG is always lossless
+LOSSY_FORMATS = {"JPEG", "WEBP"}
+MIME_TYPES = {"PNG": "image/png", "JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+# Limits when shrinking pages to fit a byte budget
+MIN_QUALITY = 40
+MIN_LONG_EDGE = 800
+
+
+@dataclass(frozen=True)
+class EncodingProfile:
+    """How pages are rasterized and encoded before being sent to the VLM"""
+
+    name: str = "custom"
+    dpi: int = 200  # PDF rasterization DPI
+    max_edge: int = 0  # Cap on the longer side in pixels (0 = no cap)
+    format: str = "PNG"  # PNG, JPEG or WEBP
+    quality: int = 85  # JPEG/WebP quality 1-100
+    grayscale: bool = False
+    colors: int = 0  # Palette size for quantization (0 = full color)
+    byte_budget: int = 0  # Max total base64 bytes per request (0 = unlimited)
+
+    @property
+    def mime_type(self) -> str:
+        return MIME_TYPES[self.format]
+
+    @property
+    def tag(self) -> str:
+        """Identifies the encoding so stored pages can be re-used safely"""
+        return (
+            f"{self.format}-{self.dpi}dpi-{self.max_edge}px-q{self.quality}"
+            f"-{'gray' if self.grayscale else 'rgb'}-c{self.colors}-b{self.byte_budget}"
+        )
+
+
+# Named profiles used by the encoding benchmark
+PROFILES = {
+    "lossless": EncodingProfile(name="lossless", dpi=200, format="PNG"),
+    "balanced": EncodingProfile(
+        name="balanced", dpi=150, max_edge=2000, format="JPEG", quality=85
+    ),
+    "compact": EncodingProfile(
+        name="compact", dpi=120, max_edge=1600, format="WEBP", quality=75
+    ),
+    "grayscale": EncodingProfile(
+        name="grayscale",
+        dpi=150,
+        max_edge=1600,
+        format="PNG",
+        grayscale=True,
+        colors=16,
+    ),
+}
+
+
+def profile_from_settings() -> EncodingProfile:
+    """Build the active encoding profile from VLM_IMAGE_* settings"""
+    image_format = settings.VLM_IMAGE_FORMAT.upper()
+    if image_format == "JPG":
+        image_format = "JPEG"
+    if image_format not in MIME_TYPES:
+        raise ValueError(f"Unsupported VLM_IMAGE_FORMAT: {settings.VLM_IMAGE_FORMAT}")
+
+    return EncodingProfile(
+        name="settings",
+        dpi=settings.VLM_IMAGE_DPI,
+        max_edge=settings.VLM_IMAGE_MAX_EDGE,
+        format=image_format,
+        quality=settings.VLM_IMAGE_QUALITY,
+        grayscale=settings.VLM_IMAGE_GRAYSCALE,
+        colors=settings.VLM_IMAGE_COLORS,
+        byte_budget=settings.VLM_IMAGE_BYTE_BUDGET,
+    )
+
+
+def prepare_image(image: Image.Image, profile: EncodingProfile) -> Image.Image:
+    """Resize and convert a page according to the profile"""
+    if profile.max_edge and max(image.size) > profile.max_edge:
+        image = image.copy()
+        image.thumbnail((profile.max_edge, profile.max_edge), Image.LANCZOS)
+
+    if profile.grayscale:
+        image = image.convert("L")
+    elif image.mode not in ("RGB", "L"):
+        # JPEG has no alpha channel; flatten everything to RGB
+        image = image.convert("RGB")
+
+    if profile.colors:
+        image = image.quantize(colors=profile.colors)
+        if profile.format in LOSSY_FORMATS:
+            image = image.convert("L" if profile.grayscale else "RGB")
+
+    return image
+
+
+def encode_image(image: Image.Image, profile: EncodingProfile) -> bytes:
+    """Encode a prepared page to bytes in the profile's format"""
+    buffer = io.BytesIO()
+    if profile.format in LOSSY_FORMATS:
+        image.save(buffer, format=profile.format, quality=profile.quality)
+    else:
+        image.save(buffer, format=profile.format, optimize=True)
+    return buffer.getvalue()
+
+
+def to_data_url(data: bytes, profile: EncodingProfile) -> str:
+    """Wrap encoded bytes as a data URL for an image_url message part"""
+    return f"data:{profile.mime_type};base64,{base64.b64encode(data).decode('utf-8')}"
+
+
+def encode_pages(images: list[Image.Image], profile: EncodingProfile) -> list[str]:
+    """
+    Encode pages as data URLs, shrinking them to fit the profile's byte budget.
+
+    When the total payload exceeds the budget, quality is lowered first (lossy
+    formats) and then pages are downscaled, until the payload fits or the
+    quality/size floors are reached.
+    """
+    current = profile
+    while True:
+        urls = [
+            to_data_url(encode_image(prepare_image(img, current), current), current)
+            for img in images
+        ]
+        total = sum(len(url) for url in urls)
+        if not current.byte_budget or total <= current.byte_budget:
+            return urls
+
+        if current.format in LOSSY_FORMATS and current.quality > MIN_QUALITY:
+            current = replace(current, quality=max(MIN_QUALITY, current.quality - 15))
+            continue
+
+        largest = max(max(img.size) for img in images)
+        long_edge = min(current.max_edge, largest) if current.max_edge else largest
+        if long_edge <= MIN_LONG_EDGE:
+            logger.warning(
+                f"Page images ({total} bytes) exceed budget of "
+                f"{current.byte_budget} bytes"
+            )
+            return urls
+        current = replace(current, max_edge=max(MIN_LONG_EDGE, int(long_edge * 0.8)))
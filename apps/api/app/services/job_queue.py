@@ -0,0 +1,333 @@
+"""Durable background job queue backed by the application database"""
+
+import logging
+import threading
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.job import AnalysisJob
+from app.models.resume import Resume
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[str, int], None]
+JobHandler = Callable[[Session, AnalysisJob, ProgressCallback], None]
+
+
+class PermanentJobError(Exception):
+    """Raised by a job handler when retrying the job cannot succeed"""
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue with an in-process worker pool.
+
+    Jobs are rows in ``analysis_jobs``; workers claim them with a conditional
+    UPDATE so each job runs once even with several workers. Failed jobs are
+    retried with exponential backoff up to ``max_attempts``. While a job
+    runs, its worker process renews a lease on it (``updated_at``); jobs
+    whose lease has expired were left in ``running`` by a dead process and
+    are re-queued. Jobs of other live processes are left alone.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        workers: int,
+        poll_interval: float,
+        max_attempts: int,
+        retry_backoff: float,
+        lease_seconds: float,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lease_seconds = lease_seconds
+        self._handlers: dict[str, JobHandler] = {}
+        self._threads: list[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        # Ids of the jobs this process is running, for lease renewal
+        self._running: set[int] = set()
+        self._running_lock = threading.Lock()
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Register the handler that runs jobs of a given kind"""
+        self._handlers[kind] = handler
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def enqueue(
+        self,
+        db: Session,
+        resume: Resume,
+        kind: str,
+        payload: str | None = None,
+    ) -> AnalysisJob:
+        """Persist a new job and wake up an idle worker"""
+        job = AnalysisJob(
+            resume_id=resume.id,
+            user_id=resume.user_id,
+            kind=kind,
+            payload=payload,
+            max_attempts=self.max_attempts,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._wakeup.set()
+        logger.info(f"Queued {kind} job {job.id} for resume {resume.id}")
+        return job
+
+    def get_job(self, db: Session, job_id: int, user_id: int) -> AnalysisJob | None:
+        """Get a job by ID for a user"""
+        return (
+            db.query(AnalysisJob)
+            .filter(AnalysisJob.id == job_id, AnalysisJob.user_id == user_id)
+            .first()
+        )
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    def _claim_next(self, db: Session) -> AnalysisJob | None:
+        """Atomically move the oldest runnable job from queued to running"""
+        now = datetime.utcnow()
+        candidate = (
+            db.query(AnalysisJob.id)
+            .filter(
+                AnalysisJob.status == AnalysisJob.QUEUED, AnalysisJob.run_after <= now
+            )
+            .order_by(AnalysisJob.id)
+            .first()
+        )
+        if candidate is None:
+            return None
+
+        claimed = (
+            db.query(AnalysisJob)
+            .filter(
+                AnalysisJob.id == candidate.id, AnalysisJob.status == AnalysisJob.QUEUED
+            )
+            .update(
+                {
+                    AnalysisJob.status: AnalysisJob.RUNNING,
+                    AnalysisJob.stage: "starting",
+                    AnalysisJob.attempts: AnalysisJob.attempts + 1,
+                    AnalysisJob.started_at: now,
+                    AnalysisJob.updated_at: now,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if claimed != 1:
+            # Another worker got there first
+            return None
+        return db.get(AnalysisJob, candidate.id)
+
+    def run_next(self, db: Session) -> AnalysisJob | None:
+        """Claim and run one job; returns the job, or None if the queue is idle"""
+        job = self._claim_next(db)
+        if job is None:
+            return None
+
+        with self._running_lock:
+            self._running.add(job.id)
+        try:
+            self._run(db, job)
+        finally:
+            with self._running_lock:
+                self._running.discard(job.id)
+        return job
+
+    def _run(self, db: Session, job: AnalysisJob) -> None:
+        """Run a claimed job and record its outcome"""
+
+        def progress(stage: str, percent: int) -> None:
+            job.stage = stage
+            job.progress = percent
+            db.commit()
+
+        try:
+            handler = self._handlers.get(job.kind)
+            if handler is None:
+                raise PermanentJobError(f"No handler for job kind '{job.kind}'")
+            handler(db, job, progress)
+        except Exception as e:
+            db.rollback()
+            retry = (
+                not isinstance(e, PermanentJobError) and job.attempts < job.max_attempts
+            )
+            job.error = str(e)
+            if retry:
+                delay = self.retry_backoff * 2 ** (job.attempts - 1)
+                job.status = AnalysisJob.QUEUED
+                job.stage = "retrying"
+                job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+                logger.warning(
+                    f"Job {job.id} attempt {job.attempts} failed, "
+                    f"retrying in {delay:.0f}s: {e}"
+                )
+            else:
+                job.status = AnalysisJob.FAILED
+                job.stage = "failed"
+                job.finished_at = datetime.utcnow()
+                logger.error(
+                    f"Job {job.id} failed after {job.attempts} attempt(s): {e}"
+                )
+        else:
+            job.status = AnalysisJob.SUCCEEDED
+            job.stage = "completed"
+            job.progress = 100
+            job.error = None
+            job.finished_at = datetime.utcnow()
+            logger.info(f"Job {job.id} completed")
+
+        try:
+            db.commit()
+        except SQLAlchemyError as e:
+            # The resume (and its jobs) may have been deleted while running
+            db.rollback()
+            logger.warning(f"Could not record result of job {job.id}: {e}")
+
+    def heartbeat(self, db: Session) -> int:
+        """Renew the lease on the jobs this process is running"""
+        with self._running_lock:
+            job_ids = list(self._running)
+        if not job_ids:
+            return 0
+        count = (
+            db.query(AnalysisJob)
+            .filter(
+                AnalysisJob.id.in_(job_ids), AnalysisJob.status == AnalysisJob.RUNNING
+            )
+            .update(
+                {AnalysisJob.updated_at: datetime.utcnow()}, synchronize_session=False
+            )
+        )
+        db.commit()
+        return count
+
+    def recover_stale(self, db: Session) -> int:
+        """
+        Recover running jobs whose lease expired with their process
+
+        Jobs with attempts left are re-queued; a job whose worker died on its
+        last attempt is failed, so a job that keeps crashing its process is not
+        retried forever. Returns the number of jobs recovered either way.
+        """
+        now = datetime.utcnow()
+        expired = (
+            AnalysisJob.status == AnalysisJob.RUNNING,
+            AnalysisJob.updated_at < now - timedelta(seconds=self.lease_seconds),
+        )
+        failed = (
+            db.query(AnalysisJob)
+            .filter(*expired, AnalysisJob.attempts >= AnalysisJob.max_attempts)
+            .update(
+                {
+                    AnalysisJob.status: AnalysisJob.FAILED,
+                    AnalysisJob.stage: "failed",
+                    AnalysisJob.error: "Worker died while running the job",
+                    AnalysisJob.finished_at: now,
+                },
+                synchronize_session=False,
+            )
+        )
+        requeued = (
+            db.query(AnalysisJob)
+            .filter(*expired)
+            .update(
+                {AnalysisJob.status: AnalysisJob.QUEUED, AnalysisJob.stage: "requeued"},
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if failed:
+            logger.error(f"Failed {failed} interrupted job(s) out of attempts")
+        if requeued:
+            logger.info(f"Re-queued {requeued} interrupted job(s)")
+        return failed + requeued
+
+    # ------------------------------------------------------------------
+    # Worker pool
+    # ------------------------------------------------------------------
+
+    def _worker_loop(self) -> None:
+        while not self._stop.is_set():
+            job = None
+            db = self.session_factory()
+            try:
+                job = self.run_next(db)
+            except Exception as e:
+                logger.exception(f"Job worker error: {e}")
+            finally:
+                db.close()
+
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def _lease_loop(self) -> None:
+        while not self._stop.wait(self.lease_seconds / 3):
+            db = self.session_factory()
+            try:
+                self.heartbeat(db)
+                self.recover_stale(db)
+            except Exception as e:
+                logger.exception(f"Job lease renewal error: {e}")
+            finally:
+                db.close()
+
+    def start(self) -> None:
+        """Recover orphaned jobs and start the worker and lease threads"""
+        if self._threads or self.workers <= 0:
+            return
+
+        db = self.session_factory()
+        try:
+            self.recover_stale(db)
+        finally:
+            db.close()
+
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker_loop, name=f"job-worker-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        lease = threading.Thread(target=self._lease_loop, name="job-lease", daemon=True)
+        lease.start()
+        self._threads.append(lease)
+        logger.info(f"Started {self.workers} job worker(s)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Signal workers to exit and wait for in-flight jobs briefly"""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+
+# Singleton instance
+job_queue = JobQueue(
+    session_factory=SessionLocal,
+    workers=settings.JOB_WORKERS,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_backoff=settings.JOB_RETRY_BACKOFF_SECONDS,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+)
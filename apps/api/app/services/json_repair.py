@@ -0,0 +1,150 @@
+"""Tolerant parsing of JSON objects in model replies"""
+
+import json
+import threading
+from collections import Counter
+
+from app.services.partial_json import parse_partial_json
+
+# How much work a parse needed, from least to most
+CLEAN = "clean"  # valid JSON, possibly wrapped in prose or a code fence
+REPAIRED = "repaired"  # syntax fixes: trailing commas, raw newlines in strings
+TRUNCATED = "truncated"  # reply ended mid-object; complete fields recovered
+FAILED = "failed"
+REPAIR_LEVELS = (CLEAN, REPAIRED, TRUNCATED, FAILED)
+
+# Objects to try when prose before the reply contains braces
+MAX_STARTS = 3
+
+STRING_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+class _Scan:
+    """State of a single pass over one candidate object"""
+
+    def __init__(self) -> None:
+        self.out: list[str] = []
+        self.stack: list[str] = []
+        self.in_string = False
+        self.escaped = False
+        self.repaired = False
+        self.closed = False
+
+    def _drop_trailing_comma(self) -> None:
+        i = len(self.out) - 1
+        while i >= 0 and self.out[i].isspace():
+            i -= 1
+        if i >= 0 and self.out[i] == ",":
+            del self.out[i]
+            self.repaired = True
+
+    def feed(self, text: str, start: int) -> bool:
+        """
+        Copy the object starting at text[start], fixing defects on the way
+
+        Returns False on a defect that cannot be repaired (mismatched brackets).
+        """
+        for ch in text[start:]:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+                elif ch in STRING_ESCAPES:
+                    # Models sometimes put raw line breaks inside strings
+                    self.out.append(STRING_ESCAPES[ch])
+                    self.repaired = True
+                    continue
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.stack.append("}" if ch == "{" else "]")
+            elif ch in "}]":
+                if not self.stack or self.stack[-1] != ch:
+                    return False
+                self._drop_trailing_comma()
+                self.stack.pop()
+                if not self.stack:
+                    self.out.append(ch)
+                    self.closed = True
+                    return True
+            self.out.append(ch)
+        return True
+
+    def close(self) -> str:
+        """Terminate a truncated object: close the open string and containers"""
+        if self.in_string:
+            if self.escaped:
+                self.out.pop()
+            self.out.append('"')
+        text = "".join(self.out).rstrip().rstrip(",")
+        return text + "".join(reversed(self.stack))
+
+
+def _loads_object(text: str) -> dict | None:
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def parse_json_object(text: str) -> tuple[dict | None, str]:
+    """
+    Find and parse the first JSON object in a model reply
+
+    Returns (object, repair level). Well-formed replies take one json.loads;
+    otherwise a single pass over the text finds the first balanced object,
+    drops trailing commas and escapes raw line breaks in strings. A reply cut
+    off by max_tokens has its open string and containers closed, falling back
+    to the last complete field, e.g. '{"a": 1, "b": [2, 3' gives
+    {"a": 1, "b": [2, 3]}. Returns (None, "failed") if nothing is recoverable.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None, FAILED
+
+    # Fast path: one object, possibly in a code fence or surrounded by prose
+    value = _loads_object(text[start : text.rfind("}") + 1])
+    if value is not None:
+        return value, CLEAN
+
+    for _ in range(MAX_STARTS):
+        scan = _Scan()
+        if scan.feed(text, start):
+            if scan.closed:
+                value = _loads_object("".join(scan.out))
+                if value is not None:
+                    return value, REPAIRED if scan.repaired else CLEAN
+            else:
+                value = _loads_object(scan.close())
+                if value is None:
+                    value = parse_partial_json("".join(scan.out))
+                if value:
+                    return value, TRUNCATED
+        start = text.find("{", start + 1)
+        if start < 0:
+            break
+    return None, FAILED
+
+
+class ParseStats:
+    """Thread-safe count of parses per repair level"""
+
+    def __init__(self) -> None:
+        self._counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, level: str) -> None:
+        with self._lock:
+            self._counts[level] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {level: self._counts[level] for level in REPAIR_LEVELS}
+
+
+# Singleton instance
+parse_stats = ParseStats()
@@ -0,0 +1,103 @@
+"""Persistent store for rendered resume page images"""
+
+import json
+import logging
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class PageImageStore:
+    """
+    Renders an uploaded file into encoded page images once and keeps them on
+    disk next to the upload (``<file>.pages.json``), so every AI call on the
+    same file reuses the encoded pages instead of re-running poppler.
+
+    An artifact is only served while the source file's size and mtime, and the
+    encoding tag, match the ones recorded at render time.
+    """
+
+    SUFFIX = ".pages.json"
+    # Striped render locks: a fixed pool keyed by path hash, so the lock table
+    # never grows with the number of files ever rendered
+    LOCK_STRIPES = 64
+
+    def __init__(self) -> None:
+        self._locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+
+    def artifact_path(self, file_path: str | Path) -> Path:
+        """Path of the page artifact for an uploaded file"""
+        path = Path(file_path)
+        return path.with_name(path.name + self.SUFFIX)
+
+    def _lock_for(self, file_path: str) -> threading.Lock:
+        return self._locks[hash(file_path) % self.LOCK_STRIPES]
+
+    def _load(self, file_path: str, tag: str) -> list[str] | None:
+        artifact = self.artifact_path(file_path)
+        try:
+            stat = Path(file_path).stat()
+            with open(artifact) as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if (
+            data.get("source_size") != stat.st_size
+            or data.get("source_mtime_ns") != stat.st_mtime_ns
+            or data.get("tag") != tag
+        ):
+            return None
+        return data.get("pages")
+
+    def get_or_render(
+        self, file_path: str, render: Callable[[str], list[str]], tag: str = ""
+    ) -> list[str]:
+        """
+        Return stored pages for a file, rendering and persisting on first use
+
+        tag identifies how pages were encoded; a stored artifact with a
+        different tag is re-rendered.
+        """
+        pages = self._load(file_path, tag)
+        if pages is not None:
+            return pages
+
+        # Serialize rendering per file so concurrent callers render once
+        with self._lock_for(file_path):
+            pages = self._load(file_path, tag)
+            if pages is not None:
+                return pages
+
+            pages = render(file_path)
+            stat = Path(file_path).stat()
+            artifact = self.artifact_path(file_path)
+            tmp_path = artifact.with_name(artifact.name + ".tmp")
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump(
+                        {
+                            "source_size": stat.st_size,
+                            "source_mtime_ns": stat.st_mtime_ns,
+                            "tag": tag,
+                            "pages": pages,
+                        },
+                        f,
+                    )
+                tmp_path.replace(artifact)
+                logger.info(f"Stored {len(pages)} page image(s) for {file_path}")
+            except OSError as e:
+                logger.warning(f"Could not persist page images for {file_path}: {e}")
+            return pages
+
+    def invalidate(self, file_path: str | None) -> None:
+        """Remove the stored pages for a file"""
+        if not file_path:
+            return
+        self.artifact_path(file_path).unlink(missing_ok=True)
+
+
+# Singleton instance
+page_image_store = PageImageStore()
@@ -0,0 +1,81 @@
+"""Best-effort parsing of JSON objects that are still being streamed"""
+
+import json
+
+# How many cut points to try, walking back from the end of the text
+MAX_ATTEMPTS = 20
+
+
+def _closers(text: str) -> str | None:
+    """
+    Brackets needed to close every container open at the end of text
+
+    Returns None when text ends inside a string, since the cut would split a
+    key or value.
+    """
+    stack = []
+    in_string = False
+    escaped = False
+    for ch in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+    if in_string:
+        return None
+    return "".join(reversed(stack))
+
+
+def _cut_points(text: str):
+    """Candidate prefix lengths, longest first"""
+    # A trailing number or literal may still be growing ("3" of "35")
+    if not (text[-1].isalnum() or text[-1] in ".-+"):
+        yield len(text)
+    attempts = 1
+    for i in range(len(text) - 1, 0, -1):
+        if attempts >= MAX_ATTEMPTS:
+            return
+        ch = text[i]
+        if ch == ",":
+            attempts += 1
+            yield i
+        elif ch in '}]"':
+            attempts += 1
+            yield i + 1
+
+
+def parse_partial_json(text: str) -> dict | None:
+    """
+    Parse the complete part of a streamed JSON object
+
+    The text is cut back to the last point where every value is complete and
+    the open objects and arrays are closed, e.g. '{"a": 1, "b": [2, 3' gives
+    {"a": 1, "b": [2]}. Leading prose or markdown fences are skipped. Returns
+    None while no key/value pair is complete yet.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    text = text[start:]
+
+    for end in _cut_points(text):
+        candidate = text[:end].rstrip().rstrip(",")
+        closers = _closers(candidate)
+        if closers is None:
+            continue
+        try:
+            value = json.loads(candidate + closers)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, dict) and value:
+            return value
+    return None
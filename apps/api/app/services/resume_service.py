@@ -1,13 +1,36 @@
+import base64
 import json
 import logging
+import os
+import time
+from collections.abc import Iterator
 from datetime import datetime, timedelta
 from pathlib import Path
 
-from sqlalchemy.orm import Session
+from sqlalchemy import case, func, tuple_
+from sqlalchemy.orm import Session, defer, load_only, selectinload
 
+from app.core.config import settings
+from app.core.uploads import ReceivedUpload
+from app.models.extraction import ResumeExtraction
+from app.models.job import AnalysisJob
 from app.models.resume import Resume
-from app.schemas.resume import DashboardStats, ResumeCreate, ResumeUpdate
-from app.services.ai_service import ai_service
+from app.models.stats import UserStats
+from app.schemas.resume import (
+    DashboardStats,
+    ResumeCreate,
+    ResumeResponse,
+    ResumeUpdate,
+)
+from app.services.ai_scheduler import Priority, ai_priority
+from app.services.ai_service import (
+    EXTRACTION_PROMPT_SIGNATURES,
+    StreamEvent,
+    ai_service,
+)
+from app.services.extraction_cache import extraction_cache
+from app.services.job_queue import PermanentJobError, ProgressCallback, job_queue
+from app.services.page_images import page_image_store
 
 logger = logging.getLogger(__name__)
 
@@ -16,22 +39,95 @@ class ResumeService:
     """Service class for resume operations"""
 
     UPLOAD_DIR = Path("uploads/resumes")
-    EXTRACTED_DIR = Path("uploads/extracted")
     ALLOWED_TYPES = {"application/pdf": "pdf", "image/png": "png", "image/jpeg": "jpg"}
 
     def __init__(self, db: Session):
         self.db = db
         self.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-        self.EXTRACTED_DIR.mkdir(parents=True, exist_ok=True)
 
-    def get_user_resumes(self, user_id: int) -> list[Resume]:
-        """Get all resumes for a user, ordered by most recent"""
-        return (
-            self.db.query(Resume)
-            .filter(Resume.user_id == user_id)
-            .order_by(Resume.updated_at.desc())
+    # Fields GET /resumes can project (?fields=), and the columns they need
+    LIST_FIELDS = tuple(ResumeResponse.model_fields)
+    _COMPUTED_FIELD_COLUMNS = {
+        "has_extracted_data": ("has_extraction", "extracted_data_path"),
+        "file_version": ("file_path", "file_size"),
+        "analysis_job_id": (),
+        "analysis_status": (),
+    }
+
+    @staticmethod
+    def encode_cursor(resume: Resume) -> str:
+        """Opaque position after a resume in updated_at, id order"""
+        key = f"{resume.updated_at.isoformat()}|{resume.id}"
+        return base64.urlsafe_b64encode(key.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[datetime, int]:
+        try:
+            updated_at, resume_id = (
+                base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            )
+            return datetime.fromisoformat(updated_at), int(resume_id)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError("Invalid cursor") from e
+
+    def list_user_resumes(
+        self,
+        user_id: int,
+        limit: int,
+        cursor: str | None = None,
+        fields: list[str] | None = None,
+    ) -> tuple[list[Resume], int, str | None]:
+        """
+        One page of a user's resumes, most recently updated first
+
+        Pages use keyset pagination on (updated_at, id) over the
+        (user_id, updated_at) index, so a deep page costs the same as the
+        first. The ATS content column is never loaded; with fields, only the
+        columns those fields need are.
+
+        Returns:
+            (resumes, total resumes of the user, cursor of the next page)
+        """
+        query = self.db.query(Resume).filter(Resume.user_id == user_id)
+        if cursor:
+            query = query.filter(
+                tuple_(Resume.updated_at, Resume.id) < self.decode_cursor(cursor)
+            )
+
+        jobs = selectinload(Resume.analysis_jobs).load_only(
+            AnalysisJob.id, AnalysisJob.status
+        )
+        if fields is None:
+            query = query.options(defer(Resume.content), jobs)
+        else:
+            unknown = set(fields) - set(self.LIST_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+            columns = {"id", "updated_at"}
+            for field in fields:
+                columns.update(self._COMPUTED_FIELD_COLUMNS.get(field, (field,)))
+            query = query.options(
+                load_only(*(getattr(Resume, column) for column in columns))
+            )
+            if {"analysis_job_id", "analysis_status"} & set(fields):
+                query = query.options(jobs)
+
+        resumes = (
+            query.order_by(Resume.updated_at.desc(), Resume.id.desc())
+            .limit(limit + 1)
             .all()
         )
+        next_cursor = None
+        if len(resumes) > limit:
+            resumes = resumes[:limit]
+            next_cursor = self.encode_cursor(resumes[-1])
+
+        total = (
+            self.db.query(func.count(Resume.id))
+            .filter(Resume.user_id == user_id)
+            .scalar()
+        )
+        return resumes, total, next_cursor
 
     def get_resume_by_id(self, resume_id: int, user_id: int) -> Resume | None:
         """Get a specific resume by ID for a user"""
@@ -62,6 +158,7 @@ class ResumeService:
             thumbnail_color=thumbnail_color,
         )
         self.db.add(resume)
+        self.refresh_user_stats(user_id)
         self.db.commit()
         self.db.refresh(resume)
         return resume
@@ -69,64 +166,293 @@ class ResumeService:
     def upload_file(
         self,
         resume: Resume,
-        file_content: bytes,
-        filename: str,
-        content_type: str,
+        upload: ReceivedUpload,
         analyze: bool = True,
+        analysis_mode: str | None = None,
     ) -> Resume:
-        """Upload a file for a resume and analyze (ATS + data extraction)"""
-        if content_type not in self.ALLOWED_TYPES:
+        """
+        Store a received upload for a resume and analyze (ATS + data extraction)
+
+        The upload's temporary file is renamed into UPLOAD_DIR under a name
+        derived from its SHA-256, so the stored file never appears partially
+        written and the same bytes always get the same path.
+
+        analysis_mode selects "separate" per-task VLM calls or a single
+        "combined" call; defaults to settings.AI_ANALYSIS_MODE.
+        """
+        if upload.content_type not in self.ALLOWED_TYPES:
             raise ValueError(
                 f"Invalid file type. Allowed: {list(self.ALLOWED_TYPES.values())}"
             )
 
-        file_ext = self.ALLOWED_TYPES[content_type]
-        safe_filename = f"{resume.user_id}_{resume.id}_{int(datetime.utcnow().timestamp())}.{file_ext}"
+        file_ext = self.ALLOWED_TYPES[upload.content_type]
+        safe_filename = f"{resume.user_id}_{resume.id}_{upload.sha256[:16]}.{file_ext}"
         file_path = self.UPLOAD_DIR / safe_filename
+        os.replace(upload.path, file_path)
 
-        # Save file to disk
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+        # Page images and extracted data of the previous file are no longer valid
+        page_image_store.invalidate(resume.file_path)
+        extraction_cache.invalidate(resume.id)
 
         # Update resume record
         resume.file_path = str(file_path)
         resume.file_type = file_ext
-        resume.file_size = len(file_content)
+        resume.file_size = upload.size
 
         if analyze:
-            # Extract structured data from resume
-            try:
-                extracted_data = ai_service.extract_resume_data(str(file_path))
-                if not extracted_data.get("error"):
-                    # Save extracted data to JSON file
-                    extracted_filename = f"{resume.user_id}_{resume.id}_extracted.json"
-                    extracted_path = self.EXTRACTED_DIR / extracted_filename
-                    with open(extracted_path, "w") as f:
-                        json.dump(extracted_data, f, indent=2)
-                    resume.extracted_data_path = str(extracted_path)
-
-                    # Update title with extracted name if available
-                    if extracted_data.get("contact", {}).get("full_name"):
-                        resume.title = extracted_data["contact"]["full_name"]
-
-                    logger.info(f"Data extraction complete for resume {resume.id}")
-            except Exception as e:
-                logger.error(f"Failed to extract data for resume {resume.id}: {e}")
-
-            # Analyze ATS score
-            try:
-                ats_result = ai_service.analyze_resume_ats(str(file_path))
-                if "score" in ats_result and not ats_result.get("error"):
-                    resume.ats_score = ats_result["score"]
-                    resume.content = json.dumps(ats_result)
-                    logger.info(f"ATS analysis complete for resume {resume.id}: score={resume.ats_score}")
-            except Exception as e:
-                logger.error(f"Failed to analyze ATS for resume {resume.id}: {e}")
+            self.analyze_file(resume, analysis_mode)
 
         self.db.commit()
         self.db.refresh(resume)
         return resume
 
+    def queue_analysis(
+        self, resume: Resume, analysis_mode: str | None = None
+    ) -> AnalysisJob:
+        """Queue background analysis of the resume's current file"""
+        payload = {"file_path": resume.file_path, "analysis_mode": analysis_mode}
+        job = job_queue.enqueue(
+            self.db, resume, kind="upload_analysis", payload=json.dumps(payload)
+        )
+        self.db.refresh(resume)
+        return job
+
+    def analyze_file(
+        self,
+        resume: Resume,
+        analysis_mode: str | None = None,
+        on_progress: ProgressCallback | None = None,
+    ) -> list[str]:
+        """
+        Run AI analysis (data extraction + ATS) on a resume's uploaded file
+
+        analysis_mode selects "separate" per-task VLM calls or a single
+        "combined" call; defaults to settings.AI_ANALYSIS_MODE. on_progress is
+        called with (stage, percent) as the analysis advances. The caller is
+        responsible for committing.
+
+        Returns:
+            List of error messages for tasks that failed (empty on success)
+        """
+        progress = on_progress or (lambda stage, percent: None)
+        mode = analysis_mode or settings.AI_ANALYSIS_MODE
+        started = time.perf_counter()
+
+        if mode == "combined":
+            errors = self._analyze_combined(resume, progress)
+        else:
+            errors = self._analyze_separate(resume, progress)
+
+        logger.info(
+            f"Upload analysis ({mode}) for resume {resume.id} took "
+            f"{int((time.perf_counter() - started) * 1000)} ms"
+        )
+        return errors
+
+    def _analyze_separate(
+        self, resume: Resume, progress: ProgressCallback
+    ) -> list[str]:
+        """Run extraction and ATS analysis as concurrent VLM calls"""
+        progress("analyzing", 10)
+        try:
+            extracted_data, ats_result = ai_service.analyze_upload(resume.file_path)
+        except Exception as e:
+            logger.error(f"Failed to analyze resume {resume.id}: {e}")
+            return [f"Analysis failed: {e}"]
+
+        return self._save_analysis(resume, extracted_data, ats_result)
+
+    def _analyze_combined(
+        self, resume: Resume, progress: ProgressCallback
+    ) -> list[str]:
+        """Run extraction, ATS and suggestions in a single VLM call"""
+        progress("analyzing", 10)
+        try:
+            analysis = ai_service.analyze_resume_full(resume.file_path)
+        except Exception as e:
+            logger.error(f"Failed to analyze resume {resume.id}: {e}")
+            return [f"Analysis failed: {e}"]
+
+        return self._save_analysis(resume, analysis["extracted_data"], analysis["ats"])
+
+    def refresh_analysis(
+        self,
+        resume: Resume,
+        extract: bool = True,
+        ats: bool = True,
+        ats_mode: str | None = None,
+    ) -> list[str]:
+        """
+        Re-run extraction and/or ATS scoring on a resume's current file
+
+        ATS modes other than "llm" score the fresh (or stored) extracted
+        data. The caller is responsible for committing.
+
+        Returns:
+            List of error messages for tasks that failed (empty on success)
+        """
+        errors = []
+        extracted_data = None
+        if extract:
+            extracted_data = ai_service.extract_resume_data(resume.file_path)
+            if not self._save_extracted_data(resume, extracted_data):
+                errors.append(f"Extraction failed: {extracted_data.get('error')}")
+        if ats:
+            if (
+                ats_mode or settings.ATS_SCORING_MODE
+            ) != "llm" and extracted_data is None:
+                extracted_data = self.get_extracted_data(resume)
+            ats_result = ai_service.score_resume_ats(
+                resume.file_path, extracted_data, ats_mode
+            )
+            if not self._save_ats_result(resume, ats_result):
+                errors.append(f"ATS analysis failed: {ats_result.get('error')}")
+        return errors
+
+    def _save_analysis(
+        self, resume: Resume, extracted_data: dict, ats_result: dict
+    ) -> list[str]:
+        """Persist extraction and ATS results, returning errors for failed parts"""
+        errors = []
+        if not self._save_extracted_data(resume, extracted_data):
+            errors.append(f"Extraction failed: {extracted_data.get('error')}")
+        if not self._save_ats_result(resume, ats_result):
+            errors.append(f"ATS analysis failed: {ats_result.get('error')}")
+        return errors
+
+    def _save_extracted_data(self, resume: Resume, extracted_data: dict) -> bool:
+        """Persist successful extraction results and update the title"""
+        if extracted_data.get("error"):
+            return False
+
+        self._store_extraction(resume, extracted_data)
+
+        # Update title with extracted name if available
+        if extracted_data.get("contact", {}).get("full_name"):
+            resume.title = extracted_data["contact"]["full_name"]
+
+        logger.info(f"Data extraction complete for resume {resume.id}")
+        return True
+
+    def _store_extraction(
+        self, resume: Resume, extracted_data: dict
+    ) -> ResumeExtraction:
+        """
+        Add extracted data as the resume's latest version
+
+        A legacy JSON file is imported first so it stays in the history;
+        versions beyond EXTRACTION_HISTORY_LIMIT are deleted, oldest first.
+        """
+        self.import_legacy_extraction(resume)
+        extraction = ResumeExtraction(
+            resume_id=resume.id,
+            data=extracted_data,
+            extraction_version=extracted_data.get("extraction_version"),
+            model=ai_service.model_for_path(extracted_data.get("analysis_path")),
+        )
+        self.db.add(extraction)
+        self.db.flush()
+        extraction_cache.invalidate(resume.id)
+
+        stale = (
+            self.db.query(ResumeExtraction.id)
+            .filter(ResumeExtraction.resume_id == resume.id)
+            .order_by(ResumeExtraction.id.desc())
+            .offset(max(1, settings.EXTRACTION_HISTORY_LIMIT))
+        )
+        stale_ids = [row.id for row in stale]
+        if stale_ids:
+            self.db.query(ResumeExtraction).filter(
+                ResumeExtraction.id.in_(stale_ids)
+            ).delete(synchronize_session=False)
+        return extraction
+
+    def import_legacy_extraction(self, resume: Resume) -> ResumeExtraction | None:
+        """
+        Copy extracted data from a legacy uploads/extracted JSON file into
+        resume_extractions. The caller is responsible for committing; the file
+        is left in place so a rolled-back import loses nothing, and callers
+        that commit may delete it afterwards.
+        """
+        if not resume.extracted_data_path:
+            return None
+        extracted_path = Path(resume.extracted_data_path)
+        extraction = None
+        try:
+            with open(extracted_path) as f:
+                extracted_data = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(
+                f"Could not import {extracted_path} for resume {resume.id}: {e}"
+            )
+            return None
+        else:
+            extraction = ResumeExtraction(
+                resume_id=resume.id,
+                data=extracted_data,
+                extraction_version=extracted_data.get("extraction_version"),
+                created_at=datetime.utcfromtimestamp(extracted_path.stat().st_mtime),
+            )
+            self.db.add(extraction)
+            self.db.flush()
+        resume.extracted_data_path = None
+        return extraction
+
+    def latest_extraction(self, resume: Resume) -> ResumeExtraction | None:
+        """The resume's newest extracted data version (one indexed query)"""
+        extraction = (
+            self.db.query(ResumeExtraction)
+            .filter(ResumeExtraction.resume_id == resume.id)
+            .order_by(ResumeExtraction.id.desc())
+            .first()
+        )
+        if extraction is None and resume.extracted_data_path:
+            legacy_path = Path(resume.extracted_data_path)
+            extraction = self.import_legacy_extraction(resume)
+            self.db.commit()
+            if extraction is not None:
+                legacy_path.unlink(missing_ok=True)
+        return extraction
+
+    def get_extraction_history(self, resume: Resume) -> list[ResumeExtraction]:
+        """Stored extracted data versions, newest first (data not loaded)"""
+        self.latest_extraction(resume)  # Imports a legacy file
+        return (
+            self.db.query(ResumeExtraction)
+            .options(defer(ResumeExtraction.data))
+            .filter(ResumeExtraction.resume_id == resume.id)
+            .order_by(ResumeExtraction.id.desc())
+            .all()
+        )
+
+    def get_extraction(
+        self, resume: Resume, extraction_id: int
+    ) -> ResumeExtraction | None:
+        """One stored extracted data version of a resume"""
+        return (
+            self.db.query(ResumeExtraction)
+            .filter(
+                ResumeExtraction.id == extraction_id,
+                ResumeExtraction.resume_id == resume.id,
+            )
+            .first()
+        )
+
+    def _save_ats_result(self, resume: Resume, ats_result: dict) -> bool:
+        """Persist a successful ATS analysis"""
+        if "score" not in ats_result or ats_result.get("error"):
+            return False
+
+        resume.ats_score = ats_result["score"]
+        resume.content = json.dumps(ats_result)
+        self.refresh_user_stats(resume.user_id)
+        logger.info(
+            f"ATS analysis complete for resume {resume.id}: score={resume.ats_score}"
+        )
+        return True
+
     def get_ats_analysis(self, resume: Resume) -> dict:
         """Get ATS analysis for a resume"""
         if resume.content:
@@ -160,17 +486,32 @@ class ResumeService:
 
         return ai_service.get_resume_suggestions(resume.file_path)
 
-    def reanalyze_ats(self, resume: Resume) -> Resume:
-        """Force re-analyze ATS score for a resume"""
+    def stream_ai_suggestions(self, resume: Resume) -> Iterator[StreamEvent]:
+        """Streaming variant of get_ai_suggestions"""
+        if not resume.file_path:
+            yield "result", self.get_ai_suggestions(resume)
+            return
+
+        yield from ai_service.stream_resume_suggestions(resume.file_path)
+
+    def reanalyze_ats(self, resume: Resume, mode: str | None = None) -> Resume:
+        """
+        Force re-analyze ATS score for a resume
+
+        mode overrides ATS_SCORING_MODE; "local" rescores the stored
+        extracted data without an AI call.
+        """
         if not resume.file_path:
             return resume
 
         try:
-            ats_result = ai_service.analyze_resume_ats(resume.file_path)
-            if "score" in ats_result and not ats_result.get("error"):
-                resume.ats_score = ats_result["score"]
-                import json
-                resume.content = json.dumps(ats_result)
+            extracted_data = None
+            if (mode or settings.ATS_SCORING_MODE) != "llm":
+                extracted_data = self.get_extracted_data(resume)
+            ats_result = ai_service.score_resume_ats(
+                resume.file_path, extracted_data, mode
+            )
+            if self._save_ats_result(resume, ats_result):
                 self.db.commit()
                 self.db.refresh(resume)
         except Exception as e:
@@ -189,6 +530,8 @@ class ResumeService:
         update_dict = update_data.model_dump(exclude_unset=True)
         for key, value in update_dict.items():
             setattr(resume, key, value)
+        if "ats_score" in update_dict:
+            self.refresh_user_stats(user_id)
 
         self.db.commit()
         self.db.refresh(resume)
@@ -205,35 +548,81 @@ class ResumeService:
             file_path = Path(resume.file_path)
             if file_path.exists():
                 file_path.unlink()
+            page_image_store.invalidate(resume.file_path)
 
-        # Delete extracted data JSON if exists
+        # Delete a legacy extracted data JSON if it was never imported
         if resume.extracted_data_path:
             extracted_path = Path(resume.extracted_data_path)
             if extracted_path.exists():
                 extracted_path.unlink()
 
         self.db.delete(resume)
+        self.refresh_user_stats(user_id)
         self.db.commit()
+        extraction_cache.invalidate(resume_id)
         return True
 
-    def get_extracted_data(self, resume: Resume) -> dict:
-        """Get extracted structured data from a resume"""
+    def extraction_is_current(self, resume: Resume, version: str) -> bool:
+        """
+        Whether the stored extracted data is at the given version and came from
+        the configured model and a current extraction prompt, without extracting
+        """
         if resume.extracted_data_path:
-            extracted_path = Path(resume.extracted_data_path)
-            if extracted_path.exists():
-                with open(extracted_path) as f:
-                    return json.load(f)
+            self.latest_extraction(resume)  # Imports the legacy file
+        stored = (
+            self.db.query(
+                ResumeExtraction.extraction_version,
+                ResumeExtraction.model,
+                ResumeExtraction.data["analysis_path"].as_string(),
+                ResumeExtraction.data["prompt_signature"].as_string(),
+            )
+            .filter(ResumeExtraction.resume_id == resume.id)
+            .order_by(ResumeExtraction.id.desc())
+            .first()
+        )
+        if stored is None:
+            return False
+        stored_version, model, path, signature = stored
+        return (
+            stored_version == version
+            and model == ai_service.model_for_path(path)
+            and signature in EXTRACTION_PROMPT_SIGNATURES
+        )
 
-        # If no cached extraction, extract fresh
+    def latest_extraction_id(self, resume: Resume) -> int | None:
+        """Id of the newest stored extraction (index only, data not loaded)"""
+        return (
+            self.db.query(ResumeExtraction.id)
+            .filter(ResumeExtraction.resume_id == resume.id)
+            .order_by(ResumeExtraction.id.desc())
+            .limit(1)
+            .scalar()
+        )
+
+    def get_extracted_data(self, resume: Resume) -> dict:
+        """
+        Get extracted structured data from a resume
+
+        Only the latest extraction's id is queried when the parsed data is
+        already in extraction_cache; the returned dict must not be mutated.
+        """
+        extraction_id = self.latest_extraction_id(resume)
+        if extraction_id is not None:
+            cached = extraction_cache.get(resume.id, extraction_id)
+            if cached is not None:
+                return cached
+
+        extraction = self.latest_extraction(resume)
+        if extraction is not None:
+            extraction_cache.set(resume.id, extraction.id, extraction.data)
+            return extraction.data
+
+        # If no stored extraction, extract fresh
         if resume.file_path:
             extracted_data = ai_service.extract_resume_data(resume.file_path)
             if not extracted_data.get("error"):
                 # Save for future use
-                extracted_filename = f"{resume.user_id}_{resume.id}_extracted.json"
-                extracted_path = self.EXTRACTED_DIR / extracted_filename
-                with open(extracted_path, "w") as f:
-                    json.dump(extracted_data, f, indent=2)
-                resume.extracted_data_path = str(extracted_path)
+                self._store_extraction(resume, extracted_data)
                 self.db.commit()
             return extracted_data
 
@@ -257,23 +646,26 @@ class ResumeService:
             return {"error": "No file uploaded for this resume"}
 
         extracted_data = ai_service.extract_resume_data(resume.file_path)
-        if not extracted_data.get("error"):
-            # Save extracted data
-            extracted_filename = f"{resume.user_id}_{resume.id}_extracted.json"
-            extracted_path = self.EXTRACTED_DIR / extracted_filename
-            with open(extracted_path, "w") as f:
-                json.dump(extracted_data, f, indent=2)
-            resume.extracted_data_path = str(extracted_path)
-
-            # Update title if name extracted
-            if extracted_data.get("contact", {}).get("full_name"):
-                resume.title = extracted_data["contact"]["full_name"]
-
+        if self._save_extracted_data(resume, extracted_data):
             self.db.commit()
             self.db.refresh(resume)
 
         return extracted_data
 
+    def stream_reextract_data(self, resume: Resume) -> Iterator[StreamEvent]:
+        """Streaming variant of reextract_data; the result is saved before it is sent"""
+        if not resume.file_path:
+            yield "error", {"error": "No file uploaded for this resume"}
+            return
+
+        for event, data in ai_service.stream_extract_resume_data(resume.file_path):
+            if event == "result":
+                # The stream can outlive the request's session scope; re-attach
+                resume = self.db.merge(resume)
+                if self._save_extracted_data(resume, data):
+                    self.db.commit()
+            yield event, data
+
     def fill_template(self, resume: Resume, template_schema: dict) -> dict:
         """Fill a template with extracted resume data"""
         extracted_data = self.get_extracted_data(resume)
@@ -282,25 +674,123 @@ class ResumeService:
 
         return ai_service.fill_template(extracted_data, template_schema)
 
-    def get_dashboard_stats(self, user_id: int) -> DashboardStats:
-        """Get dashboard statistics for a user"""
-        resumes = self.get_user_resumes(user_id)
-
-        if not resumes:
-            return DashboardStats(
-                total_resumes=0,
-                average_ats_score=0,
-                highest_ats_score=0,
-                resumes_this_week=0,
+    def stream_fill_template(
+        self, resume: Resume, template_schema: dict
+    ) -> Iterator[StreamEvent]:
+        """Streaming variant of fill_template"""
+        extracted_data = self.get_extracted_data(resume)
+        if extracted_data.get("error"):
+            yield "error", {"error": extracted_data["error"], "data": {}}
+            return
+
+        yield from ai_service.stream_fill_template(extracted_data, template_schema)
+
+    @staticmethod
+    def _week_days() -> list[datetime]:
+        """Start of each of the last 7 UTC days, today last"""
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        return [today - timedelta(days=6 - i) for i in range(7)]
+
+    def _aggregate_stats(self, user_id: int, days: list[datetime]) -> tuple:
+        """(count, score sum, highest score, resumes created per day) in one query"""
+        created_since = [
+            func.coalesce(func.sum(case((Resume.created_at >= day, 1), else_=0)), 0)
+            for day in days
+        ]
+        total, score_sum, highest, *since = (
+            self.db.query(
+                func.count(Resume.id),
+                func.coalesce(func.sum(Resume.ats_score), 0),
+                func.coalesce(func.max(Resume.ats_score), 0),
+                *created_since,
             )
+            .filter(Resume.user_id == user_id)
+            .one()
+        )
+        daily = [
+            count - later for count, later in zip(since, [*since[1:], 0], strict=True)
+        ]
+        return total, score_sum, highest, daily
+
+    def refresh_user_stats(self, user_id: int) -> UserStats:
+        """
+        Recompute a user's user_stats row from their resumes
+
+        Called on every resume change before the caller commits, so reading
+        dashboard stats never touches the resumes table.
+        """
+        self.db.flush()
+        days = self._week_days()
+        total, score_sum, highest, daily = self._aggregate_stats(user_id, days)
+        return self.db.merge(
+            UserStats(
+                user_id=user_id,
+                total_resumes=total,
+                ats_score_sum=score_sum,
+                highest_ats_score=highest,
+                week_start=days[0].date(),
+                daily_created=daily,
+            )
+        )
 
-        scores = [r.ats_score for r in resumes]
-        one_week_ago = datetime.utcnow() - timedelta(days=7)
-        resumes_this_week = sum(1 for r in resumes if r.created_at >= one_week_ago)
+    def get_dashboard_stats(self, user_id: int) -> DashboardStats:
+        """Get dashboard statistics for a user; "this week" is the last 7 UTC days"""
+        days = self._week_days()
+        if settings.DASHBOARD_STATS_MATERIALIZED:
+            stats = self.db.get(UserStats, user_id)
+            if stats is None:
+                stats = self.refresh_user_stats(user_id)
+                self.db.commit()
+            total = stats.total_resumes
+            score_sum = stats.ats_score_sum
+            highest = stats.highest_ats_score
+            # Days before the current window's first day no longer count
+            elapsed = (days[0].date() - stats.week_start).days
+            this_week = sum(stats.daily_created[elapsed:]) if elapsed < 7 else 0
+        else:
+            total, score_sum, highest, daily = self._aggregate_stats(user_id, days)
+            this_week = sum(daily)
 
         return DashboardStats(
-            total_resumes=len(resumes),
-            average_ats_score=int(sum(scores) / len(scores)),
-            highest_ats_score=max(scores),
-            resumes_this_week=resumes_this_week,
+            total_resumes=total,
+            average_ats_score=score_sum // total if total else 0,
+            highest_ats_score=highest,
+            resumes_this_week=this_week,
+        )
+
+
+def run_upload_analysis(
+    db: Session, job: AnalysisJob, progress: ProgressCallback
+) -> None:
+    """Job handler: analyze the file uploaded for a resume"""
+    resume = db.get(Resume, job.resume_id)
+    if resume is None:
+        raise PermanentJobError("Resume no longer exists")
+
+    latest_job_id = (
+        db.query(func.max(AnalysisJob.id))
+        .filter(AnalysisJob.resume_id == resume.id, AnalysisJob.kind == job.kind)
+        .scalar()
+    )
+    if latest_job_id != job.id:
+        # A newer upload queued its own job. File paths cannot tell: the
+        # same bytes uploaded again are stored at the same path
+        progress("superseded", 100)
+        return
+
+    payload = json.loads(job.payload or "{}")
+
+    if not ai_service.client:
+        raise PermanentJobError("AI service not configured. Set NEBIUS_API_KEY in .env")
+
+    # Interactive requests are served before queued analysis
+    with ai_priority(Priority.BACKGROUND):
+        errors = ResumeService(db).analyze_file(
+            resume, payload.get("analysis_mode"), on_progress=progress
         )
+    db.commit()
+    if errors:
+        raise RuntimeError("; ".join(errors))
+
+
+job_queue.register("upload_analysis", run_upload_analysis)
@@ -0,0 +1,321 @@
+"""Rule-based mapping of extracted resume data onto template schemas"""
+
+import re
+from dataclasses import dataclass
+from dataclasses import field as dataclass_field
+from typing import Any
+
+# Template section key -> key of the extracted data it is filled from
+SECTION_SOURCES = {
+    "contact": "contact",
+    "personal": "contact",
+    "summary": "summary",
+    "profile": "summary",
+    "objective": "summary",
+    "experience": "work_experience",
+    "workexperience": "work_experience",
+    "employment": "work_experience",
+    "education": "education",
+    "projects": "projects",
+    "certifications": "certifications",
+    "languages": "languages",
+    "awards": "awards",
+    "publications": "publications",
+    "volunteer": "volunteer",
+    "interests": "interests",
+}
+
+# Template field key -> candidate keys in the extracted item, in order of
+# preference. Keys are compared after normalization (see _normalize).
+FIELD_ALIASES = {
+    "fullname": ["full_name", "name"],
+    "name": ["name", "full_name", "language", "organization"],
+    "title": ["job_title", "title", "position", "role"],
+    "position": ["job_title", "position", "role"],
+    "jobtitle": ["job_title"],
+    "role": ["role", "job_title"],
+    "company": ["company", "organization"],
+    "organization": ["organization", "company", "institution"],
+    "employer": ["company"],
+    "school": ["institution"],
+    "university": ["institution"],
+    "startdate": ["start_date"],
+    "enddate": ["end_date"],
+    "from": ["start_date"],
+    "to": ["end_date"],
+    "current": ["is_current"],
+    "iscurrent": ["is_current"],
+    "highlights": ["bullet_points", "honors", "relevant_coursework"],
+    "achievements": ["bullet_points", "honors"],
+    "bullets": ["bullet_points"],
+    "bulletpoints": ["bullet_points"],
+    "responsibilities": ["bullet_points"],
+    "date": ["date_obtained", "date", "end_date"],
+    "dateobtained": ["date_obtained"],
+    "expirydate": ["expiry_date"],
+    "credentialid": ["credential_id"],
+    "technical": ["technical_skills"],
+    "technicalskills": ["technical_skills"],
+    "hardskills": ["technical_skills"],
+    "soft": ["soft_skills"],
+    "softskills": ["soft_skills"],
+    "languages": ["languages"],
+    "website": ["portfolio"],
+    "links": ["other_links"],
+    "coursework": ["relevant_coursework"],
+    "honors": ["honors"],
+    "tools": ["technologies"],
+    "techstack": ["technologies"],
+}
+
+TEXT_TYPES = {"text", "textarea", "date", "url"}
+
+# Extraction bookkeeping that never helps fill a template
+METADATA_KEYS = {
+    "raw_text",
+    "extraction_version",
+    "extracted_at",
+    "analysis_path",
+    "error",
+}
+
+# Bump when mapping rules change so cached fills are not reused
+TEMPLATE_MAPPER_VERSION = 1
+
+
+def _normalize(key: str) -> str:
+    """fullName, full_name and Full Name all become 'fullname'"""
+    return re.sub(r"[^a-z0-9]", "", key.lower())
+
+
+def _snake_case(key: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", key).lower()
+
+
+def _candidates(field_key: str) -> list[str]:
+    keys = FIELD_ALIASES.get(_normalize(field_key), [])
+    return [*keys, field_key, _snake_case(field_key)]
+
+
+def _format_item(value: Any) -> str:
+    """Render a list item as a string (languages become 'English (Native)')"""
+    if isinstance(value, dict):
+        if "language" in value:
+            proficiency = str(value.get("proficiency") or "").strip()
+            language = str(value.get("language") or "").strip()
+            return f"{language} ({proficiency})" if proficiency else language
+        parts = [
+            str(v).strip() for v in value.values() if isinstance(v, str | int | float)
+        ]
+        return ", ".join(p for p in parts if p)
+    return str(value).strip()
+
+
+def coerce(value: Any, field_type: str | None) -> Any:
+    """Convert an extracted value to the shape a template field expects"""
+    if field_type == "array":
+        if isinstance(value, list):
+            return [item for item in (_format_item(v) for v in value) if item]
+        if isinstance(value, str):
+            return [line.strip() for line in value.splitlines() if line.strip()]
+        return value
+    if field_type in TEXT_TYPES:
+        if isinstance(value, list):
+            separator = "\n" if field_type == "textarea" else ", "
+            return separator.join(
+                item for item in (_format_item(v) for v in value) if item
+            )
+        if isinstance(value, int | float) and not isinstance(value, bool):
+            return str(value)
+    return value
+
+
+def _lookup(source: Any, field: dict) -> tuple[bool, Any]:
+    """Find a field's value in a source item; returns (found, value)"""
+    if not isinstance(source, dict):
+        return False, None
+    for key in _candidates(field["key"]):
+        if key in source:
+            return True, coerce(source[key], field.get("type"))
+    return False, None
+
+
+def _empty(field: dict) -> Any:
+    return [] if field.get("type") == "array" else ""
+
+
+@dataclass
+class TemplateMapping:
+    """Result of mapping: filled data plus the fields no rule could fill"""
+
+    data: dict[str, Any] = dataclass_field(default_factory=dict)
+    unresolved: list[dict] = dataclass_field(default_factory=list)  # path, label, type
+    mapped: int = 0
+
+
+def map_template(extracted_data: dict, template_schema: dict) -> TemplateMapping:
+    """
+    Fill a template schema from extracted data using field-path rules
+
+    Sections and fields are matched by key through SECTION_SOURCES and
+    FIELD_ALIASES (e.g. experience[].highlights <- work_experience[].bullet_points).
+    Fields with no matching source are left empty and listed in
+    ``unresolved`` with paths like ``contact.headline`` or ``experience[].team``.
+    """
+    mapping = TemplateMapping()
+
+    for section in template_schema.get("sections", []):
+        section_key = section.get("key", "")
+        fields = [f for f in section.get("fields", []) if f.get("key")]
+        source_key = SECTION_SOURCES.get(
+            _normalize(section_key), _snake_case(section_key)
+        )
+        source = extracted_data.get(source_key)
+
+        if section.get("type") == "array":
+            items = source if isinstance(source, list) else []
+            rows: list[dict] = [{} for _ in items]
+            for index, field in enumerate(fields):
+                found_any = False
+                for row, item in zip(rows, items, strict=True):
+                    found, value = _lookup(item, field)
+                    if not found and index == 0 and isinstance(item, str):
+                        # Plain string lists (awards, publications) fill the first field
+                        found, value = True, coerce(item, field.get("type"))
+                    found_any |= found
+                    row[field["key"]] = value if found else _empty(field)
+                if found_any or not items:
+                    mapping.mapped += 1
+                else:
+                    mapping.unresolved.append(_leftover(f"{section_key}[]", field))
+            mapping.data[section_key] = rows
+            continue
+
+        # Single-field sections whose source is a plain value, e.g. summary
+        if not isinstance(source, dict) and source is not None and len(fields) == 1:
+            field = fields[0]
+            value = coerce(source, field.get("type"))
+            mapping.data[section_key] = (
+                value if field["key"] == section_key else {field["key"]: value}
+            )
+            mapping.mapped += 1
+            continue
+
+        # Object sections read from their own source (contact) or, for
+        # groupings such as skills that have no source object, the top level
+        container = source if isinstance(source, dict) else extracted_data
+        values = {}
+        for field in fields:
+            found, value = _lookup(container, field)
+            if found:
+                mapping.mapped += 1
+            else:
+                mapping.unresolved.append(_leftover(section_key, field))
+            values[field["key"]] = value if found else _empty(field)
+        mapping.data[section_key] = values
+
+    return mapping
+
+
+def normalize_schema(template_schema: dict) -> dict:
+    """
+    The parts of a schema that affect a fill: the template ID and each
+    section's and field's key, type and label (display-only metadata such as
+    the template name, version, icons and placeholders is dropped)
+    """
+    return {
+        "template_id": template_schema.get("template_id", ""),
+        "sections": [
+            {
+                "key": section.get("key", ""),
+                "type": section.get("type", "object"),
+                "fields": [
+                    {
+                        "key": field.get("key", ""),
+                        "type": field.get("type", "text"),
+                        "label": field.get("label", ""),
+                    }
+                    for field in section.get("fields", [])
+                ],
+            }
+            for section in template_schema.get("sections", [])
+        ],
+    }
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def drop_empty(value: Any) -> Any:
+    """Recursively drop empty strings, lists, objects and nulls (and metadata keys)"""
+    if isinstance(value, dict):
+        pruned = {k: drop_empty(v) for k, v in value.items() if k not in METADATA_KEYS}
+        return {k: v for k, v in pruned.items() if not _is_empty(v)}
+    if isinstance(value, list):
+        return [v for v in (drop_empty(item) for item in value) if not _is_empty(v)]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def prune_for_template(extracted_data: dict, template_schema: dict) -> dict:
+    """
+    The non-empty parts of the extracted data a template can draw from
+
+    Each section keeps its source (experience -> work_experience); groupings
+    without a source object, such as skills, keep the top-level keys their
+    fields match. Everything else (raw_text, unused sections) is dropped.
+    """
+    keys: set[str] = set()
+    for section in template_schema.get("sections", []):
+        section_key = section.get("key", "")
+        source_key = SECTION_SOURCES.get(
+            _normalize(section_key), _snake_case(section_key)
+        )
+        if source_key in extracted_data:
+            keys.add(source_key)
+            continue
+        for field in section.get("fields", []):
+            if field.get("key"):
+                keys.update(k for k in _candidates(field["key"]) if k in extracted_data)
+    return drop_empty(
+        {key: value for key, value in extracted_data.items() if key in keys}
+    )
+
+
+def _leftover(prefix: str, field: dict) -> dict:
+    return {
+        "path": f"{prefix}.{field['key']}",
+        "label": field.get("label", field["key"]),
+        "type": field.get("type", "text"),
+    }
+
+
+def apply_leftovers(mapping: TemplateMapping, values: dict) -> int:
+    """
+    Merge model-provided values for unresolved paths into the mapped data
+
+    Array paths (``experience[].team``) take a list with one value per item.
+    Returns the number of paths that were filled.
+    """
+    filled = 0
+    for leftover in mapping.unresolved:
+        path = leftover["path"]
+        if path not in values:
+            continue
+        prefix, key = path.rsplit(".", 1)
+        value = values[path]
+        if prefix.endswith("[]"):
+            rows = mapping.data.get(prefix[:-2], [])
+            if not isinstance(value, list):
+                continue
+            for row, item_value in zip(rows, value, strict=False):
+                row[key] = coerce(item_value, leftover["type"])
+        else:
+            section = mapping.data.setdefault(prefix, {})
+            if not isinstance(section, dict):
+                continue
+            section[key] = coerce(value, leftover["type"])
+        filled += 1
+    return filled
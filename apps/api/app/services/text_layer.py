@@ -0,0 +1,103 @@
+"""Detection of embedded PDF text layers"""
+
+import logging
+import subprocess
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def extract_pdf_text(pdf_path: str, last_page: int = 0) -> list[str]:
+    """Run poppler's pdftotext and return the text of each page"""
+    command = ["pdftotext", "-layout", "-enc", "UTF-8"]
+    if last_page:
+        command += ["-l", str(last_page)]
+    command += [pdf_path, "-"]
+
+    completed = subprocess.run(
+        command,
+        capture_output=True,
+        timeout=settings.TEXT_LAYER_TIMEOUT_SECONDS,
+        check=True,
+    )
+    # pdftotext ends every page with a form feed
+    pages = completed.stdout.decode("utf-8", errors="replace").split("\f")
+    if pages and not pages[-1].strip():
+        pages.pop()
+    return pages
+
+
+def is_usable_text(pages: list[str], min_chars: int) -> bool:
+    """
+    Whether extracted text is good enough to replace the page images
+
+    Scanned PDFs have no (or almost no) text, and PDFs with broken font
+    encodings produce mostly replacement characters and symbols.
+    """
+    text = "".join("".join(page.split()) for page in pages)
+    if len(text) < min_chars:
+        return False
+    readable = sum(1 for ch in text if ch.isalnum())
+    garbled = text.count("\ufffd")
+    return readable / len(text) >= 0.6 and garbled / len(text) < 0.02
+
+
+class TextLayerStore:
+    """
+    Memoizes text-layer detection per file (by path, size and mtime), so the
+    several AI tasks run on one upload only invoke pdftotext once.
+    """
+
+    MAX_ENTRIES = 256
+
+    def __init__(self) -> None:
+        self._pages: OrderedDict[tuple[str, int, int], list[str] | None] = OrderedDict()
+        self._lock = threading.Lock()
+        self._warned_missing = False
+
+    def get_pages(self, file_path: str) -> list[str] | None:
+        """Text of each page if the file is a PDF with a usable text layer"""
+        if not settings.TEXT_LAYER_ENABLED or Path(file_path).suffix.lower() != ".pdf":
+            return None
+
+        try:
+            stat = Path(file_path).stat()
+        except OSError:
+            return None
+        memo_key = (str(file_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if memo_key in self._pages:
+                self._pages.move_to_end(memo_key)
+                return self._pages[memo_key]
+
+        pages = self._detect(file_path)
+        with self._lock:
+            self._pages[memo_key] = pages
+            while len(self._pages) > self.MAX_ENTRIES:
+                self._pages.popitem(last=False)
+        return pages
+
+    def _detect(self, file_path: str) -> list[str] | None:
+        try:
+            pages = extract_pdf_text(file_path, settings.PDF_MAX_PAGES)
+        except FileNotFoundError:
+            if not self._warned_missing:
+                logger.warning("pdftotext not found; all PDFs will use the VLM")
+                self._warned_missing = True
+            return None
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"Text layer extraction failed for {file_path}: {e}")
+            return None
+
+        if not is_usable_text(pages, settings.TEXT_LAYER_MIN_CHARS):
+            logger.info(f"No usable text layer in {file_path}")
+            return None
+        return pages
+
+
+# Singleton instance
+text_layer_store = TextLayerStore()
@@ -0,0 +1,111 @@
+"""
+Benchmark VLM page encoding profiles against sample resumes.
+
+Renders every PDF/image in a directory with each encoding profile and reports
+payload size (base64 bytes sent to the VLM) and render/encode time.
+
+Usage (from apps/api):
+    uv run python -m scripts.benchmark_image_encoding [--dir uploads/resumes]
+        [--profile balanced --profile compact ...]
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from pdf2image import convert_from_path
+from pdf2image.exceptions import (
+    PDFInfoNotInstalledError,
+    PDFPageCountError,
+    PDFPopplerTimeoutError,
+    PDFSyntaxError,
+)
+from PIL import Image
+
+from app.services.image_encoding import PROFILES, encode_pages, profile_from_settings
+
+# Unreadable or fake sample files: reported and skipped instead of aborting
+RENDER_ERRORS = (
+    PDFInfoNotInstalledError,
+    PDFPageCountError,
+    PDFPopplerTimeoutError,
+    PDFSyntaxError,
+    OSError,  # Includes PIL.UnidentifiedImageError
+)
+
+
+def render(path: Path, dpi: int) -> list[Image.Image]:
+    if path.suffix.lower() == ".pdf":
+        return convert_from_path(str(path), dpi=dpi)
+    with Image.open(path) as img:
+        return [img.copy()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--dir", default="uploads/resumes", help="Directory of sample files"
+    )
+    parser.add_argument(
+        "--profile",
+        action="append",
+        choices=[*PROFILES, "settings"],
+        help="Profile(s) to benchmark (default: all)",
+    )
+    args = parser.parse_args()
+
+    suffixes = {".pdf", ".png", ".jpg", ".jpeg"}
+    files = sorted(p for p in Path(args.dir).iterdir() if p.suffix.lower() in suffixes)
+    if not files:
+        raise SystemExit(f"No sample files found in {args.dir}")
+
+    names = args.profile or [*PROFILES, "settings"]
+    profiles = [
+        profile_from_settings() if n == "settings" else PROFILES[n] for n in names
+    ]
+
+    print(f"{len(files)} file(s) from {args.dir}\n")
+    header = (
+        f"{'profile':<10} {'pages':>5} {'avg KB/file':>12} {'max KB':>8} "
+        f"{'render ms':>10} {'encode ms':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+
+    skipped: dict[Path, Exception] = {}
+    for profile in profiles:
+        sizes, render_ms, encode_ms, pages = [], [], [], 0
+        for path in files:
+            started = time.perf_counter()
+            try:
+                images = render(path, profile.dpi)
+            except RENDER_ERRORS as e:
+                skipped.setdefault(path, e)
+                continue
+            rendered = time.perf_counter()
+            urls = encode_pages(images, profile)
+            encoded = time.perf_counter()
+
+            pages += len(images)
+            sizes.append(sum(len(url) for url in urls))
+            render_ms.append((rendered - started) * 1000)
+            encode_ms.append((encoded - rendered) * 1000)
+
+        if not sizes:
+            print(f"{profile.name:<10} {pages:>5}  (no file could be rendered)")
+            continue
+        print(
+            f"{profile.name:<10} {pages:>5} {statistics.mean(sizes) / 1024:>12.1f} "
+            f"{max(sizes) / 1024:>8.1f} {statistics.mean(render_ms):>10.1f} "
+            f"{statistics.mean(encode_ms):>10.1f}"
+        )
+
+    if skipped:
+        print(f"\nSkipped {len(skipped)} file(s) that could not be rendered:")
+        for path, error in skipped.items():
+            print(f"  {path.name}: {type(error).__name__}: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Import extracted data JSON files into the resume_extractions table.
+
+Extracted data used to be written to uploads/extracted/{user}_{resume}_extracted.json
+with Resume.extracted_data_path pointing at it. Files are also imported
+lazily on first read; this imports them all at once. Files are deleted once
+imported unless --keep-files is given.
+
+Usage (from apps/api):
+    uv run python -m scripts.migrate_extractions [--keep-files]
+"""
+
+import argparse
+from pathlib import Path
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.resume import Resume
+from app.services.resume_service import ResumeService
+
+
+def migrate(
+    session_factory: sessionmaker = SessionLocal, keep_files: bool = False
+) -> tuple[int, int]:
+    """Import every legacy file; returns (imported, missing or unreadable)"""
+    imported = skipped = 0
+    with session_factory() as db:
+        service = ResumeService(db)
+        resumes = db.query(Resume).filter(Resume.extracted_data_path.isnot(None)).all()
+        for resume in resumes:
+            path = resume.extracted_data_path
+            extraction = service.import_legacy_extraction(resume)
+            db.commit()
+            if extraction is None:
+                skipped += 1
+                print(f"resume {resume.id}: could not import {path}")
+                continue
+            imported += 1
+            if not keep_files:
+                # Only once the import is committed
+                Path(path).unlink(missing_ok=True)
+    return imported, skipped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--keep-files",
+        action="store_true",
+        help="Leave the JSON files in place after importing",
+    )
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    imported, skipped = migrate(keep_files=args.keep_files)
+    print(f"Imported {imported} extraction(s), skipped {skipped}")
+
+
+if __name__ == "__main__":
+    main()
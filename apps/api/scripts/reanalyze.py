@@ -0,0 +1,279 @@
+"""
+Re-run extraction and/or ATS scoring for every uploaded resume.
+
+Use after changing RESUME_EXTRACTION_PROMPT, the models or
+EXTRACTION_VERSION. Resumes whose extracted data is already at the target
+version and came from the current model and prompt are skipped. --force
+processes every resume and skips the AI result cache, so the model is called
+again even for unchanged inputs. Progress is checkpointed after every
+resume, so an interrupted run picks up where it stopped when started again
+with the same options. Throughput and ETA are printed as resumes complete.
+
+Usage (from apps/api):
+    uv run python -m scripts.reanalyze [--extract] [--ats] [--ats-mode hybrid]
+        [--workers 4] [--rate 30] [--checkpoint uploads/reanalyze-checkpoint.json]
+        [--force] [--limit N]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.resume import Resume
+from app.services.ai_cache import bypass_cache
+from app.services.ai_scheduler import Priority, TokenBucket, ai_priority
+from app.services.ai_service import (
+    ATS_SUBJECTIVE_PROMPT,
+    ATS_SYSTEM_PROMPT,
+    EXTRACTION_VERSION,
+    RESUME_EXTRACTION_PROMPT,
+)
+from app.services.resume_service import ResumeService
+
+
+class Checkpoint:
+    """
+    IDs of resumes a run has finished, saved as JSON after each one
+
+    The checkpoint belongs to a run signature (tasks, target version, models
+    and prompts); a checkpoint from a different run is ignored.
+    """
+
+    def __init__(self, path: Path, signature: str) -> None:
+        self.path = path
+        self.signature = signature
+        self.done: set[int] = set()
+        self.failed: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        try:
+            saved = json.loads(self.path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return
+        if saved.get("signature") == self.signature:
+            self.done = set(saved.get("done", []))
+            self.failed = {int(k): v for k, v in saved.get("failed", {}).items()}
+
+    def mark(self, resume_id: int, error: str | None = None) -> None:
+        """Record a finished resume; failed ones are retried by the next run"""
+        with self._lock:
+            if error is None:
+                self.done.add(resume_id)
+                self.failed.pop(resume_id, None)
+            else:
+                self.failed[resume_id] = error
+            payload = {
+                "signature": self.signature,
+                "done": sorted(self.done),
+                "failed": {str(k): v for k, v in self.failed.items()},
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(payload))
+            os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+class RateLimiter:
+    """Blocking token bucket shared by the worker threads"""
+
+    def __init__(self, per_minute: int) -> None:
+        self._bucket = (
+            TokenBucket(per_minute / 60, capacity=1) if per_minute > 0 else None
+        )
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if self._bucket is None:
+            return
+        while True:
+            with self._lock:
+                delay = self._bucket.take()
+            if delay == 0:
+                return
+            time.sleep(delay)
+
+
+def run_signature(args: argparse.Namespace) -> str:
+    parts = {
+        "extract": args.extract,
+        "ats": args.ats,
+        "ats_mode": args.ats_mode or settings.ATS_SCORING_MODE,
+        "version": args.target_version,
+        "force": args.force,
+        "models": [settings.NEBIUS_VLM_MODEL, settings.NEBIUS_LLM_MODEL],
+        "prompts": [
+            hashlib.sha256(p.encode()).hexdigest()[:16]
+            for p in (
+                RESUME_EXTRACTION_PROMPT,
+                ATS_SYSTEM_PROMPT,
+                ATS_SUBJECTIVE_PROMPT,
+            )
+        ],
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+def pending_resumes(
+    db: Session, args: argparse.Namespace, checkpoint: Checkpoint
+) -> tuple[list[int], int]:
+    """IDs of resumes to process, and how many were skipped as up to date"""
+    service = ResumeService(db)
+    pending, up_to_date = [], 0
+    resumes = db.query(Resume).filter(Resume.file_path.isnot(None)).order_by(Resume.id)
+    for resume in resumes:
+        if resume.id in checkpoint.done:
+            continue
+        if (
+            args.extract
+            and not args.force
+            and service.extraction_is_current(resume, args.target_version)
+        ):
+            up_to_date += 1
+            continue
+        pending.append(resume.id)
+        if args.limit and len(pending) >= args.limit:
+            break
+    return pending, up_to_date
+
+
+def process(
+    session_factory: sessionmaker, resume_id: int, args: argparse.Namespace
+) -> list[str]:
+    """Re-analyze one resume in its own session; returns error messages"""
+    with (
+        session_factory() as db,
+        ai_priority(Priority.BACKGROUND),
+        bypass_cache(args.force),
+    ):
+        resume = db.get(Resume, resume_id)
+        if resume is None or not resume.file_path:
+            return []
+        if not Path(resume.file_path).exists():
+            return [f"File not found: {resume.file_path}"]
+        errors = ResumeService(db).refresh_analysis(
+            resume, extract=args.extract, ats=args.ats, ats_mode=args.ats_mode
+        )
+        db.commit()
+        return errors
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def run(args: argparse.Namespace, session_factory: sessionmaker = SessionLocal) -> int:
+    """Process every pending resume; returns the number that failed"""
+    checkpoint = Checkpoint(Path(args.checkpoint), run_signature(args))
+    checkpoint.load()
+    with session_factory() as db:
+        pending, up_to_date = pending_resumes(db, args, checkpoint)
+
+    total = len(pending)
+    print(
+        f"{total} resume(s) to process, {up_to_date} already at version "
+        f"{args.target_version} with the current model and prompt, "
+        f"{len(checkpoint.done)} done by an earlier run"
+    )
+    if not total:
+        return 0
+
+    limiter = RateLimiter(args.rate)
+    started = time.monotonic()
+    failed = 0
+
+    def task(resume_id: int) -> list[str]:
+        limiter.wait()
+        try:
+            return process(session_factory, resume_id, args)
+        except Exception as e:
+            return [str(e)]
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(task, resume_id): resume_id for resume_id in pending}
+        for completed, future in enumerate(as_completed(futures), start=1):
+            resume_id = futures[future]
+            errors = future.result()
+            checkpoint.mark(resume_id, "; ".join(errors) if errors else None)
+            failed += bool(errors)
+
+            elapsed = time.monotonic() - started
+            rate = completed / elapsed if elapsed else 0.0
+            eta = (total - completed) / rate if rate else 0.0
+            status = "; ".join(errors) if errors else "ok"
+            print(
+                f"[{completed}/{total}] resume {resume_id}: {status} | "
+                f"{rate * 60:.1f}/min | ETA {format_duration(eta)}"
+            )
+
+    print(
+        f"Done in {format_duration(time.monotonic() - started)}: "
+        f"{total - failed} ok, {failed} failed"
+    )
+    if not failed:
+        checkpoint.clear()
+    return failed
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--extract", action="store_true", help="Re-run data extraction")
+    parser.add_argument("--ats", action="store_true", help="Re-run ATS scoring")
+    parser.add_argument(
+        "--ats-mode",
+        choices=["llm", "local", "hybrid"],
+        help="ATS scoring mode (default: settings)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4, help="Resumes processed in parallel"
+    )
+    parser.add_argument(
+        "--rate",
+        type=int,
+        default=30,
+        help="Max resumes started per minute (0 = unlimited)",
+    )
+    parser.add_argument(
+        "--target-version",
+        default=EXTRACTION_VERSION,
+        help="Skip extractions at this version (and current model and prompt)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Also process up-to-date resumes, bypassing the AI result cache",
+    )
+    parser.add_argument(
+        "--limit", type=int, default=0, help="Process at most N resumes"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default="uploads/reanalyze-checkpoint.json",
+        help="Progress file used to resume an interrupted run",
+    )
+    args = parser.parse_args(argv)
+    if not (args.extract or args.ats):
+        args.extract = args.ats = True
+    return args
+
+
+def main() -> None:
+    raise SystemExit(1 if run(parse_args()) else 0)
+
+
+if __name__ == "__main__":
+    main()
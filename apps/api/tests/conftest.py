@@ -1,3 +1,5 @@
+from types import SimpleNamespace
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -6,6 +8,12 @@ from sqlalchemy.pool import StaticPool
 
 from app.core.database import Base, get_db
 from app.main import app
+from app.services import ai_service as ai_service_module
+from app.services.ai_cache import AIResultCache
+from app.services.ai_resilience import ResilientCaller
+from app.services.ai_scheduler import AIScheduler
+from app.services.extraction_cache import extraction_cache
+from app.services.resume_service import ResumeService
 
 # Create in-memory SQLite database for testing with StaticPool
 # to ensure single connection for in-memory database
@@ -32,6 +40,12 @@ def override_get_db():
 app.dependency_overrides[get_db] = override_get_db
 
 
+@pytest.fixture(autouse=True)
+def upload_dirs(tmp_path, monkeypatch):
+    """Keep uploaded files out of the working tree"""
+    monkeypatch.setattr(ResumeService, "UPLOAD_DIR", tmp_path / "uploads" / "resumes")
+
+
 @pytest.fixture
 def client():
     """Provides a test client with database cleanup after each test"""
@@ -40,6 +54,8 @@ def client():
     with engine.begin() as conn:
         for table in reversed(Base.metadata.sorted_tables):
             conn.execute(table.delete())
+    # Row ids are reused by the next test's data
+    extraction_cache.clear()
 
 
 @pytest.fixture
@@ -54,3 +70,78 @@ def auth_headers(client):
     )
     token = response.json()["access_token"]
     return {"Authorization": f"Bearer {token}"}
+
+
+class FakeCompletions:
+    """
+    Stand-in for client.chat.completions that returns canned replies
+
+    Replies are looked up by system prompt in ``by_prompt`` first (useful when
+    calls run concurrently), then taken in order from ``replies``. With
+    ``stream=True`` the reply is returned as chunks of ``chunk_size`` chars.
+    """
+
+    chunk_size = 8
+
+    def __init__(self):
+        self.replies: list[str] = []
+        self.by_prompt: dict[str, str] = {}
+        self.calls: list[dict] = []
+        self.cache: AIResultCache | None = None
+        self.template_cache: AIResultCache | None = None
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        system_prompt = kwargs["messages"][0]["content"]
+        if system_prompt in self.by_prompt:
+            reply = self.by_prompt[system_prompt]
+        else:
+            reply = self.replies.pop(0) if self.replies else "{}"
+        if kwargs.get("stream"):
+            return self._stream(reply)
+        message = SimpleNamespace(content=reply)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    def _stream(self, reply: str):
+        for i in range(0, len(reply), self.chunk_size):
+            delta = SimpleNamespace(content=reply[i : i + self.chunk_size])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=len(reply))
+        yield SimpleNamespace(choices=[], usage=usage)
+
+
+class FakeAsyncCompletions:
+    """Async stand-in sharing replies and call log with a FakeCompletions"""
+
+    def __init__(self, completions: FakeCompletions):
+        self.completions = completions
+
+    async def create(self, **kwargs):
+        return self.completions.create(**kwargs)
+
+
+@pytest.fixture
+def fake_ai(tmp_path, monkeypatch):
+    """Point the AI service at a fake client and an empty, isolated cache"""
+    cache = AIResultCache(
+        tmp_path / "ai-cache", max_bytes=10 * 1024 * 1024, max_age_seconds=3600
+    )
+    monkeypatch.setattr(ai_service_module, "ai_cache", cache)
+    template_cache = AIResultCache(
+        tmp_path / "template-cache", max_bytes=1024 * 1024, max_age_seconds=3600
+    )
+    monkeypatch.setattr(ai_service_module, "template_cache", template_cache)
+
+    completions = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    async_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=FakeAsyncCompletions(completions))
+    )
+    monkeypatch.setattr(ai_service_module.ai_service, "client", client)
+    monkeypatch.setattr(ai_service_module.ai_service, "async_client", async_client)
+    # Rate limits, circuits and latency samples start fresh for each test
+    monkeypatch.setattr(ai_service_module.ai_service, "scheduler", AIScheduler())
+    monkeypatch.setattr(ai_service_module.ai_service, "resilience", ResilientCaller())
+    completions.cache = cache
+    completions.template_cache = template_cache
+    return completions
@@ -0,0 +1,106 @@
+"""Tests for the content-addressed AI result cache"""
+
+import json
+import os
+import time
+
+import pytest
+from PIL import Image
+
+from app.services.ai_cache import AIResultCache
+from app.services.ai_service import ai_service
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AIResultCache(tmp_path / "cache", max_bytes=1024 * 1024, max_age_seconds=60)
+
+
+def test_cache_roundtrip(cache):
+    """Test stored results are returned and counted as hits"""
+    key = cache.make_key("ats", "abc", "model", "prompt")
+    assert cache.get(key) is None
+
+    cache.set(key, {"score": 80})
+    assert cache.get(key) == {"score": 80}
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+
+def test_cache_key_depends_on_model_and_prompt(cache):
+    """Test changing the model or prompt changes the key"""
+    key = cache.make_key("ats", "abc", "model", "prompt")
+    assert key != cache.make_key("ats", "abc", "other-model", "prompt")
+    assert key != cache.make_key("ats", "abc", "model", "new prompt")
+    assert key != cache.make_key("extraction", "abc", "model", "prompt")
+
+
+def test_cache_skips_errors(cache):
+    """Test error results are never cached"""
+    key = cache.make_key("ats", "abc", "model", "prompt")
+    cache.set(key, {"score": 0, "error": "boom"})
+    assert cache.get(key) is None
+
+
+def test_cache_expires_old_entries(cache):
+    """Test entries older than max age are treated as misses"""
+    key = cache.make_key("ats", "abc", "model", "prompt")
+    cache.set(key, {"score": 80})
+    path = cache._entry_path(key)
+    old = time.time() - 120
+    os.utime(path, (old, old))
+
+    assert cache.get(key) is None
+    assert not path.exists()
+
+
+def test_cache_evicts_oldest_when_full(tmp_path):
+    """Test size-based eviction removes the oldest entries first"""
+    entry = {"data": "x" * 400}
+    size = len(json.dumps(entry))
+    cache = AIResultCache(tmp_path, max_bytes=size * 2, max_age_seconds=3600)
+
+    keys = [cache.make_key("ats", str(i), "model", "prompt") for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.set(key, entry)
+        old = time.time() - 100 + i
+        os.utime(cache._entry_path(key), (old, old))
+
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) == entry
+    assert cache.stats()["size_bytes"] <= size * 2
+
+
+def test_ai_service_uses_cache_for_identical_files(tmp_path, fake_ai):
+    """Test byte-identical uploads reuse the cached ATS result"""
+    first = tmp_path / "a.png"
+    second = tmp_path / "b.png"
+    Image.new("RGB", (20, 20), "white").save(first)
+    second.write_bytes(first.read_bytes())
+
+    fake_ai.replies = ['{"score": 72, "breakdown": {}}']
+
+    assert ai_service.analyze_resume_ats(str(first))["score"] == 72
+    assert ai_service.analyze_resume_ats(str(second))["score"] == 72
+    assert len(fake_ai.calls) == 1
+    assert fake_ai.cache.stats()["hits"] == 1
+
+
+def test_file_hash_memo_is_bounded(tmp_path, cache, monkeypatch):
+    """Test memoized file hashes are evicted least recently used first"""
+    monkeypatch.setattr(AIResultCache, "MAX_FILE_HASHES", 2)
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"resume-{i}.pdf"
+        path.write_bytes(b"%PDF-1.4 " + bytes([i]))
+        paths.append(str(path))
+
+    cache.hash_file(paths[0])
+    cache.hash_file(paths[1])
+    cache.hash_file(paths[0])
+    cache.hash_file(paths[2])
+
+    assert [key[0] for key in cache._file_hashes] == [paths[0], paths[2]]
@@ -0,0 +1,234 @@
+"""Tests for retries, deadlines, circuit breaking and hedging against a fake API"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openai
+import pytest
+
+from app.core.config import settings
+from app.services.ai_resilience import CircuitOpenError, ResilientCaller
+
+MODEL = "test/model"
+
+COMPLETION = {
+    "id": "chatcmpl-test",
+    "object": "chat.completion",
+    "created": 0,
+    "model": MODEL,
+    "choices": [
+        {
+            "index": 0,
+            "message": {"role": "assistant", "content": "ok"},
+            "finish_reason": "stop",
+        }
+    ],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+class FakeProvider:
+    """
+    OpenAI-compatible chat completions endpoint on localhost
+
+    Each request takes the next (status, delay seconds) from ``script``;
+    once it is empty requests succeed at once.
+    """
+
+    def __init__(self):
+        self.script: list[tuple[int, float]] = []
+        self.requests = 0
+        self._lock = threading.Lock()
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with provider._lock:
+                    provider.requests += 1
+                    status, delay = (
+                        provider.script.pop(0) if provider.script else (200, 0)
+                    )
+                time.sleep(delay)
+                body = (
+                    COMPLETION
+                    if status == 200
+                    else {"error": {"message": f"HTTP {status}"}}
+                )
+                payload = json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except OSError:
+                    pass  # The client gave up (timeout or hedge)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    monkeypatch.setattr(settings, "AI_BACKOFF_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "AI_BACKOFF_MAX_SECONDS", 0.05)
+    fake = FakeProvider()
+    yield fake
+    fake.close()
+
+
+def make_call(provider):
+    client = openai.OpenAI(base_url=provider.base_url, api_key="test", max_retries=0)
+
+    def call(timeout: float):
+        return client.chat.completions.create(
+            model=MODEL, messages=[{"role": "user", "content": "hi"}], timeout=timeout
+        )
+
+    return call
+
+
+def test_retries_transient_errors(provider):
+    """Test 429 and 503 replies are retried until the call succeeds"""
+    provider.script = [(429, 0), (503, 0)]
+    caller = ResilientCaller()
+
+    response = caller.call(MODEL, make_call(provider), deadline_seconds=5)
+
+    assert response.choices[0].message.content == "ok"
+    assert provider.requests == 3
+    assert caller.stats()[MODEL]["retries"] == 2
+    assert caller.stats()[MODEL]["circuit"] == "closed"
+
+
+def test_client_errors_are_not_retried(provider):
+    """Test a 400 fails at once without counting against the circuit"""
+    provider.script = [(400, 0)]
+    caller = ResilientCaller()
+
+    with pytest.raises(openai.BadRequestError):
+        caller.call(MODEL, make_call(provider), deadline_seconds=5)
+    assert provider.requests == 1
+    assert caller.stats()[MODEL]["failures"] == 0
+
+
+def test_circuit_opens_and_recovers(provider, monkeypatch):
+    """Test repeated failures open the circuit and a trial call closes it"""
+    monkeypatch.setattr(settings, "AI_CIRCUIT_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "AI_MAX_RETRIES", 5)
+    provider.script = [(503, 0)] * 5
+    caller = ResilientCaller()
+
+    with pytest.raises(CircuitOpenError):
+        caller.call(MODEL, make_call(provider), deadline_seconds=5)
+    assert provider.requests == 2
+
+    # Fails fast while open
+    with pytest.raises(CircuitOpenError):
+        caller.call(MODEL, make_call(provider), deadline_seconds=5)
+    assert provider.requests == 2
+    assert caller.stats()[MODEL]["rejected"] == 2
+
+    provider.script = []
+    monkeypatch.setattr(settings, "AI_CIRCUIT_RESET_SECONDS", 0)
+    assert caller.breaker(MODEL).state == "half_open"
+    caller.call(MODEL, make_call(provider), deadline_seconds=5)
+    assert caller.breaker(MODEL).state == "closed"
+
+
+def test_local_error_is_no_verdict(provider, monkeypatch):
+    """Test an error that never reached the provider leaves the circuit as it was"""
+    monkeypatch.setattr(settings, "AI_CIRCUIT_FAILURE_THRESHOLD", 1)
+    provider.script = [(503, 0)]
+    caller = ResilientCaller()
+    with pytest.raises(CircuitOpenError):
+        caller.call(MODEL, make_call(provider), deadline_seconds=5)
+
+    monkeypatch.setattr(settings, "AI_CIRCUIT_RESET_SECONDS", 0)
+
+    def queue_timeout(timeout):
+        raise TimeoutError("Timed out waiting for an AI slot")
+
+    with pytest.raises(TimeoutError):
+        caller.call(MODEL, queue_timeout, deadline_seconds=5)
+    # Not closed by the local error, and the trial slot is free again
+    assert caller.breaker(MODEL).state == "half_open"
+    caller.call(MODEL, make_call(provider), deadline_seconds=5)
+    assert caller.breaker(MODEL).state == "closed"
+
+
+def test_deadline_bounds_the_call(provider):
+    """Test a hanging provider fails once the deadline passes"""
+    provider.script = [(200, 2.0)]
+    caller = ResilientCaller()
+
+    started = time.monotonic()
+    with pytest.raises(openai.APITimeoutError):
+        caller.call(MODEL, make_call(provider), deadline_seconds=0.3)
+    assert time.monotonic() - started < 1.5
+
+
+def test_hedged_request_wins(provider, monkeypatch):
+    """Test a call slower than p95 is duplicated and the faster reply used"""
+    monkeypatch.setattr(settings, "AI_HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "AI_HEDGE_MIN_SAMPLES", 1)
+    caller = ResilientCaller()
+    call = make_call(provider)
+    caller.call(MODEL, call, deadline_seconds=5)  # p95 sample
+
+    provider.script = [(200, 1.5)]
+    started = time.monotonic()
+    response = caller.call(MODEL, call, deadline_seconds=5)
+
+    assert response.choices[0].message.content == "ok"
+    assert time.monotonic() - started < 1.2
+    assert caller.stats()[MODEL]["hedged"] == 1
+    assert caller.stats()[MODEL]["hedge_wins"] == 1
+    caller.close()
+
+
+def test_async_call_retries(provider):
+    """Test the async path retries like the blocking one"""
+    provider.script = [(502, 0)]
+    caller = ResilientCaller()
+
+    async def run():
+        client = openai.AsyncOpenAI(
+            base_url=provider.base_url, api_key="test", max_retries=0
+        )
+        try:
+            return await caller.acall(
+                MODEL,
+                lambda timeout: client.chat.completions.create(
+                    model=MODEL,
+                    messages=[{"role": "user", "content": "hi"}],
+                    timeout=timeout,
+                ),
+                deadline_seconds=5,
+            )
+        finally:
+            await client.close()
+
+    response = asyncio.run(run())
+    assert response.choices[0].message.content == "ok"
+    assert provider.requests == 2
+
+
+def test_resilience_stats_endpoint(client, auth_headers):
+    """Test per-model resilience stats are served"""
+    response = client.get("/api/v1/ai/resilience/stats", headers=auth_headers)
+    assert response.status_code == 200
+    assert isinstance(response.json(), dict)
@@ -0,0 +1,155 @@
+"""Tests for per-model rate limits, concurrency limits and priority queueing"""
+
+import asyncio
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+from PIL import Image
+
+from app.core.config import settings
+from app.services.ai_scheduler import ModelGovernor, Priority, ai_priority
+from app.services.ai_service import ai_service
+
+
+def wait_for_queued(governor: ModelGovernor, count: int) -> None:
+    deadline = time.monotonic() + 2
+    while governor.stats()["queued"] < count:
+        assert time.monotonic() < deadline, "waiter never queued"
+        time.sleep(0.005)
+
+
+def test_interactive_calls_jump_the_queue():
+    """Test a queued interactive call is admitted before earlier background calls"""
+    governor = ModelGovernor(rate_per_minute=0, max_concurrency=1)
+    order = []
+
+    def call(name, priority):
+        with governor.slot(priority):
+            order.append(name)
+
+    arrivals = [
+        ("bulk-1", Priority.BACKGROUND),
+        ("bulk-2", Priority.BACKGROUND),
+        ("user", Priority.INTERACTIVE),
+    ]
+    with governor.slot(Priority.NORMAL):
+        threads = []
+        for queued, (name, priority) in enumerate(arrivals, start=1):
+            thread = threading.Thread(target=call, args=(name, priority))
+            thread.start()
+            threads.append(thread)
+            wait_for_queued(governor, queued)
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join(2)
+
+    assert order == ["user", "bulk-1", "bulk-2"]
+    stats = governor.stats()
+    assert stats["active"] == 0
+    assert stats["queue_wait"]["interactive"]["admitted"] == 1
+    assert stats["queue_wait"]["background"]["admitted"] == 2
+    assert stats["queue_wait"]["background"]["max_ms"] > 0
+
+
+def test_token_bucket_spaces_requests():
+    """Test calls beyond the burst wait for the rate limit"""
+    governor = ModelGovernor(rate_per_minute=600, max_concurrency=1)  # 10/s, burst of 1
+
+    started = time.monotonic()
+    for _ in range(3):
+        with governor.slot(Priority.NORMAL):
+            pass
+
+    assert time.monotonic() - started >= 0.15
+
+
+def test_cancelled_async_waiter_frees_its_place():
+    """Test a cancelled coroutine leaves the queue without leaking a slot"""
+    governor = ModelGovernor(rate_per_minute=0, max_concurrency=1)
+
+    async def run():
+        async with governor.aslot(Priority.NORMAL):
+            waiter = asyncio.ensure_future(governor.aslot(Priority.NORMAL).__aenter__())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+        async with governor.aslot(Priority.INTERACTIVE) as waited:
+            return waited
+
+    assert asyncio.run(run()) < 0.1
+    assert governor.stats()["active"] == 0
+    assert governor.stats()["queued"] == 0
+
+
+def test_queued_call_times_out_without_a_token():
+    """Test a call still queued at its deadline gives up its place and token"""
+    governor = ModelGovernor(rate_per_minute=60, max_concurrency=1)  # Burst of 1
+
+    with governor.slot(Priority.NORMAL):
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            with governor.slot(Priority.NORMAL, timeout=0.05):
+                pass
+        assert time.monotonic() - started < 0.5
+        assert governor.stats()["queued"] == 0
+
+    async def run():
+        with pytest.raises(TimeoutError):
+            async with governor.aslot(Priority.NORMAL, timeout=0.05):
+                pass
+
+    # The first call spent the only token, so this one times out on the rate limit
+    asyncio.run(run())
+    stats = governor.stats()
+    assert stats["active"] == 0
+    assert stats["queued"] == 0
+    assert stats["queue_wait"]["normal"]["admitted"] == 1
+
+
+def test_stream_deadline_includes_queue_wait(fake_ai, monkeypatch):
+    """Test a streamed call only gets the deadline left after queueing"""
+    waits = [1.5, 3.0]
+
+    @contextmanager
+    def slot(model, priority, timeout=None):
+        yield waits.pop(0)
+
+    monkeypatch.setattr(ai_service.scheduler, "slot", slot)
+    request = {"model": settings.NEBIUS_LLM_MODEL, "messages": [{"content": "p"}]}
+
+    list(ai_service._stream_completion("test", request, deadline_seconds=2.0))
+    assert 0 < fake_ai.calls[0]["timeout"] <= 0.5
+
+    # The whole budget went on queueing: fail without calling the model
+    with pytest.raises(TimeoutError):
+        list(ai_service._stream_completion("test", request, deadline_seconds=2.0))
+    assert len(fake_ai.calls) == 1
+
+
+def test_background_priority_reaches_the_ai_loop(tmp_path, fake_ai):
+    """Test ai_priority carries over to calls made on the AI event loop"""
+    path = tmp_path / "resume.png"
+    Image.new("RGB", (20, 20), "white").save(path)
+    fake_ai.replies = [
+        json.dumps({"contact": {"full_name": "Ada"}}),
+        json.dumps({"score": 70}),
+    ]
+
+    with ai_priority(Priority.BACKGROUND):
+        ai_service.analyze_upload(str(path))
+    ai_service.get_resume_suggestions(str(path))
+
+    waits = ai_service.scheduler.stats()[settings.NEBIUS_VLM_MODEL]["queue_wait"]
+    assert waits["background"]["admitted"] == 2
+    assert waits["interactive"]["admitted"] == 1
+    assert waits["normal"]["admitted"] == 0
+
+
+def test_scheduler_stats_endpoint(client, auth_headers):
+    """Test queue wait metrics are served"""
+    response = client.get("/api/v1/ai/scheduler/stats", headers=auth_headers)
+    assert response.status_code == 200
+    assert isinstance(response.json(), dict)
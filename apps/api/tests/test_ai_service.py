@@ -0,0 +1,150 @@
+"""Tests for AI service analysis modes"""
+
+import asyncio
+import json
+
+import pytest
+from PIL import Image
+
+from app.core.config import settings
+from app.services.ai_service import (
+    ATS_SYSTEM_PROMPT,
+    ATS_TASK,
+    RESUME_EXTRACTION_PROMPT,
+    ai_service,
+)
+
+EXTRACTED = {"contact": {"full_name": "Ada Lovelace"}, "work_experience": []}
+ATS = {"score": 81, "breakdown": {"contact_info": 10}}
+SUGGESTIONS = {"suggestions": [], "overall_impression": "Good", "top_priority": "None"}
+
+
+@pytest.fixture
+def resume_image(tmp_path):
+    path = tmp_path / "resume.png"
+    Image.new("RGB", (20, 20), "white").save(path)
+    return str(path)
+
+
+def test_full_analysis_single_call(resume_image, fake_ai):
+    """Test combined mode splits one reply into the three result shapes"""
+    fake_ai.replies = [
+        json.dumps(
+            {"extracted_data": EXTRACTED, "ats": ATS, "suggestions": SUGGESTIONS}
+        )
+    ]
+
+    result = ai_service.analyze_resume_full(resume_image)
+
+    assert len(fake_ai.calls) == 1
+    assert result["fallback"] == []
+    assert result["extracted_data"]["contact"]["full_name"] == "Ada Lovelace"
+    assert result["ats"]["score"] == 81
+    assert result["suggestions"]["overall_impression"] == "Good"
+
+    # Per-task calls on the same file are now served from the cache
+    assert ai_service.get_resume_suggestions(resume_image) == {
+        **SUGGESTIONS,
+        "analysis_path": "vision",
+    }
+    assert len(fake_ai.calls) == 1
+
+
+def test_full_analysis_falls_back_per_task(resume_image, fake_ai):
+    """Test missing parts of the combined reply use the per-task calls"""
+    fake_ai.replies = [
+        json.dumps({"extracted_data": EXTRACTED, "ats": ATS}),
+        json.dumps(SUGGESTIONS),
+    ]
+
+    result = ai_service.analyze_resume_full(resume_image)
+
+    assert result["fallback"] == ["suggestions"]
+    assert result["suggestions"] == {**SUGGESTIONS, "analysis_path": "vision"}
+    assert len(fake_ai.calls) == 2
+
+
+def test_full_analysis_unparseable_reply(resume_image, fake_ai):
+    """Test an unparseable combined reply falls back to every per-task call"""
+    fake_ai.replies = [
+        "not json",
+        json.dumps(EXTRACTED),
+        json.dumps(ATS),
+        json.dumps(SUGGESTIONS),
+    ]
+
+    result = ai_service.analyze_resume_full(resume_image)
+
+    assert result["fallback"] == ["extraction", "ats", "suggestions"]
+    assert result["ats"]["score"] == 81
+    assert len(fake_ai.calls) == 4
+
+
+def test_upload_analysis_runs_calls_concurrently(resume_image, fake_ai):
+    """Test extraction and ATS overlap instead of running back to back"""
+    in_flight = 0
+    peak = 0
+    completions = fake_ai
+
+    class SlowAsyncCompletions:
+        async def create(self, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return completions.create(**kwargs)
+
+    ai_service.async_client.chat.completions = SlowAsyncCompletions()
+    fake_ai.by_prompt = {
+        RESUME_EXTRACTION_PROMPT: json.dumps(EXTRACTED),
+        ATS_SYSTEM_PROMPT: json.dumps(ATS),
+    }
+
+    extracted_data, ats_result = ai_service.analyze_upload(resume_image)
+
+    assert peak == 2
+    assert extracted_data["contact"]["full_name"] == "Ada Lovelace"
+    assert ats_result["score"] == 81
+
+
+def test_pdf_rendering_is_threaded_and_page_limited(tmp_path, monkeypatch):
+    """Test poppler is asked for several threads and at most PDF_MAX_PAGES pages"""
+    captured = {}
+
+    def fake_convert(pdf_path, **kwargs):
+        captured.update(kwargs)
+        return [Image.new("RGB", (20, 20), "white")]
+
+    monkeypatch.setattr("app.services.ai_service.convert_from_path", fake_convert)
+    monkeypatch.setattr(settings, "PDF_RENDER_THREADS", 3)
+    monkeypatch.setattr(settings, "PDF_MAX_PAGES", 5)
+    pdf = tmp_path / "resume.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+
+    urls = ai_service._render_image_urls(str(pdf))
+
+    assert len(urls) == 1
+    assert captured["thread_count"] == 3
+    assert captured["last_page"] == 5
+
+
+def test_ats_only_sends_first_pages(resume_image, fake_ai, monkeypatch):
+    """Test the ATS task is limited to its page policy; extraction sends all pages"""
+    pages = [f"data:image/png;base64,page{i}" for i in range(5)]
+    monkeypatch.setattr(ai_service, "_file_to_image_urls", lambda file_path: pages)
+    fake_ai.by_prompt = {
+        RESUME_EXTRACTION_PROMPT: json.dumps(EXTRACTED),
+        ATS_SYSTEM_PROMPT: json.dumps(ATS),
+    }
+
+    ai_service.analyze_resume_ats(resume_image)
+    ai_service.extract_resume_data(resume_image)
+
+    def image_count(call):
+        content = call["messages"][1]["content"]
+        return sum(1 for part in content if part["type"] == "image_url")
+
+    by_prompt = {call["messages"][0]["content"]: call for call in fake_ai.calls}
+    assert image_count(by_prompt[ATS_SYSTEM_PROMPT]) == ATS_TASK.max_pages
+    assert image_count(by_prompt[RESUME_EXTRACTION_PROMPT]) == len(pages)
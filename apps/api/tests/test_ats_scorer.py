@@ -0,0 +1,165 @@
+"""Tests for rule-based and hybrid ATS scoring"""
+
+import copy
+import json
+
+from PIL import Image
+
+from app.core.config import settings
+from app.services.ai_service import (
+    ATS_SUBJECTIVE_PROMPT,
+    ATS_SYSTEM_PROMPT,
+    RESUME_EXTRACTION_PROMPT,
+    ai_service,
+)
+from app.services.ats_scorer import MAX_POINTS, merge_subjective, score_resume
+from tests.test_jobs import upload_resume
+
+STRONG = {
+    "contact": {
+        "full_name": "Grace Hopper",
+        "email": "grace@example.com",
+        "phone": "+1 555 010 2030",
+        "linkedin": "linkedin.com/in/grace",
+    },
+    "summary": (
+        "Software engineer with twelve years of experience building compilers and "
+        "developer tooling. Led teams of up to eight engineers, shipped language "
+        "runtimes used by thousands of developers, and mentored junior engineers "
+        "on testing and code review practices."
+    ),
+    "work_experience": [
+        {
+            "job_title": "Senior Engineer",
+            "company": "Univac",
+            "start_date": "Jan 2019",
+            "end_date": "Present",
+            "bullet_points": [
+                "Led a team of 8 engineers building the COBOL compiler in Python",
+                "Reduced build times by 40% by caching intermediate results in Redis",
+                "Designed a Docker based test harness running 2,000 suites nightly",
+            ],
+            "technologies": ["Python", "Docker", "Redis"],
+        },
+        {
+            "job_title": "Engineer",
+            "company": "Harvard",
+            "start_date": "Jun 2015",
+            "end_date": "Dec 2018",
+            "bullet_points": [
+                "Built the first linker for the Mark I using Go and PostgreSQL",
+                "Improved test coverage from 40% to 85% across 12 services",
+                "Mentored 5 interns on Git workflows and code review",
+            ],
+            "technologies": ["Go", "PostgreSQL"],
+        },
+    ],
+    "education": [
+        {
+            "degree": "PhD Mathematics",
+            "institution": "Yale",
+            "end_date": "2014",
+            "gpa": "4.0",
+        }
+    ],
+    "technical_skills": ["Python", "Go", "Docker", "Redis", "PostgreSQL", "Git"],
+    "soft_skills": ["Leadership", "Mentoring", "Communication"],
+    "skills_by_category": {
+        "Languages": ["Python", "Go", "COBOL"],
+        "Tools": ["Docker", "Redis", "Git", "Kubernetes"],
+        "Databases": ["PostgreSQL"],
+    },
+}
+
+
+def test_local_score_is_deterministic_and_bounded():
+    """Test identical data always gives the same in-range score"""
+    first = score_resume(STRONG)
+    assert first == score_resume(copy.deepcopy(STRONG))
+    assert first["scoring"] == "local"
+    assert first["score"] == sum(first["breakdown"].values())
+    for category, points in first["breakdown"].items():
+        assert 0 <= points <= MAX_POINTS[category]
+    assert first["score"] >= 85
+    assert first["missing_sections"] == []
+
+
+def test_local_score_flags_missing_sections():
+    """Test an empty extraction scores low and lists what is missing"""
+    result = score_resume({"contact": {"full_name": "Ada"}})
+    assert result["score"] < 20
+    assert {"Work Experience", "Education", "Skills"} <= set(result["missing_sections"])
+    assert result["improvements"]
+
+
+def test_weaker_resume_scores_lower():
+    """Test removing quantified bullets and the summary lowers the score"""
+    weaker = copy.deepcopy(STRONG)
+    weaker["summary"] = ""
+    for role in weaker["work_experience"]:
+        role["bullet_points"] = ["Worked on things"]
+    assert score_resume(weaker)["score"] < score_resume(STRONG)["score"]
+
+
+def test_merge_subjective():
+    """Test hybrid results take formatting and feedback from the model"""
+    local = score_resume(STRONG)
+    merged = merge_subjective(
+        local,
+        {
+            "formatting": 6,
+            "strengths": ["Clean layout"],
+            "improvements": ["Avoid columns"],
+        },
+    )
+    assert merged["scoring"] == "hybrid"
+    assert merged["breakdown"]["formatting"] == 6
+    assert merged["breakdown"]["experience"] == local["breakdown"]["experience"]
+    assert merged["score"] == sum(merged["breakdown"].values())
+    assert merged["strengths"][0] == "Clean layout"
+    assert merge_subjective(local, {"error": "boom"}) == local
+
+
+def test_hybrid_upload_only_asks_for_subjective_parts(tmp_path, fake_ai, monkeypatch):
+    """Test hybrid mode skips the full ATS prompt"""
+    monkeypatch.setattr(settings, "ATS_SCORING_MODE", "hybrid")
+    path = tmp_path / "resume.png"
+    Image.new("RGB", (20, 20), "white").save(path)
+    fake_ai.by_prompt = {
+        RESUME_EXTRACTION_PROMPT: json.dumps(STRONG),
+        ATS_SUBJECTIVE_PROMPT: json.dumps(
+            {"formatting": 9, "strengths": [], "improvements": []}
+        ),
+    }
+
+    extracted_data, ats_result = ai_service.analyze_upload(str(path))
+
+    prompts = {call["messages"][0]["content"] for call in fake_ai.calls}
+    assert ATS_SYSTEM_PROMPT not in prompts
+    assert ats_result["scoring"] == "hybrid"
+    assert ats_result["breakdown"]["formatting"] == 9
+
+
+def test_reanalyze_locally_makes_no_ai_call(client, auth_headers, fake_ai):
+    """Test local reanalysis rescores the stored extraction"""
+    resume = upload_resume(client, auth_headers)
+    fake_ai.by_prompt = {RESUME_EXTRACTION_PROMPT: json.dumps(STRONG)}
+    client.post(
+        f"/api/v1/resumes/{resume['id']}/extracted/reextract", headers=auth_headers
+    )
+    calls = len(fake_ai.calls)
+
+    response = client.post(
+        f"/api/v1/resumes/{resume['id']}/ats/reanalyze?mode=local", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["ats_score"] == score_resume(STRONG)["score"]
+    assert len(fake_ai.calls) == calls
+
+
+def test_score_endpoint(client, auth_headers):
+    """Test clients can score edited data live"""
+    response = client.post("/api/v1/ai/ats/score", headers=auth_headers, json=STRONG)
+    assert response.status_code == 200
+    assert response.json() == score_resume(STRONG)
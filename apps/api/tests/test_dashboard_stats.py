@@ -0,0 +1,106 @@
+"""Tests for SQL-side dashboard stats and the user_stats table"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models.resume import Resume
+from app.models.stats import UserStats
+from app.services.resume_service import ResumeService
+from tests.conftest import TestingSessionLocal, engine
+
+
+@pytest.fixture
+def scored_resumes(client, auth_headers):
+    """Three resumes scored 80, 71 and 0; the last was created 10 days ago"""
+    ids = []
+    for title, score in (("A", 80), ("B", 71), ("C", 0)):
+        resume = client.post(
+            "/api/v1/resumes", json={"title": title}, headers=auth_headers
+        ).json()
+        client.patch(
+            f"/api/v1/resumes/{resume['id']}",
+            json={"ats_score": score},
+            headers=auth_headers,
+        )
+        ids.append(resume["id"])
+    with TestingSessionLocal() as db:
+        old = db.get(Resume, ids[2])
+        old.created_at = datetime.utcnow() - timedelta(days=10)
+        ResumeService(db).refresh_user_stats(old.user_id)
+        db.commit()
+    return ids
+
+
+@pytest.mark.parametrize("materialized", [True, False])
+def test_stats_values(client, auth_headers, scored_resumes, monkeypatch, materialized):
+    """Test both the stored row and the aggregate query give the same stats"""
+    monkeypatch.setattr(settings, "DASHBOARD_STATS_MATERIALIZED", materialized)
+
+    stats = client.get("/api/v1/resumes/stats", headers=auth_headers).json()
+
+    assert stats == {
+        "total_resumes": 3,
+        "average_ats_score": 50,
+        "highest_ats_score": 80,
+        "resumes_this_week": 2,
+    }
+
+
+def test_stats_follow_deletes(client, auth_headers, scored_resumes):
+    """Test deleting the best resume updates the stored stats"""
+    client.delete(f"/api/v1/resumes/{scored_resumes[0]}", headers=auth_headers)
+
+    stats = client.get("/api/v1/resumes/stats", headers=auth_headers).json()
+
+    assert stats["total_resumes"] == 2
+    assert stats["highest_ats_score"] == 71
+
+
+def test_stats_read_skips_resumes_table(client, auth_headers, scored_resumes):
+    """Test reading stats is a single user_stats lookup"""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    client.get("/api/v1/resumes/stats", headers=auth_headers)  # Authenticate once
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        client.get("/api/v1/resumes/stats", headers=auth_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    stats_queries = [s for s in statements if "FROM users" not in s]
+    assert len(stats_queries) == 1
+    assert "FROM user_stats" in stats_queries[0]
+
+
+def test_missing_row_is_computed(client, auth_headers, scored_resumes):
+    """Test users without a user_stats row get one on first read"""
+    with TestingSessionLocal() as db:
+        db.query(UserStats).delete()
+        db.commit()
+
+    stats = client.get("/api/v1/resumes/stats", headers=auth_headers).json()
+
+    assert stats["total_resumes"] == 3
+    with TestingSessionLocal() as db:
+        assert db.query(UserStats).count() == 1
+
+
+def test_week_window_slides_without_refresh(client, auth_headers, scored_resumes):
+    """Test days that left the window stop counting before any refresh"""
+
+    def shift_window(days):
+        with TestingSessionLocal() as db:
+            stats = db.query(UserStats).one()
+            assert stats.daily_created[-1] == 2  # Both recent resumes are today's
+            stats.week_start = stats.week_start - timedelta(days=days)
+            db.commit()
+        return client.get("/api/v1/resumes/stats", headers=auth_headers).json()
+
+    assert shift_window(6)["resumes_this_week"] == 2  # Still within 7 days
+    assert shift_window(1)["resumes_this_week"] == 0
@@ -0,0 +1,63 @@
+"""Tests for the in-memory cache of parsed extracted data"""
+
+import json
+
+from app.services.extraction_cache import ExtractionCache, extraction_cache
+from tests.test_extractions import upload_resume
+
+
+def test_lru_eviction_by_size():
+    """Test the least recently used entries go once the byte budget is exceeded"""
+    entry = {"summary": "x" * 80}  # ~94 bytes as compact JSON
+    cache = ExtractionCache(max_bytes=250)
+    cache.set(1, 10, entry)
+    cache.set(2, 20, entry)
+    assert cache.get(1, 10) is entry  # 1 is now the most recently used
+    cache.set(3, 30, entry)
+
+    assert cache.get(2, 20) is None
+    assert cache.get(1, 10) is entry
+    assert cache.get(3, 30) is entry
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+    assert stats["size_bytes"] <= 250
+
+
+def test_other_extraction_id_is_a_miss():
+    """Test an entry is only served for the extraction it was loaded from"""
+    cache = ExtractionCache(max_bytes=1024)
+    cache.set(1, 10, {"summary": "old"})
+
+    assert cache.get(1, 11) is None
+    cache.invalidate(1)
+    assert cache.get(1, 10) is None
+    assert cache.stats()["hit_ratio"] == 0.0
+
+
+def test_extracted_endpoint_uses_cache(client, auth_headers, tmp_path, fake_ai):
+    """Test repeated reads hit the cache and re-extraction replaces the entry"""
+    resume = upload_resume(client, auth_headers, tmp_path)
+    base = f"/api/v1/resumes/{resume['id']}"
+    fake_ai.replies = [
+        json.dumps({"contact": {"full_name": "Grace Hopper"}}),
+        json.dumps({"contact": {"full_name": "Grace B. Hopper"}}),
+    ]
+    client.get(f"{base}/extracted", headers=auth_headers)
+
+    before = extraction_cache.stats()
+    for _ in range(3):
+        data = client.get(f"{base}/extracted", headers=auth_headers).json()
+    assert data["contact"]["full_name"] == "Grace Hopper"
+    assert extraction_cache.stats()["hits"] == before["hits"] + 2
+
+    fake_ai.cache.clear()
+    client.post(f"{base}/extracted/reextract", headers=auth_headers)
+    data = client.get(f"{base}/extracted", headers=auth_headers).json()
+    assert data["contact"]["full_name"] == "Grace B. Hopper"
+
+    client.delete(base, headers=auth_headers)
+    assert extraction_cache.stats()["entries"] == 0
+
+    stats = client.get("/api/v1/resumes/extracted/cache/stats", headers=auth_headers)
+    assert stats.json()["hits"] >= 2
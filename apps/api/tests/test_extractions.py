@@ -0,0 +1,137 @@
+"""Tests for versioned extracted data in the resume_extractions table"""
+
+import json
+
+from PIL import Image
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.models.extraction import ResumeExtraction
+from app.models.resume import Resume
+from app.services.ai_service import RESUME_EXTRACTION_PROMPT
+from app.services.resume_service import ResumeService
+from scripts.migrate_extractions import migrate
+from tests.conftest import TestingSessionLocal
+
+
+def upload_resume(client, auth_headers, tmp_path) -> dict:
+    resume = client.post(
+        "/api/v1/resumes", json={"title": "CV"}, headers=auth_headers
+    ).json()
+    image = tmp_path / "cv.png"
+    Image.new("RGB", (20, 20), "white").save(image)
+    with TestingSessionLocal() as db:
+        db.get(Resume, resume["id"]).file_path = str(image)
+        db.commit()
+    return resume
+
+
+def test_reextraction_keeps_versions(client, auth_headers, tmp_path, fake_ai):
+    """Test each extraction is stored as a new version and the latest is served"""
+    resume = upload_resume(client, auth_headers, tmp_path)
+    base = f"/api/v1/resumes/{resume['id']}"
+    fake_ai.replies = [
+        json.dumps({"contact": {"full_name": "Grace Hopper"}}),
+        json.dumps({"contact": {"full_name": "Grace B. Hopper"}}),
+    ]
+
+    client.get(f"{base}/extracted", headers=auth_headers)
+    fake_ai.cache.clear()
+    client.post(f"{base}/extracted/reextract", headers=auth_headers)
+
+    latest = client.get(f"{base}/extracted", headers=auth_headers).json()
+    assert latest["contact"]["full_name"] == "Grace B. Hopper"
+    assert len(fake_ai.calls) == 2
+
+    versions = client.get(f"{base}/extracted/versions", headers=auth_headers).json()
+    assert len(versions) == 2
+    assert versions[0]["model"] == settings.NEBIUS_VLM_MODEL
+    oldest = client.get(
+        f"{base}/extracted/versions/{versions[1]['id']}", headers=auth_headers
+    ).json()
+    assert oldest["contact"]["full_name"] == "Grace Hopper"
+
+    listed = client.get("/api/v1/resumes", headers=auth_headers).json()["resumes"]
+    assert listed[0]["has_extracted_data"] is True
+
+    # The data is queryable with SQLite's JSON functions
+    with TestingSessionLocal() as db:
+        names = db.query(
+            func.json_extract(ResumeExtraction.data, "$.contact.full_name")
+        ).all()
+    assert sorted(name for (name,) in names) == ["Grace B. Hopper", "Grace Hopper"]
+
+
+def test_history_is_capped(client, auth_headers, tmp_path, fake_ai, monkeypatch):
+    """Test old versions beyond EXTRACTION_HISTORY_LIMIT are dropped"""
+    monkeypatch.setattr(settings, "EXTRACTION_HISTORY_LIMIT", 2)
+    resume = upload_resume(client, auth_headers, tmp_path)
+    fake_ai.by_prompt = {RESUME_EXTRACTION_PROMPT: json.dumps({"contact": {}})}
+
+    for _ in range(3):
+        client.post(
+            f"/api/v1/resumes/{resume['id']}/extracted/reextract", headers=auth_headers
+        )
+
+    versions = client.get(
+        f"/api/v1/resumes/{resume['id']}/extracted/versions", headers=auth_headers
+    ).json()
+    assert len(versions) == 2
+
+
+def test_legacy_file_is_imported(client, auth_headers, tmp_path, fake_ai):
+    """Test extracted data files are moved into the table on first read"""
+    resume = upload_resume(client, auth_headers, tmp_path)
+    legacy = tmp_path / "legacy_extracted.json"
+    legacy.write_text(
+        json.dumps({"contact": {"full_name": "Ada"}, "extraction_version": "0.9"})
+    )
+    with TestingSessionLocal() as db:
+        db.get(Resume, resume["id"]).extracted_data_path = str(legacy)
+        db.commit()
+
+    data = client.get(
+        f"/api/v1/resumes/{resume['id']}/extracted", headers=auth_headers
+    ).json()
+
+    assert data["contact"]["full_name"] == "Ada"
+    assert not legacy.exists()
+    assert fake_ai.calls == []
+    with TestingSessionLocal() as db:
+        assert db.get(Resume, resume["id"]).extracted_data_path is None
+        extraction = db.query(ResumeExtraction).one()
+        assert extraction.extraction_version == "0.9"
+
+
+def test_migrate_script(client, auth_headers, tmp_path):
+    """Test the migration script imports every legacy file"""
+    resume = upload_resume(client, auth_headers, tmp_path)
+    legacy = tmp_path / "legacy_extracted.json"
+    legacy.write_text(json.dumps({"contact": {"full_name": "Ada"}}))
+    with TestingSessionLocal() as db:
+        db.get(Resume, resume["id"]).extracted_data_path = str(legacy)
+        db.commit()
+
+    assert migrate(TestingSessionLocal, keep_files=True) == (1, 0)
+
+    assert legacy.exists()
+    with TestingSessionLocal() as db:
+        assert db.query(ResumeExtraction).count() == 1
+        assert db.get(Resume, resume["id"]).has_extracted_data
+
+
+def test_rolled_back_import_keeps_legacy_file(client, auth_headers, tmp_path):
+    """Test the legacy file outlives an import that is never committed"""
+    resume = upload_resume(client, auth_headers, tmp_path)
+    legacy = tmp_path / "legacy_extracted.json"
+    legacy.write_text(json.dumps({"contact": {"full_name": "Ada"}}))
+    with TestingSessionLocal() as db:
+        db.get(Resume, resume["id"]).extracted_data_path = str(legacy)
+        db.commit()
+
+        ResumeService(db).import_legacy_extraction(db.get(Resume, resume["id"]))
+        db.rollback()
+
+        assert legacy.exists()
+        assert db.get(Resume, resume["id"]).extracted_data_path == str(legacy)
+        assert db.query(ResumeExtraction).count() == 0
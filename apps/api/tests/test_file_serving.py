@@ -0,0 +1,94 @@
+"""Tests for Range requests, signed upload URLs and X-Accel-Redirect"""
+
+import io
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.core.security import sign_upload
+
+CONTENT = b"%PDF-1.4 " + bytes(range(256)) * 4
+
+
+@pytest.fixture
+def uploaded(client, auth_headers):
+    """A resume with an uploaded PDF; returns its id"""
+    resume_id = client.post(
+        "/api/v1/resumes", json={"title": "CV"}, headers=auth_headers
+    ).json()["id"]
+    files = {"file": ("cv.pdf", io.BytesIO(CONTENT), "application/pdf")}
+    client.post(
+        f"/api/v1/resumes/{resume_id}/upload", headers=auth_headers, files=files
+    )
+    return resume_id
+
+
+def test_download_range(client, auth_headers, uploaded):
+    """Test byte ranges are answered with 206 and honour If-Range"""
+    url = f"/api/v1/resumes/{uploaded}/download"
+    full = client.get(url, headers=auth_headers)
+    assert full.headers["Accept-Ranges"] == "bytes"
+    etag = full.headers["ETag"]
+
+    part = client.get(url, headers={**auth_headers, "Range": "bytes=9-24"})
+    assert part.status_code == 206
+    assert part.content == CONTENT[9:25]
+    assert part.headers["Content-Range"] == f"bytes 9-24/{len(CONTENT)}"
+
+    current = client.get(
+        url, headers={**auth_headers, "Range": "bytes=-16", "If-Range": etag}
+    )
+    assert current.status_code == 206
+    assert current.content == CONTENT[-16:]
+
+    # The file changed since the client's copy: send it whole
+    stale = client.get(
+        url, headers={**auth_headers, "Range": "bytes=0-9", "If-Range": '"old"'}
+    )
+    assert stale.status_code == 200
+    assert stale.content == CONTENT
+
+
+def test_signed_url(client, auth_headers, uploaded):
+    """Test a signed URL serves the file without auth, including ranges"""
+    signed = client.get(
+        f"/api/v1/resumes/{uploaded}/download-url", headers=auth_headers
+    ).json()
+
+    response = client.get(signed["url"])
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["Content-Type"] == "application/pdf"
+
+    part = client.get(signed["url"], headers={"Range": "bytes=0-3"})
+    assert part.status_code == 206
+    assert part.content == CONTENT[:4]
+
+    tampered = signed["url"].replace("signature=", "signature=0")
+    assert client.get(tampered).status_code == 403
+
+
+def test_expired_signed_url(client, auth_headers, uploaded):
+    """Test signatures stop working once expired"""
+    signed = client.get(
+        f"/api/v1/resumes/{uploaded}/download-url", headers=auth_headers
+    ).json()
+    name = signed["url"].split("/files/")[1].split("?")[0]
+    expires = int(time.time()) - 1
+    signature = sign_upload(name, expires)
+    url = f"/api/v1/files/{name}?expires={expires}&signature={signature}"
+
+    assert client.get(url).status_code == 403
+
+
+def test_accel_redirect(client, auth_headers, uploaded, monkeypatch):
+    """Test nginx is asked to send the file when the prefix is configured"""
+    monkeypatch.setattr(settings, "UPLOAD_ACCEL_REDIRECT_PREFIX", "/protected/")
+
+    response = client.get(f"/api/v1/resumes/{uploaded}/download", headers=auth_headers)
+
+    assert response.content == b""
+    assert response.headers["X-Accel-Redirect"].startswith("/protected/")
+    assert response.headers["X-Accel-Redirect"].endswith(".pdf")
+    assert response.headers["Content-Disposition"] == 'attachment; filename="CV.pdf"'
@@ -0,0 +1,100 @@
+"""Tests for ETags and conditional GETs on resume endpoints"""
+
+import io
+import json
+
+from app.models.resume import Resume
+from tests.conftest import TestingSessionLocal
+from tests.test_extractions import upload_resume
+
+
+def revalidate(client, url, auth_headers, etag):
+    return client.get(url, headers={**auth_headers, "If-None-Match": etag})
+
+
+def test_resume_not_modified_until_changed(client, auth_headers):
+    """Test a resume answers 304 until it is edited"""
+    resume = client.post(
+        "/api/v1/resumes", json={"title": "CV"}, headers=auth_headers
+    ).json()
+    url = f"/api/v1/resumes/{resume['id']}"
+
+    first = client.get(url, headers=auth_headers)
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    cached = revalidate(client, url, auth_headers, f'W/{etag}, "other"')
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    client.patch(url, json={"title": "New title"}, headers=auth_headers)
+    changed = revalidate(client, url, auth_headers, etag)
+    assert changed.status_code == 200
+    assert changed.json()["title"] == "New title"
+    assert changed.headers["ETag"] != etag
+
+
+def test_extracted_not_modified_until_reextracted(
+    client, auth_headers, tmp_path, fake_ai
+):
+    """Test stored extracted data is versioned by its extraction"""
+    resume = upload_resume(client, auth_headers, tmp_path)
+    url = f"/api/v1/resumes/{resume['id']}/extracted"
+    fake_ai.replies = [
+        json.dumps({"contact": {"full_name": "Grace Hopper"}}),
+        json.dumps({"contact": {"full_name": "Grace B. Hopper"}}),
+    ]
+    client.get(url, headers=auth_headers)  # Extracts and stores
+
+    etag = client.get(url, headers=auth_headers).headers["ETag"]
+    assert revalidate(client, url, auth_headers, etag).status_code == 304
+
+    fake_ai.cache.clear()
+    client.post(f"{url}/reextract", headers=auth_headers)
+    changed = revalidate(client, url, auth_headers, etag)
+    assert changed.status_code == 200
+    assert changed.json()["contact"]["full_name"] == "Grace B. Hopper"
+
+
+def test_ats_not_modified(client, auth_headers):
+    """Test a stored ATS analysis answers 304 while unchanged"""
+    resume = client.post(
+        "/api/v1/resumes", json={"title": "CV"}, headers=auth_headers
+    ).json()
+    with TestingSessionLocal() as db:
+        db.get(Resume, resume["id"]).content = json.dumps({"score": 70})
+        db.commit()
+    url = f"/api/v1/resumes/{resume['id']}/ats"
+
+    first = client.get(url, headers=auth_headers)
+    assert first.json() == {"score": 70}
+    assert (
+        revalidate(client, url, auth_headers, first.headers["ETag"]).status_code == 304
+    )
+
+
+def test_download_etag_and_immutable_version(client, auth_headers):
+    """Test downloads revalidate, and versioned URLs are cacheable for good"""
+    resume_id = client.post(
+        "/api/v1/resumes", json={"title": "CV"}, headers=auth_headers
+    ).json()["id"]
+    files = {"file": ("cv.pdf", io.BytesIO(b"%PDF-1.4 fake"), "application/pdf")}
+    uploaded = client.post(
+        f"/api/v1/resumes/{resume_id}/upload", headers=auth_headers, files=files
+    ).json()
+    url = f"/api/v1/resumes/{resume_id}/download"
+
+    plain = client.get(url, headers=auth_headers)
+    assert plain.content == b"%PDF-1.4 fake"
+    assert plain.headers["Cache-Control"] == "private, no-cache"
+    assert (
+        revalidate(client, url, auth_headers, plain.headers["ETag"]).status_code == 304
+    )
+
+    versioned = client.get(
+        url, params={"v": uploaded["file_version"]}, headers=auth_headers
+    )
+    assert "immutable" in versioned.headers["Cache-Control"]
+    stale = client.get(url, params={"v": "0" * 16}, headers=auth_headers)
+    assert stale.headers["Cache-Control"] == "private, no-cache"
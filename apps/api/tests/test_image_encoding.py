@@ -0,0 +1,57 @@
+"""Tests for VLM page image encoding"""
+
+import base64
+import io
+
+from PIL import Image, ImageDraw
+
+from app.services.image_encoding import EncodingProfile, encode_pages
+
+
+def make_page(size=(1700, 2200)):
+    """A noisy page that does not compress to almost nothing"""
+    page = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(page)
+    for y in range(0, size[1], 12):
+        draw.line([(0, y), (size[0], (y * 7) % size[1])], fill=(y % 255, 40, 120))
+    return page
+
+
+def decode(url):
+    header, data = url.split(",", 1)
+    return header, Image.open(io.BytesIO(base64.b64decode(data)))
+
+
+def test_profile_controls_format_size_and_mode():
+    """Test format, long-edge cap and grayscale are applied"""
+    profile = EncodingProfile(format="JPEG", max_edge=1000, grayscale=True)
+
+    [url] = encode_pages([make_page()], profile)
+    header, image = decode(url)
+
+    assert header == "data:image/jpeg;base64"
+    assert max(image.size) == 1000
+    assert image.mode == "L"
+
+
+def test_byte_budget_shrinks_payload():
+    """Test pages are re-encoded smaller until they fit the budget"""
+    pages = [make_page((1200, 1600)), make_page((1200, 1600))]
+    unbounded = sum(len(u) for u in encode_pages(pages, EncodingProfile(format="JPEG")))
+    budget = unbounded // 3
+
+    urls = encode_pages(pages, EncodingProfile(format="JPEG", byte_budget=budget))
+
+    assert sum(len(u) for u in urls) <= budget
+    assert len(urls) == 2
+
+
+def test_png_quantization():
+    """Test palette quantization for lossless output"""
+    [url] = encode_pages(
+        [make_page((400, 400))], EncodingProfile(format="PNG", colors=8)
+    )
+    header, image = decode(url)
+
+    assert header == "data:image/png;base64"
+    assert image.mode == "P"
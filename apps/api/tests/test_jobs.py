@@ -0,0 +1,177 @@
+"""Tests for background analysis jobs"""
+
+import io
+import json
+from datetime import datetime, timedelta
+
+from PIL import Image
+
+from app.models.job import AnalysisJob
+from app.services.ai_service import ATS_SYSTEM_PROMPT, RESUME_EXTRACTION_PROMPT
+from app.services.job_queue import job_queue
+from tests.conftest import TestingSessionLocal
+
+
+def upload_resume(client, auth_headers):
+    """Create a resume and upload a PNG, returning the upload response JSON"""
+    create_response = client.post(
+        "/api/v1/resumes", headers=auth_headers, json={"title": "Queued Resume"}
+    )
+    resume_id = create_response.json()["id"]
+    image = io.BytesIO()
+    Image.new("RGB", (20, 20), "white").save(image, format="PNG")
+    image.seek(0)
+    files = {"file": ("resume.png", image, "image/png")}
+    response = client.post(
+        f"/api/v1/resumes/{resume_id}/upload", headers=auth_headers, files=files
+    )
+    assert response.status_code == 202
+    return response.json()
+
+
+def run_next_job():
+    db = TestingSessionLocal()
+    try:
+        job = job_queue.run_next(db)
+        return job.id if job else None
+    finally:
+        db.close()
+
+
+def test_get_job_status(client, auth_headers):
+    """Test a queued upload job can be polled"""
+    data = upload_resume(client, auth_headers)
+
+    response = client.get(
+        f"/api/v1/jobs/{data['analysis_job_id']}", headers=auth_headers
+    )
+    assert response.status_code == 200
+    job = response.json()
+    assert job["status"] == "queued"
+    assert job["resume_id"] == data["id"]
+    assert job["attempts"] == 0
+
+
+def test_get_job_not_found(client, auth_headers):
+    """Test polling an unknown job"""
+    response = client.get("/api/v1/jobs/99999", headers=auth_headers)
+    assert response.status_code == 404
+
+
+def test_job_runs_analysis(client, auth_headers, fake_ai):
+    """Test a worker runs extraction and ATS and records success"""
+    fake_ai.by_prompt = {
+        RESUME_EXTRACTION_PROMPT: json.dumps(
+            {"contact": {"full_name": "Grace Hopper"}}
+        ),
+        ATS_SYSTEM_PROMPT: json.dumps({"score": 88, "breakdown": {}}),
+    }
+    data = upload_resume(client, auth_headers)
+
+    assert run_next_job() == data["analysis_job_id"]
+
+    job = client.get(
+        f"/api/v1/jobs/{data['analysis_job_id']}", headers=auth_headers
+    ).json()
+    assert job["status"] == "succeeded"
+    assert job["progress"] == 100
+
+    resume = client.get(f"/api/v1/resumes/{data['id']}", headers=auth_headers).json()
+    assert resume["ats_score"] == 88
+    assert resume["title"] == "Grace Hopper"
+    assert resume["analysis_status"] == "succeeded"
+
+
+def test_job_retries_transient_failure(client, auth_headers, fake_ai):
+    """Test a failed analysis is re-queued with backoff"""
+    fake_ai.replies = ["not json", "not json"]
+    data = upload_resume(client, auth_headers)
+
+    run_next_job()
+
+    job = client.get(
+        f"/api/v1/jobs/{data['analysis_job_id']}", headers=auth_headers
+    ).json()
+    assert job["status"] == "queued"
+    assert job["stage"] == "retrying"
+    assert job["attempts"] == 1
+    assert "Extraction failed" in job["error"]
+
+    # Backoff delays the retry
+    assert run_next_job() is None
+
+
+def test_job_fails_without_ai_config(client, auth_headers):
+    """Test missing AI configuration fails the job without retrying"""
+    data = upload_resume(client, auth_headers)
+
+    run_next_job()
+
+    job = client.get(
+        f"/api/v1/jobs/{data['analysis_job_id']}", headers=auth_headers
+    ).json()
+    assert job["status"] == "failed"
+    assert job["attempts"] == 1
+
+
+def test_only_expired_leases_are_requeued(client, auth_headers):
+    """Test jobs of live workers stay running; orphaned ones are re-queued"""
+    live_id = upload_resume(client, auth_headers)["analysis_job_id"]
+    orphan_id = upload_resume(client, auth_headers)["analysis_job_id"]
+    expired = datetime.utcnow() - timedelta(seconds=job_queue.lease_seconds + 1)
+    with TestingSessionLocal() as db:
+        for job_id in (live_id, orphan_id):
+            db.get(AnalysisJob, job_id).status = AnalysisJob.RUNNING
+        db.commit()
+        # The orphan's process died and stopped renewing its lease
+        db.query(AnalysisJob).filter(AnalysisJob.id == orphan_id).update(
+            {AnalysisJob.updated_at: expired}, synchronize_session=False
+        )
+        db.commit()
+
+        assert job_queue.recover_stale(db) == 1
+        assert db.get(AnalysisJob, live_id).status == "running"
+        assert db.get(AnalysisJob, orphan_id).status == "queued"
+
+
+def test_expired_lease_on_last_attempt_fails(client, auth_headers):
+    """Test a job whose worker keeps dying is failed, not re-queued forever"""
+    job_id = upload_resume(client, auth_headers)["analysis_job_id"]
+    expired = datetime.utcnow() - timedelta(seconds=job_queue.lease_seconds + 1)
+    with TestingSessionLocal() as db:
+        db.query(AnalysisJob).filter(AnalysisJob.id == job_id).update(
+            {
+                AnalysisJob.status: AnalysisJob.RUNNING,
+                AnalysisJob.attempts: AnalysisJob.max_attempts,
+                AnalysisJob.updated_at: expired,
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+
+        assert job_queue.recover_stale(db) == 1
+        job = db.get(AnalysisJob, job_id)
+        assert job.status == "failed"
+        assert job.stage == "failed"
+        assert job.error == "Worker died while running the job"
+        assert job.finished_at is not None
+        assert run_next_job() is None
+
+
+def test_heartbeat_renews_running_jobs(client, auth_headers):
+    """Test the worker process keeps the lease on its own jobs fresh"""
+    job_id = upload_resume(client, auth_headers)["analysis_job_id"]
+    expired = datetime.utcnow() - timedelta(seconds=job_queue.lease_seconds + 1)
+    with TestingSessionLocal() as db:
+        db.query(AnalysisJob).filter(AnalysisJob.id == job_id).update(
+            {AnalysisJob.status: AnalysisJob.RUNNING, AnalysisJob.updated_at: expired},
+            synchronize_session=False,
+        )
+        db.commit()
+
+        job_queue._running.add(job_id)
+        try:
+            assert job_queue.heartbeat(db) == 1
+        finally:
+            job_queue._running.discard(job_id)
+        assert job_queue.recover_stale(db) == 0
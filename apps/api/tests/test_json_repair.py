@@ -0,0 +1,80 @@
+"""Tests for tolerant parsing of model JSON replies"""
+
+import json
+
+import pytest
+from PIL import Image
+
+from app.services.json_repair import parse_json_object
+
+
+@pytest.mark.parametrize(
+    "text,expected,level",
+    [
+        ('{"a": 1}', {"a": 1}, "clean"),
+        (
+            'Here you go:\n```json\n{"a": {"b": [1, 2]}}\n```',
+            {"a": {"b": [1, 2]}},
+            "clean",
+        ),
+        ('{"a": [1, 2,], "b": 3,}', {"a": [1, 2], "b": 3}, "repaired"),
+        (
+            '{"summary": "line one\nline two"}',
+            {"summary": "line one\nline two"},
+            "repaired",
+        ),
+        ('{"a": 1} and {"b": 2}', {"a": 1}, "clean"),
+        ('Use {braces} like this: {"a": 1,}', {"a": 1}, "repaired"),
+        ('{"a": 1, "b": [2, 3', {"a": 1, "b": [2, 3]}, "truncated"),
+        ('{"a": 1, "b": "unfinish', {"a": 1, "b": "unfinish"}, "truncated"),
+        (
+            '{"a": 1, "b": {"c": [{"d": 2}, {"e"',
+            {"a": 1, "b": {"c": [{"d": 2}]}},
+            "truncated",
+        ),
+        ('{"a": 1, "b": ', {"a": 1}, "truncated"),
+    ],
+)
+def test_parse_json_object(text, expected, level):
+    assert parse_json_object(text) == (expected, level)
+
+
+@pytest.mark.parametrize("text", ["not json", "{", '{"a": 1]', ""])
+def test_parse_json_object_failure(text):
+    assert parse_json_object(text) == (None, "failed")
+
+
+def test_truncated_extraction_keeps_fields(client, auth_headers, fake_ai):
+    """Test a reply cut off by max_tokens still yields the complete fields"""
+    from app.services.ai_service import ai_service
+
+    before = client.get("/api/v1/ai/parse/stats", headers=auth_headers).json()
+    result = ai_service._parse_json_response(
+        '{"contact": {"full_name": "Ada Lovelace"}, '
+        '"work_experience": [{"company": "Anal'
+    )
+
+    assert result["contact"] == {"full_name": "Ada Lovelace"}
+    assert result["partial"] is True
+    after = client.get("/api/v1/ai/parse/stats", headers=auth_headers).json()
+    assert after["truncated"] == before["truncated"] + 1
+
+
+def test_truncated_extraction_not_cached(tmp_path, fake_ai):
+    """Test a partial result is returned but the next call asks the model again"""
+    from app.services.ai_service import ai_service
+
+    image = tmp_path / "resume.png"
+    Image.new("RGB", (20, 20), "white").save(image)
+    fake_ai.replies = [
+        '{"contact": {"full_name": "Ada Lovelace"}, "summary": "Analytical eng',
+        json.dumps({"contact": {"full_name": "Ada Lovelace"}, "summary": "Done"}),
+    ]
+
+    first = ai_service.extract_resume_data(str(image))
+    second = ai_service.extract_resume_data(str(image))
+
+    assert first["partial"] is True
+    assert len(fake_ai.calls) == 2
+    assert second["summary"] == "Done"
+    assert "partial" not in second
@@ -0,0 +1,57 @@
+"""Tests for the page image artifact store"""
+
+from app.services.page_images import PageImageStore
+
+
+def test_pages_rendered_once(tmp_path):
+    """Test repeated lookups reuse the persisted pages"""
+    source = tmp_path / "resume.pdf"
+    source.write_bytes(b"%PDF-1.4 one")
+    renders = []
+
+    def render(path):
+        renders.append(path)
+        return ["page-1", "page-2"]
+
+    store = PageImageStore()
+    assert store.get_or_render(str(source), render) == ["page-1", "page-2"]
+    assert store.get_or_render(str(source), render) == ["page-1", "page-2"]
+    assert len(renders) == 1
+    assert store.artifact_path(source).exists()
+
+    # A fresh store (e.g. after restart) reads the artifact from disk
+    assert PageImageStore().get_or_render(str(source), render) == ["page-1", "page-2"]
+    assert len(renders) == 1
+
+
+def test_pages_rerendered_when_source_changes(tmp_path):
+    """Test a changed source file invalidates the stored pages"""
+    source = tmp_path / "resume.pdf"
+    source.write_bytes(b"%PDF-1.4 one")
+    store = PageImageStore()
+    store.get_or_render(str(source), lambda path: ["old"])
+
+    source.write_bytes(b"%PDF-1.4 a longer replacement")
+    assert store.get_or_render(str(source), lambda path: ["new"]) == ["new"]
+
+
+def test_invalidate_removes_artifact(tmp_path):
+    """Test invalidation deletes the stored pages"""
+    source = tmp_path / "resume.png"
+    source.write_bytes(b"png")
+    store = PageImageStore()
+    store.get_or_render(str(source), lambda path: ["page"])
+
+    store.invalidate(str(source))
+    assert not store.artifact_path(source).exists()
+
+
+def test_render_locks_do_not_grow(tmp_path):
+    """Test rendering many files reuses the fixed pool of locks"""
+    store = PageImageStore()
+    for i in range(PageImageStore.LOCK_STRIPES * 2):
+        source = tmp_path / f"resume-{i}.pdf"
+        source.write_bytes(b"%PDF")
+        store.get_or_render(str(source), lambda path: ["page"])
+
+    assert len(store._locks) == PageImageStore.LOCK_STRIPES
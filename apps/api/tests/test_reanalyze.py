@@ -0,0 +1,144 @@
+"""Tests for the bulk re-analysis script"""
+
+import json
+
+import pytest
+from PIL import Image
+
+from app.core.config import settings
+from app.models.extraction import ResumeExtraction
+from app.models.resume import Resume
+from app.models.user import User
+from app.services.ai_service import (
+    ATS_SYSTEM_PROMPT,
+    EXTRACTION_VERSION,
+    RESUME_EXTRACTION_PROMPT,
+    VISION_PATH,
+    prompt_signature,
+)
+from scripts.reanalyze import Checkpoint, parse_args, run, run_signature
+from tests.conftest import TestingSessionLocal
+
+EXTRACTED = {"contact": {"full_name": "Ada Lovelace"}, "work_experience": []}
+
+
+@pytest.fixture
+def resumes(client, tmp_path):
+    """Three uploaded resumes; the second already has current extracted data"""
+    with TestingSessionLocal() as db:
+        user = User(email="bulk@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        ids = []
+        for index in range(3):
+            image = tmp_path / f"resume-{index}.png"
+            Image.new("RGB", (20, 20), "white").save(image)
+            resume = Resume(
+                user_id=user.id, title=f"Resume {index}", file_path=str(image)
+            )
+            db.add(resume)
+            db.flush()
+            ids.append(resume.id)
+        current = {
+            **EXTRACTED,
+            "extraction_version": EXTRACTION_VERSION,
+            "analysis_path": VISION_PATH,
+            "prompt_signature": prompt_signature(RESUME_EXTRACTION_PROMPT),
+        }
+        db.add(
+            ResumeExtraction(
+                resume_id=ids[1],
+                data=current,
+                extraction_version=EXTRACTION_VERSION,
+                model=settings.NEBIUS_VLM_MODEL,
+            )
+        )
+        db.commit()
+    return ids
+
+
+def bulk_args(tmp_path, *extra):
+    # The test database is one shared in-memory connection, so workers would
+    # interleave transactions on it; a single worker keeps runs deterministic
+    checkpoint = str(tmp_path / "checkpoint.json")
+    return parse_args(
+        ["--workers", "1", "--rate", "0", "--checkpoint", checkpoint, *extra]
+    )
+
+
+def test_reanalyze_skips_current_versions(resumes, tmp_path, fake_ai, capsys):
+    """Test out-of-date resumes are re-extracted and rescored"""
+    fake_ai.by_prompt = {
+        RESUME_EXTRACTION_PROMPT: json.dumps(EXTRACTED),
+        ATS_SYSTEM_PROMPT: json.dumps({"score": 77}),
+    }
+
+    assert run(bulk_args(tmp_path), TestingSessionLocal) == 0
+
+    with TestingSessionLocal() as db:
+        scores = {r.id: r.ats_score for r in db.query(Resume)}
+    assert scores == {resumes[0]: 77, resumes[1]: 0, resumes[2]: 77}
+    output = capsys.readouterr().out
+    assert "2 resume(s) to process, 1 already at version" in output
+    assert "ETA" in output
+    # A completed run leaves no checkpoint behind
+    assert not (tmp_path / "checkpoint.json").exists()
+
+
+def test_reanalyze_refreshes_other_prompts_and_models(
+    resumes, tmp_path, fake_ai, monkeypatch
+):
+    """Test data from an old prompt or model is stale without a version bump"""
+    fake_ai.by_prompt = {RESUME_EXTRACTION_PROMPT: json.dumps(EXTRACTED)}
+    with TestingSessionLocal() as db:
+        extraction = db.query(ResumeExtraction).one()
+        extraction.data = {**extraction.data, "prompt_signature": "old-prompt"}
+        db.commit()
+
+    assert run(bulk_args(tmp_path, "--extract"), TestingSessionLocal) == 0
+    with TestingSessionLocal() as db:
+        assert db.query(ResumeExtraction).count() == 4
+
+    monkeypatch.setattr(settings, "NEBIUS_VLM_MODEL", "new-vlm")
+    assert run(bulk_args(tmp_path, "--extract"), TestingSessionLocal) == 0
+    with TestingSessionLocal() as db:
+        assert db.query(ResumeExtraction).count() == 7
+
+
+def test_reanalyze_force_bypasses_ai_cache(resumes, tmp_path, fake_ai):
+    """Test --force calls the model again for byte-identical files"""
+    fake_ai.by_prompt = {RESUME_EXTRACTION_PROMPT: json.dumps(EXTRACTED)}
+
+    assert run(bulk_args(tmp_path, "--extract"), TestingSessionLocal) == 0
+    # The sample files are identical, so the second one is a cache hit
+    assert len(fake_ai.calls) == 1
+
+    assert run(bulk_args(tmp_path, "--extract", "--force"), TestingSessionLocal) == 0
+    assert len(fake_ai.calls) == 4
+
+
+def test_reanalyze_resumes_from_checkpoint(resumes, tmp_path, fake_ai):
+    """Test resumes finished by an interrupted run are not processed again"""
+    fake_ai.by_prompt = {RESUME_EXTRACTION_PROMPT: json.dumps(EXTRACTED)}
+    args = bulk_args(tmp_path, "--extract")
+    Checkpoint(tmp_path / "checkpoint.json", run_signature(args)).mark(resumes[0])
+
+    assert run(args, TestingSessionLocal) == 0
+
+    assert len(fake_ai.calls) == 1
+
+
+def test_reanalyze_keeps_failures_in_checkpoint(resumes, tmp_path, fake_ai):
+    """Test failed resumes are recorded and retried by the next run"""
+    fake_ai.by_prompt = {RESUME_EXTRACTION_PROMPT: json.dumps(EXTRACTED)}
+    with TestingSessionLocal() as db:
+        db.get(Resume, resumes[2]).file_path = str(tmp_path / "missing.png")
+        db.commit()
+    args = bulk_args(tmp_path, "--extract")
+
+    assert run(args, TestingSessionLocal) == 1
+
+    checkpoint = Checkpoint(tmp_path / "checkpoint.json", run_signature(args))
+    checkpoint.load()
+    assert checkpoint.done == {resumes[0]}
+    assert "File not found" in checkpoint.failed[resumes[2]]
@@ -0,0 +1,57 @@
+"""Tests that slow blocking work does not stall the event loop"""
+
+import asyncio
+import io
+import time
+
+import httpx
+
+from app.main import app
+from app.services.resume_service import ResumeService
+
+SLOW_SECONDS = 1.0
+
+
+async def test_health_and_list_responsive_during_upload(
+    client, auth_headers, monkeypatch
+):
+    """Test /health and GET /resumes answer quickly while an upload is in flight"""
+    original_upload_file = ResumeService.upload_file
+
+    def slow_upload_file(self, *args, **kwargs):
+        # Simulate slow, blocking storage/analysis work inside the upload
+        time.sleep(SLOW_SECONDS)
+        return original_upload_file(self, *args, **kwargs)
+
+    monkeypatch.setattr(ResumeService, "upload_file", slow_upload_file)
+
+    resume_id = client.post(
+        "/api/v1/resumes", headers=auth_headers, json={"title": "Slow Upload"}
+    ).json()["id"]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        files = {
+            "file": ("resume.pdf", io.BytesIO(b"%PDF-1.4 fake"), "application/pdf")
+        }
+        started = time.perf_counter()
+        upload = asyncio.create_task(
+            http.post(
+                f"/api/v1/resumes/{resume_id}/upload", headers=auth_headers, files=files
+            )
+        )
+        # Let the upload reach the slow section; a blocked loop would only
+        # wake up from this sleep once the upload's blocking work is done
+        await asyncio.sleep(0.2)
+
+        health = await http.get("/health")
+        resumes = await http.get("/api/v1/resumes", headers=auth_headers)
+        elapsed = time.perf_counter() - started
+
+        assert not upload.done()
+        assert health.status_code == 200
+        assert resumes.status_code == 200
+        assert elapsed < SLOW_SECONDS * 0.75
+
+        upload_response = await upload
+        assert upload_response.status_code == 202
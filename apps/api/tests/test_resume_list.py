@@ -0,0 +1,101 @@
+"""Tests for keyset pagination and field selection on GET /resumes"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.models.resume import Resume
+from tests.conftest import TestingSessionLocal, engine
+
+
+@pytest.fixture
+def five_resumes(client, auth_headers):
+    """Five resumes; the middle three share one updated_at"""
+    ids = [
+        client.post(
+            "/api/v1/resumes", json={"title": f"Resume {i}"}, headers=auth_headers
+        ).json()["id"]
+        for i in range(5)
+    ]
+    times = [1, 2, 2, 2, 3]
+    with TestingSessionLocal() as db:
+        for resume_id, day in zip(ids, times, strict=True):
+            db.get(Resume, resume_id).updated_at = datetime(2024, 1, day)
+        db.commit()
+    return ids
+
+
+def collect_statements():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    return statements, record
+
+
+def test_pages_cover_every_resume_once(client, auth_headers, five_resumes):
+    """Test following next_cursor returns all resumes in order, across ties"""
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/v1/resumes", params=params, headers=auth_headers)
+        data = page.json()
+        assert data["total"] == 5
+        seen.extend(r["id"] for r in data["resumes"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [five_resumes[4], *reversed(five_resumes[1:4]), five_resumes[0]]
+
+
+def test_fields_projection(client, auth_headers, five_resumes):
+    """Test fields= returns only the asked fields and loads only their columns"""
+    statements, record = collect_statements()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(
+            "/api/v1/resumes",
+            params={"fields": "title,ats_score,has_extracted_data"},
+            headers=auth_headers,
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    resume = response.json()["resumes"][0]
+    assert resume == {
+        "id": five_resumes[4],
+        "title": "Resume 4",
+        "ats_score": 0,
+        "has_extracted_data": False,
+    }
+    (select,) = [s for s in statements if "FROM resumes" in s and "count" not in s]
+    assert "resumes.content" not in select
+    assert "resumes.file_path" not in select
+
+
+def test_full_list_defers_content(client, auth_headers, five_resumes):
+    """Test the default listing never selects the ATS content column"""
+    statements, record = collect_statements()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        resumes = client.get("/api/v1/resumes", headers=auth_headers).json()["resumes"]
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert len(resumes) == 5
+    assert resumes[0]["analysis_status"] is None
+    assert not any("resumes.content" in s for s in statements)
+    # One query for the page, one for their jobs, one for the total
+    assert len([s for s in statements if "FROM users" not in s]) == 3
+
+
+@pytest.mark.parametrize(
+    "params", [{"cursor": "not-a-cursor"}, {"fields": "title,content"}]
+)
+def test_bad_list_params(client, auth_headers, params):
+    """Test malformed cursors and unknown fields are rejected"""
+    response = client.get("/api/v1/resumes", params=params, headers=auth_headers)
+    assert response.status_code == 400
@@ -141,11 +141,13 @@ def test_upload_file(client, auth_headers):
         headers=auth_headers,
         files=files,
     )
-    assert response.status_code == 200
+    assert response.status_code == 202
     data = response.json()
     assert data["file_type"] == "pdf"
     assert data["file_size"] == len(pdf_content)
     assert data["file_path"] is not None
+    assert data["analysis_status"] == "queued"
+    assert response.headers["Location"].endswith(f"/jobs/{data['analysis_job_id']}")
 
 
 def test_upload_invalid_file_type(client, auth_headers):
@@ -0,0 +1,135 @@
+"""Tests for Server-Sent Events streaming of AI results"""
+
+import json
+
+import pytest
+
+from app.services.ai_service import RESUME_EXTRACTION_PROMPT, RESUME_SUGGESTIONS_PROMPT
+from app.services.partial_json import parse_partial_json
+from tests.test_jobs import upload_resume
+
+SUGGESTIONS = {
+    "suggestions": [
+        {"category": "content", "issue": "Vague", "suggestion": "Add metrics"}
+    ],
+    "overall_impression": "Solid",
+    "top_priority": "Quantify impact",
+}
+EXTRACTED = {"contact": {"full_name": "Grace Hopper"}, "work_experience": []}
+
+
+def read_events(response) -> list[tuple[str, dict]]:
+    """Parse a text/event-stream body into (event, data) pairs"""
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ('{"a": 1, "b": [2, 3', {"a": 1, "b": [2]}),
+        ('```json\n{"a": "x"}\n```', {"a": "x"}),
+        ('{"a": "x", "b": "unfinished', {"a": "x"}),
+        ('{"s": [{"t": "a,b", "u": tr', {"s": [{"t": "a,b"}]}),
+        ('{"a', None),
+        ("no json yet", None),
+    ],
+)
+def test_parse_partial_json(text, expected):
+    """Test incomplete objects are cut back to their complete values"""
+    assert parse_partial_json(text) == expected
+
+
+def test_stream_suggestions(client, auth_headers, fake_ai):
+    """Test suggestions stream deltas, partial objects and a final result"""
+    resume = upload_resume(client, auth_headers)
+    fake_ai.by_prompt = {RESUME_SUGGESTIONS_PROMPT: json.dumps(SUGGESTIONS)}
+
+    response = client.get(
+        f"/api/v1/resumes/{resume['id']}/suggestions/stream", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = read_events(response)
+    kinds = [event for event, _ in events]
+    assert kinds[0] == "delta"
+    assert "partial" in kinds
+    assert kinds[-1] == "result"
+    assert "".join(
+        data["text"] for event, data in events if event == "delta"
+    ) == json.dumps(SUGGESTIONS)
+    assert events[-1][1]["top_priority"] == "Quantify impact"
+    assert fake_ai.calls[0]["stream"] is True
+
+
+def test_stream_reextract_saves_result(client, auth_headers, fake_ai):
+    """Test the streamed extraction is persisted like the blocking endpoint"""
+    resume = upload_resume(client, auth_headers)
+    fake_ai.by_prompt = {RESUME_EXTRACTION_PROMPT: json.dumps(EXTRACTED)}
+
+    response = client.post(
+        f"/api/v1/resumes/{resume['id']}/extracted/reextract/stream",
+        headers=auth_headers,
+    )
+
+    events = read_events(response)
+    assert events[-1][0] == "result"
+    assert events[-1][1]["contact"]["full_name"] == "Grace Hopper"
+
+    saved = client.get(f"/api/v1/resumes/{resume['id']}", headers=auth_headers).json()
+    assert saved["title"] == "Grace Hopper"
+    extracted = client.get(
+        f"/api/v1/resumes/{resume['id']}/extracted", headers=auth_headers
+    ).json()
+    assert extracted["contact"]["full_name"] == "Grace Hopper"
+
+
+def test_stream_fill_template(client, auth_headers, fake_ai):
+    """Test locally mapped data arrives first and leftovers stream from the LLM"""
+    resume = upload_resume(client, auth_headers)
+    fake_ai.by_prompt = {RESUME_EXTRACTION_PROMPT: json.dumps(EXTRACTED)}
+    fake_ai.replies = [json.dumps({"contact.headline": "Computer scientist"})]
+    schema = {
+        "template_id": "modern",
+        "sections": [
+            {
+                "key": "contact",
+                "type": "object",
+                "fields": [
+                    {"key": "fullName", "type": "text"},
+                    {"key": "headline", "type": "text"},
+                ],
+            }
+        ],
+    }
+
+    response = client.post(
+        f"/api/v1/resumes/{resume['id']}/fill-template/stream",
+        headers=auth_headers,
+        json=schema,
+    )
+
+    events = read_events(response)
+    assert events[0] == (
+        "partial",
+        {"data": {"contact": {"fullName": "Grace Hopper", "headline": ""}}},
+    )
+    assert "delta" in [event for event, _ in events]
+    event, payload = events[-1]
+    assert event == "result"
+    assert payload["template_id"] == "modern"
+    assert payload["data"] == {
+        "contact": {"fullName": "Grace Hopper", "headline": "Computer scientist"}
+    }
+
+
+def test_stream_not_found(client, auth_headers):
+    """Test unknown resumes fail before the stream starts"""
+    response = client.get(
+        "/api/v1/resumes/99999/suggestions/stream", headers=auth_headers
+    )
+    assert response.status_code == 404
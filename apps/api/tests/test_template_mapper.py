@@ -0,0 +1,330 @@
+"""Tests for rule-based template filling"""
+
+import json
+
+from app.services.ai_service import ai_service
+from app.services.template_mapper import (
+    apply_leftovers,
+    map_template,
+    prune_for_template,
+)
+
+EXTRACTED = {
+    "contact": {
+        "full_name": "Grace Hopper",
+        "email": "grace@example.com",
+        "phone": "555-0100",
+        "location": "Arlington, VA",
+        "linkedin": "linkedin.com/in/grace",
+    },
+    "summary": "Compiler pioneer.",
+    "work_experience": [
+        {
+            "job_title": "Senior Engineer",
+            "company": "Univac",
+            "location": "Philadelphia",
+            "start_date": "Jan 1949",
+            "end_date": "Present",
+            "is_current": True,
+            "bullet_points": ["Built the A-0 compiler", "Led COBOL design"],
+        }
+    ],
+    "education": [
+        {"degree": "PhD Mathematics", "institution": "Yale", "end_date": "1934"}
+    ],
+    "technical_skills": ["COBOL", "FLOW-MATIC"],
+    "soft_skills": ["Teaching"],
+    "languages": [{"language": "English", "proficiency": "Native"}],
+    "certifications": [
+        {"name": "Rear Admiral", "issuer": "US Navy", "date_obtained": "1985"}
+    ],
+    "awards": ["National Medal of Technology"],
+}
+
+# Mirrors getTemplateSchema() in apps/web/src/lib/templates.ts
+SCHEMA = {
+    "template_id": "classic-elegant",
+    "sections": [
+        {
+            "key": "contact",
+            "type": "object",
+            "fields": [
+                {"key": "fullName", "type": "text"},
+                {"key": "email", "type": "text"},
+                {"key": "linkedin", "type": "url"},
+            ],
+        },
+        {
+            "key": "summary",
+            "type": "object",
+            "fields": [{"key": "summary", "type": "textarea"}],
+        },
+        {
+            "key": "experience",
+            "type": "array",
+            "fields": [
+                {"key": "title", "type": "text"},
+                {"key": "company", "type": "text"},
+                {"key": "startDate", "type": "date"},
+                {"key": "endDate", "type": "date"},
+                {"key": "highlights", "type": "array"},
+            ],
+        },
+        {
+            "key": "education",
+            "type": "array",
+            "fields": [
+                {"key": "degree", "type": "text"},
+                {"key": "endDate", "type": "date"},
+            ],
+        },
+        {
+            "key": "skills",
+            "type": "object",
+            "fields": [
+                {"key": "technical", "type": "array"},
+                {"key": "soft", "type": "array"},
+                {"key": "languages", "type": "array"},
+            ],
+        },
+        {
+            "key": "certifications",
+            "type": "array",
+            "fields": [
+                {"key": "name", "type": "text"},
+                {"key": "issuer", "type": "text"},
+                {"key": "date", "type": "date"},
+            ],
+        },
+        {"key": "awards", "type": "array", "fields": [{"key": "name", "type": "text"}]},
+    ],
+}
+
+
+def test_map_template_fills_known_fields():
+    """Test the template.ts field keys map without leftovers"""
+    mapping = map_template(EXTRACTED, SCHEMA)
+
+    assert mapping.unresolved == []
+    data = mapping.data
+    assert data["contact"] == {
+        "fullName": "Grace Hopper",
+        "email": "grace@example.com",
+        "linkedin": "linkedin.com/in/grace",
+    }
+    assert data["summary"] == "Compiler pioneer."
+    assert data["experience"][0]["title"] == "Senior Engineer"
+    assert data["experience"][0]["startDate"] == "Jan 1949"
+    assert data["experience"][0]["highlights"] == [
+        "Built the A-0 compiler",
+        "Led COBOL design",
+    ]
+    assert data["education"] == [{"degree": "PhD Mathematics", "endDate": "1934"}]
+    assert data["skills"] == {
+        "technical": ["COBOL", "FLOW-MATIC"],
+        "soft": ["Teaching"],
+        "languages": ["English (Native)"],
+    }
+    assert data["certifications"] == [
+        {"name": "Rear Admiral", "issuer": "US Navy", "date": "1985"}
+    ]
+    assert data["awards"] == [{"name": "National Medal of Technology"}]
+
+
+def test_unknown_fields_are_left_for_the_llm():
+    """Test fields without a rule are reported with their paths"""
+    schema = {
+        "sections": [
+            {
+                "key": "contact",
+                "type": "object",
+                "fields": [{"key": "headline", "label": "Headline"}],
+            },
+            {
+                "key": "experience",
+                "type": "array",
+                "fields": [{"key": "teamSize", "type": "text"}],
+            },
+        ]
+    }
+    mapping = map_template(EXTRACTED, schema)
+
+    assert [f["path"] for f in mapping.unresolved] == [
+        "contact.headline",
+        "experience[].teamSize",
+    ]
+    filled = apply_leftovers(
+        mapping, {"contact.headline": "Admiral", "experience[].teamSize": [12]}
+    )
+    assert filled == 2
+    assert mapping.data["contact"]["headline"] == "Admiral"
+    assert mapping.data["experience"][0]["teamSize"] == "12"
+
+
+def test_fill_template_skips_llm_when_everything_maps(fake_ai):
+    """Test a fully mappable template makes no AI call"""
+    result = ai_service.fill_template(EXTRACTED, SCHEMA)
+
+    assert fake_ai.calls == []
+    assert result["template_id"] == "classic-elegant"
+    assert result["mapping"]["llm_fields"] == 0
+    assert result["data"]["contact"]["fullName"] == "Grace Hopper"
+
+
+def test_fill_template_sends_only_leftovers(fake_ai):
+    """Test the LLM prompt lists just the unresolved fields"""
+    schema = {
+        "template_id": "custom",
+        "sections": [
+            {
+                "key": "contact",
+                "type": "object",
+                "fields": [
+                    {"key": "fullName"},
+                    {"key": "headline", "label": "Headline"},
+                ],
+            }
+        ],
+    }
+    fake_ai.replies = [json.dumps({"contact.headline": "Computing pioneer"})]
+
+    result = ai_service.fill_template(EXTRACTED, schema)
+
+    prompt = fake_ai.calls[0]["messages"][1]["content"]
+    assert "contact.headline" in prompt
+    assert "fullName" not in prompt
+    assert result["data"]["contact"] == {
+        "fullName": "Grace Hopper",
+        "headline": "Computing pioneer",
+    }
+    assert result["mapping"] == {
+        "local_fields": 1,
+        "llm_fields": 1,
+        "leftovers": ["contact.headline"],
+    }
+
+
+def test_prune_for_template():
+    """Test only referenced, non-empty sections reach the fill prompt"""
+    extracted = {
+        **EXTRACTED,
+        "raw_text": "Grace Hopper ...",
+        "extracted_at": "2026-01-01T00:00:00",
+        "projects": [{"name": "UNIVAC I"}],
+        "publications": [],
+        "contact": {**EXTRACTED["contact"], "github": "", "portfolio": None},
+    }
+    schema = {
+        "sections": [
+            {"key": "contact", "type": "object", "fields": [{"key": "headline"}]},
+            {"key": "experience", "type": "array", "fields": [{"key": "team"}]},
+            {"key": "skills", "type": "object", "fields": [{"key": "technical"}]},
+        ]
+    }
+
+    pruned = prune_for_template(extracted, schema)
+
+    assert set(pruned) == {"contact", "work_experience", "technical_skills"}
+    assert "github" not in pruned["contact"]
+    assert "portfolio" not in pruned["contact"]
+
+
+def test_fill_prompt_is_compact(fake_ai, monkeypatch):
+    """Test the fill prompt drops unused data and whitespace; stats record the saving"""
+    schema = {
+        "sections": [
+            {"key": "contact", "type": "object", "fields": [{"key": "headline"}]}
+        ]
+    }
+    before = ai_service.fill_stats()
+    fake_ai.replies = [json.dumps({"contact.headline": "Pioneer"})]
+
+    ai_service.fill_template({**EXTRACTED, "raw_text": "RAW RESUME TEXT"}, schema)
+
+    prompt = fake_ai.calls[0]["messages"][1]["content"]
+    assert '"full_name":"Grace Hopper"' in prompt
+    assert "RAW RESUME TEXT" not in prompt
+    assert "Univac" not in prompt
+    stats = ai_service.fill_stats()
+    assert stats["calls"] == before["calls"] + 1
+    sent = stats["data_chars"] - before["data_chars"]
+    full = stats["full_data_chars"] - before["full_data_chars"]
+    assert 0 < sent < full / 3
+
+    # The unpruned prompt stays available for comparison
+    monkeypatch.setattr("app.core.config.settings.TEMPLATE_FILL_PRUNE", False)
+    fake_ai.replies = [json.dumps({"contact.headline": "Pioneer"})]
+    ai_service.fill_template({**EXTRACTED, "summary": "Changed."}, schema)
+    assert "Univac" in fake_ai.calls[1]["messages"][1]["content"]
+
+
+def test_fill_stats_endpoint(client, auth_headers):
+    """Test template fill usage is reported"""
+    response = client.get("/api/v1/ai/templates/stats", headers=auth_headers)
+    assert response.status_code == 200
+    assert {"calls", "prompt_tokens", "avg_ms", "data_chars", "full_data_chars"} <= set(
+        response.json()
+    )
+
+
+def test_fill_template_cache(fake_ai):
+    """Test repeated fills are cached until the data or schema changes"""
+    schema = {
+        "template_id": "custom",
+        "template_name": "Custom",
+        "sections": [
+            {
+                "key": "contact",
+                "type": "object",
+                "fields": [{"key": "headline", "label": "Headline"}],
+            }
+        ],
+    }
+    fake_ai.replies = [
+        json.dumps({"contact.headline": "Pioneer"}),
+        json.dumps({"contact.headline": "Admiral"}),
+    ]
+
+    first = ai_service.fill_template(EXTRACTED, schema)
+    # Display-only schema metadata does not affect the key
+    again = ai_service.fill_template(EXTRACTED, {**schema, "template_name": "Renamed"})
+    assert again == first
+    assert len(fake_ai.calls) == 1
+
+    # Re-extraction produces new data and therefore a new key
+    reextracted = {**EXTRACTED, "extracted_at": "2026-01-01T00:00:00"}
+    assert (
+        ai_service.fill_template(reextracted, schema)["data"]["contact"]["headline"]
+        == "Admiral"
+    )
+    assert len(fake_ai.calls) == 2
+
+
+def test_failed_leftover_fill_is_not_cached(fake_ai):
+    """Test fills missing their LLM part are retried next time"""
+    schema = {
+        "sections": [
+            {"key": "contact", "type": "object", "fields": [{"key": "headline"}]}
+        ]
+    }
+    fake_ai.replies = ["not json", json.dumps({"contact.headline": "Pioneer"})]
+
+    assert (
+        ai_service.fill_template(EXTRACTED, schema)["data"]["contact"]["headline"] == ""
+    )
+    assert (
+        ai_service.fill_template(EXTRACTED, schema)["data"]["contact"]["headline"]
+        == "Pioneer"
+    )
+
+
+def test_template_cache_stats_endpoint(client, auth_headers, fake_ai, monkeypatch):
+    """Test template cache hits are reported"""
+    monkeypatch.setattr("app.api.v1.ai.template_cache", fake_ai.template_cache)
+    ai_service.fill_template(EXTRACTED, SCHEMA)
+    ai_service.fill_template(EXTRACTED, SCHEMA)
+
+    response = client.get("/api/v1/ai/templates/cache/stats", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["hits"] == 1
+    assert response.json()["entries"] == 1
@@ -0,0 +1,99 @@
+"""Tests for the PDF text-layer fast path"""
+
+import json
+
+import pytest
+from PIL import Image
+
+from app.core.config import settings
+from app.services.ai_service import ai_service
+from app.services.text_layer import is_usable_text
+
+RESUME_TEXT = (
+    "Ada Lovelace\nada@example.com | London\n\nExperience\n"
+    "Analyst, Analytical Engine Company, 1842 - 1843\n"
+    "Wrote the first published algorithm intended for a machine.\n" * 3
+)
+EXTRACTED = {"contact": {"full_name": "Ada Lovelace"}, "work_experience": []}
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(b"%PDF-1.4 fake")
+    return str(path)
+
+
+def image_parts(call):
+    content = call["messages"][1]["content"]
+    if isinstance(content, str):
+        return 0
+    return sum(1 for part in content if part["type"] == "image_url")
+
+
+def test_is_usable_text():
+    """Test short or garbled text layers are rejected"""
+    assert is_usable_text([RESUME_TEXT], min_chars=50)
+    assert not is_usable_text(["  \n "], min_chars=50)
+    assert not is_usable_text(["�" * 100 + "abc"], min_chars=50)
+    assert not is_usable_text(["•-|" * 40], min_chars=50)
+
+
+def test_pdf_with_text_layer_uses_llm(pdf_file, fake_ai, monkeypatch):
+    """Test text PDFs skip rendering and go to the text model"""
+    monkeypatch.setattr(
+        "app.services.text_layer.extract_pdf_text",
+        lambda path, last_page: [RESUME_TEXT],
+    )
+
+    def no_render(file_path):
+        raise AssertionError("page images should not be rendered")
+
+    monkeypatch.setattr(ai_service, "_file_to_image_urls", no_render)
+    before = ai_service.path_stats()["text"]["calls"]
+    fake_ai.replies = [json.dumps(EXTRACTED)]
+
+    result = ai_service.extract_resume_data(pdf_file)
+
+    call = fake_ai.calls[0]
+    assert call["model"] == settings.NEBIUS_LLM_MODEL
+    assert image_parts(call) == 0
+    assert "Ada Lovelace" in call["messages"][1]["content"]
+    assert result["analysis_path"] == "text"
+    assert ai_service.path_stats()["text"]["calls"] == before + 1
+
+
+def test_image_only_pdf_uses_vlm(pdf_file, fake_ai, monkeypatch):
+    """Test PDFs without a usable text layer keep the VLM path"""
+    monkeypatch.setattr(
+        "app.services.text_layer.extract_pdf_text", lambda path, last_page: ["", ""]
+    )
+    monkeypatch.setattr(
+        ai_service, "_file_to_image_urls", lambda file_path: ["data:image/png;base64,x"]
+    )
+    fake_ai.replies = [json.dumps(EXTRACTED)]
+
+    result = ai_service.extract_resume_data(pdf_file)
+
+    assert fake_ai.calls[0]["model"] == settings.NEBIUS_VLM_MODEL
+    assert image_parts(fake_ai.calls[0]) == 1
+    assert result["analysis_path"] == "vision"
+
+
+def test_images_use_vlm(tmp_path, fake_ai):
+    """Test image uploads never look for a text layer"""
+    path = tmp_path / "resume.png"
+    Image.new("RGB", (20, 20), "white").save(path)
+    fake_ai.replies = ['{"score": 70, "breakdown": {}}']
+
+    result = ai_service.analyze_resume_ats(str(path))
+
+    assert fake_ai.calls[0]["model"] == settings.NEBIUS_VLM_MODEL
+    assert result["analysis_path"] == "vision"
+
+
+def test_path_stats_endpoint(client, auth_headers):
+    """Test the path split is exposed to clients"""
+    response = client.get("/api/v1/ai/paths/stats", headers=auth_headers)
+    assert response.status_code == 200
+    assert set(response.json()) == {"text", "vision"}
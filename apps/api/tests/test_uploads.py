@@ -0,0 +1,88 @@
+"""Tests for streamed uploads"""
+
+import hashlib
+import io
+
+import pytest
+
+from app.core.config import settings
+from app.services.resume_service import ResumeService
+from tests.test_jobs import run_next_job
+
+
+@pytest.fixture
+def resume_id(client, auth_headers):
+    return client.post(
+        "/api/v1/resumes", json={"title": "CV"}, headers=auth_headers
+    ).json()["id"]
+
+
+def upload(client, auth_headers, resume_id, content, content_type="application/pdf"):
+    files = {"file": ("cv.pdf", io.BytesIO(content), content_type)}
+    return client.post(
+        f"/api/v1/resumes/{resume_id}/upload", headers=auth_headers, files=files
+    )
+
+
+def stored_files():
+    return sorted(p.name for p in ResumeService.UPLOAD_DIR.iterdir())
+
+
+def test_upload_stored_by_content_hash(client, auth_headers, resume_id):
+    """Test the upload is renamed into place under its SHA-256"""
+    content = b"%PDF-1.4 " + b"x" * 300_000
+    response = upload(client, auth_headers, resume_id, content)
+
+    assert response.status_code == 202
+    digest = hashlib.sha256(content).hexdigest()[:16]
+    assert stored_files() == [f"1_{resume_id}_{digest}.pdf"]
+    assert response.json()["file_size"] == len(content)
+
+
+@pytest.mark.parametrize("size", [2048, 200 * 1024])
+def test_upload_too_large(client, auth_headers, resume_id, monkeypatch, size):
+    """Test oversized uploads get 413, whether caught mid-stream or up front"""
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", 1024)
+
+    response = upload(client, auth_headers, resume_id, b"x" * size)
+
+    assert response.status_code == 413
+    assert response.json()["detail"].startswith("File too large")
+    assert stored_files() == []  # No partial or temporary file left behind
+    resume = client.get(f"/api/v1/resumes/{resume_id}", headers=auth_headers)
+    assert resume.json()["file_path"] is None
+
+
+def test_upload_rejected_before_storing(client, auth_headers, resume_id):
+    """Test bad types and missing files are rejected without writing"""
+    assert (
+        upload(client, auth_headers, resume_id, b"text", "text/plain").status_code
+        == 400
+    )
+
+    response = client.post(
+        f"/api/v1/resumes/{resume_id}/upload",
+        headers=auth_headers,
+        files={"other": ("cv.pdf", io.BytesIO(b"%PDF"), "application/pdf")},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "No file uploaded"
+    assert stored_files() == []
+
+
+def test_reupload_supersedes_queued_job(client, auth_headers, resume_id):
+    """Test re-uploading the same bytes still supersedes the earlier job"""
+    first = upload(client, auth_headers, resume_id, b"%PDF-1.4 same").json()
+    second = upload(client, auth_headers, resume_id, b"%PDF-1.4 same").json()
+    assert first["file_path"] == second["file_path"]
+
+    # Without an AI client a job that analyzes fails; a superseded one skips
+    assert run_next_job() == first["analysis_job_id"]
+    assert run_next_job() == second["analysis_job_id"]
+    statuses = [
+        client.get(
+            f"/api/v1/jobs/{data['analysis_job_id']}", headers=auth_headers
+        ).json()["status"]
+        for data in (first, second)
+    ]
+    assert statuses == ["succeeded", "failed"]
@@ -2,7 +2,7 @@
 
 import { useEffect, useState, useCallback } from "react";
 import { useRouter } from "next/navigation";
-import { authApi, resumeApi, User, Resume, DashboardStats } from "@/lib/api";
+import { ApiError, authApi, jobApi, resumeApi, User, Resume, DashboardStats } from "@/lib/api";
 import { authStorage } from "@/lib/auth";
 
 import { DashboardSidebar } from "@/components/dashboard/DashboardSidebar";
@@ -13,6 +13,10 @@ import { JobMatchesWidget } from "@/components/dashboard/JobMatchesWidget";
 import { AISuggestionsWidget } from "@/components/dashboard/AISuggestionsWidget";
 import { Search } from "lucide-react";
 
+// Fields shown on resume cards; the list endpoint returns only these
+const CARD_FIELDS = ["title", "updated_at", "ats_score", "thumbnail_color"] as const;
+type ResumeCardData = Pick<Resume, (typeof CARD_FIELDS)[number] | "id">;
+
 // Helper to format relative time
 function formatRelativeTime(dateString: string): string {
   const date = new Date(dateString);
@@ -33,10 +37,11 @@ function formatRelativeTime(dateString: string): string {
 export default function DashboardPage() {
   const router = useRouter();
   const [user, setUser] = useState<User | null>(null);
-  const [resumes, setResumes] = useState<Resume[]>([]);
+  const [resumes, setResumes] = useState<ResumeCardData[]>([]);
   const [stats, setStats] = useState<DashboardStats | null>(null);
   const [isLoading, setIsLoading] = useState(true);
   const [isUploading, setIsUploading] = useState(false);
+  const [uploadError, setUploadError] = useState("");
   const [searchQuery, setSearchQuery] = useState("");
 
   const refreshData = useCallback(async () => {
@@ -45,10 +50,10 @@ export default function DashboardPage() {
 
     try {
       const [resumesData, statsData] = await Promise.all([
-        resumeApi.list(token),
+        resumeApi.listAll(token, [...CARD_FIELDS]),
         resumeApi.getStats(token),
       ]);
-      setResumes(resumesData.resumes);
+      setResumes(resumesData);
       setStats(statsData);
     } catch (error) {
       console.error("Failed to refresh data:", error);
@@ -67,11 +72,11 @@ export default function DashboardPage() {
         // Fetch user, resumes, and stats in parallel
         const [userData, resumesData, statsData] = await Promise.all([
           authApi.getCurrentUser(token),
-          resumeApi.list(token),
+          resumeApi.listAll(token, [...CARD_FIELDS]),
           resumeApi.getStats(token),
         ]);
         setUser(userData);
-        setResumes(resumesData.resumes);
+        setResumes(resumesData);
         setStats(statsData);
       } catch (error) {
         authStorage.removeToken();
@@ -97,6 +102,7 @@ export default function DashboardPage() {
     }
 
     setIsUploading(true);
+    setUploadError("");
     try {
       // Extract filename without extension for title
       const title = file.name.replace(/\.[^/.]+$/, "") || "Uploaded Resume";
@@ -104,14 +110,20 @@ export default function DashboardPage() {
       // Create resume entry
       const resume = await resumeApi.create(token, { title });
 
-      // Upload the file (this will trigger ATS analysis)
-      await resumeApi.uploadFile(token, resume.id, file);
+      // Upload the file (this queues ATS analysis as a background job)
+      const uploaded = await resumeApi.uploadFile(token, resume.id, file);
+      if (uploaded.analysis_job_id) {
+        const job = await jobApi.waitFor(token, uploaded.analysis_job_id);
+        if (job.status === "failed") {
+          setUploadError(job.error || "Resume analysis failed");
+        }
+      }
 
       // Refresh the data to show updated resume with ATS score
       await refreshData();
     } catch (error) {
       console.error("Upload failed:", error);
-      // You could add a toast notification here
+      setUploadError(error instanceof ApiError ? error.message : "Upload failed");
     } finally {
       setIsUploading(false);
     }
@@ -149,7 +161,11 @@ export default function DashboardPage() {
 
           {/* Primary Action Row */}
           <div className="grid grid-cols-1 lg:grid-cols-2 gap-6 h-64">
-            <CreateResumeCard onUpload={handleUpload} isUploading={isUploading} />
+            <CreateResumeCard
+              onUpload={handleUpload}
+              isUploading={isUploading}
+              error={uploadError}
+            />
             <ATScoreCard score={stats?.highest_ats_score ?? 0} />
           </div>
 
@@ -126,7 +126,9 @@ function normalizeImportedData(data: any): ResumeFormData {
         startDate: exp.startDate || exp.start_date || "",
         endDate: exp.endDate || exp.end_date || "",
         current: exp.current || exp.is_current || false,
-        description: exp.description || (Array.isArray(exp.bullet_points) ? exp.bullet_points.join("\n") : ""),
+        description: exp.description
+            || (Array.isArray(exp.highlights) ? exp.highlights.join("\n") : "")
+            || (Array.isArray(exp.bullet_points) ? exp.bullet_points.join("\n") : ""),
     })) : [];
 
     const rawEdu = data?.education || [];
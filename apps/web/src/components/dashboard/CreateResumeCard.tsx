@@ -8,9 +8,10 @@ import { Button } from "@/components/ui/button";
 interface CreateResumeCardProps {
     onUpload?: (file: File) => Promise<void>;
     isUploading?: boolean;
+    error?: string;
 }
 
-export function CreateResumeCard({ onUpload, isUploading }: CreateResumeCardProps) {
+export function CreateResumeCard({ onUpload, isUploading, error }: CreateResumeCardProps) {
     const fileInputRef = useRef<HTMLInputElement>(null);
     const [dragOver, setDragOver] = useState(false);
 
@@ -76,6 +77,12 @@ export function CreateResumeCard({ onUpload, isUploading }: CreateResumeCardProp
                 </div>
             </div>
 
+            {error && (
+                <div className="bg-red-500/10 border border-red-500/50 rounded-lg p-2 mb-2 text-xs text-red-400">
+                    {error}
+                </div>
+            )}
+
             {/* Action Buttons */}
             <div className="space-y-2">
                 <Link href="/templates" className="w-full block">
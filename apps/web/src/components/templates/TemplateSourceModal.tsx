@@ -6,6 +6,15 @@ import { Button } from "@/components/ui/button";
 import { resumeApi, Resume } from "@/lib/api";
 import { authStorage } from "@/lib/auth";
 
+const SOURCE_FIELDS = [
+    "title",
+    "file_path",
+    "ats_score",
+    "thumbnail_color",
+    "has_extracted_data",
+] as const;
+type SourceResume = Pick<Resume, (typeof SOURCE_FIELDS)[number] | "id">;
+
 interface TemplateSourceModalProps {
     isOpen: boolean;
     onClose: () => void;
@@ -23,7 +32,7 @@ export function TemplateSourceModal({
     onSelectBlank,
     onSelectResume,
 }: TemplateSourceModalProps) {
-    const [resumes, setResumes] = useState<Resume[]>([]);
+    const [resumes, setResumes] = useState<SourceResume[]>([]);
     const [isLoading, setIsLoading] = useState(true);
     const [selectedResumeId, setSelectedResumeId] = useState<number | null>(null);
     const [isProcessing, setIsProcessing] = useState(false);
@@ -39,9 +48,9 @@ export function TemplateSourceModal({
         try {
             const token = authStorage.getToken();
             if (token) {
-                const data = await resumeApi.list(token);
+                const data = await resumeApi.listAll(token, [...SOURCE_FIELDS]);
                 // Only show resumes that have been uploaded (have a file)
-                const uploadedResumes = data.resumes.filter((r) => r.file_path);
+                const uploadedResumes = data.filter((r) => r.file_path);
                 setResumes(uploadedResumes);
             }
         } catch (error) {
@@ -172,7 +181,7 @@ export function TemplateSourceModal({
                                             <p className="font-medium text-white">{resume.title}</p>
                                             <p className="text-xs text-gray-400">
                                                 {resume.ats_score > 0 && `ATS Score: ${resume.ats_score}% • `}
-                                                {resume.extracted_data_path ? "Data extracted" : "Pending extraction"}
+                                                {resume.has_extracted_data ? "Data extracted" : "Pending extraction"}
                                             </p>
                                         </div>
                                         {selectedResumeId === resume.id && (
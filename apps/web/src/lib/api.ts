@@ -32,16 +32,52 @@ export interface Resume {
   file_path: string | null;
   file_type: string | null;
   file_size: number | null;
+  file_version: string | null;
   extracted_data_path: string | null;
+  has_extracted_data: boolean;
   ats_score: number;
   thumbnail_color: string;
+  analysis_job_id: number | null;
+  analysis_status: JobStatus | null;
   created_at: string;
   updated_at: string;
 }
 
-export interface ResumeListResponse {
-  resumes: Resume[];
+// Background job types
+export type JobStatus = "queued" | "running" | "succeeded" | "failed";
+
+export interface Job {
+  id: number;
+  resume_id: number;
+  kind: string;
+  status: JobStatus;
+  stage: string;
+  progress: number;
+  attempts: number;
+  max_attempts: number;
+  error: string | null;
+  created_at: string;
+  updated_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+}
+
+export interface ResumeListResponse<T = Resume> {
+  resumes: T[];
   total: number;
+  next_cursor: string | null;
+}
+
+export interface ResumeListParams {
+  limit?: number;
+  cursor?: string;
+  // Only return these fields (id is always included)
+  fields?: (keyof Resume)[];
+}
+
+export interface SignedDownloadUrl {
+  url: string;
+  expires_at: string;
 }
 
 export interface DashboardStats {
@@ -142,6 +178,7 @@ export interface Project {
 export interface ExtractedResumeData {
   extraction_version: string;
   extracted_at: string;
+  partial?: boolean; // Reply was cut off; only complete fields were kept
   contact: ContactInfo;
   summary: string;
   work_experience: WorkExperience[];
@@ -196,6 +233,46 @@ function authHeaders(token: string): HeadersInit {
   return { Authorization: `Bearer ${token}` };
 }
 
+// Callbacks for Server-Sent Event streams of AI results
+export interface StreamHandlers<T> {
+  onDelta?: (text: string) => void;
+  onPartial?: (data: Partial<T>) => void;
+}
+
+// Read an SSE stream of delta/partial/result/error events, resolving with the result
+async function readEventStream<T>(response: Response, handlers: StreamHandlers<T> = {}): Promise<T> {
+  if (!response.ok || !response.body) {
+    return handleResponse<T>(response);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = "message";
+      let data = "";
+      for (const line of block.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      const payload = JSON.parse(data);
+      if (event === "delta") handlers.onDelta?.(payload.text);
+      else if (event === "partial") handlers.onPartial?.(payload.data);
+      else if (event === "result") return payload as T;
+      else if (event === "error") throw new ApiError(502, payload.error || "AI request failed");
+    }
+  }
+  throw new ApiError(502, "Stream ended without a result");
+}
+
 export const authApi = {
   async signup(data: SignupRequest): Promise<AuthResponse> {
     const response = await fetch(`${API_BASE_URL}/auth/signup`, {
@@ -223,14 +300,66 @@ export const authApi = {
   },
 };
 
+export const jobApi = {
+  async get(token: string, jobId: number): Promise<Job> {
+    const response = await fetch(`${API_BASE_URL}/jobs/${jobId}`, {
+      headers: authHeaders(token),
+    });
+    return handleResponse<Job>(response);
+  },
+
+  // Poll a job until it succeeds or fails, backing off between polls;
+  // throws an ApiError(408) once timeoutMs has passed without a result
+  async waitFor(
+    token: string,
+    jobId: number,
+    { timeoutMs = 5 * 60_000, intervalMs = 1000, maxIntervalMs = 10_000 } = {}
+  ): Promise<Job> {
+    const deadline = Date.now() + timeoutMs;
+    let delay = intervalMs;
+    for (;;) {
+      const job = await jobApi.get(token, jobId);
+      if (job.status === "succeeded" || job.status === "failed") {
+        return job;
+      }
+      const remaining = deadline - Date.now();
+      if (remaining <= 0) {
+        throw new ApiError(408, "Timed out waiting for the analysis to finish");
+      }
+      await new Promise((resolve) => setTimeout(resolve, Math.min(delay, remaining)));
+      delay = Math.min(delay * 2, maxIntervalMs);
+    }
+  },
+};
+
 export const resumeApi = {
-  async list(token: string): Promise<ResumeListResponse> {
-    const response = await fetch(`${API_BASE_URL}/resumes`, {
+  async list(token: string, params: ResumeListParams = {}): Promise<ResumeListResponse> {
+    const query = new URLSearchParams();
+    if (params.limit) query.set("limit", String(params.limit));
+    if (params.cursor) query.set("cursor", params.cursor);
+    if (params.fields) query.set("fields", params.fields.join(","));
+    const search = query.toString();
+    const response = await fetch(`${API_BASE_URL}/resumes${search ? `?${search}` : ""}`, {
       headers: authHeaders(token),
     });
     return handleResponse<ResumeListResponse>(response);
   },
 
+  // Follows next_cursor until every page is loaded
+  async listAll<K extends keyof Resume>(
+    token: string,
+    fields?: K[]
+  ): Promise<Pick<Resume, K | "id">[]> {
+    const resumes: Pick<Resume, K | "id">[] = [];
+    let cursor: string | undefined;
+    do {
+      const page = await resumeApi.list(token, { limit: 200, cursor, fields });
+      resumes.push(...page.resumes);
+      cursor = page.next_cursor ?? undefined;
+    } while (cursor);
+    return resumes;
+  },
+
   async getStats(token: string): Promise<DashboardStats> {
     const response = await fetch(`${API_BASE_URL}/resumes/stats`, {
       headers: authHeaders(token),
@@ -292,8 +421,19 @@ export const resumeApi = {
     return handleResponse<Resume>(response);
   },
 
-  getDownloadUrl(resumeId: number): string {
-    return `${API_BASE_URL}/resumes/${resumeId}/download`;
+  // With the resume's file_version the URL is immutable and cached for good
+  getDownloadUrl(resumeId: number, fileVersion?: string | null): string {
+    const url = `${API_BASE_URL}/resumes/${resumeId}/download`;
+    return fileVersion ? `${url}?v=${encodeURIComponent(fileVersion)}` : url;
+  },
+
+  // Short-lived URL that needs no Authorization header (e.g. for <iframe>, <a>)
+  async getSignedDownloadUrl(token: string, resumeId: number): Promise<SignedDownloadUrl> {
+    const response = await fetch(`${API_BASE_URL}/resumes/${resumeId}/download-url`, {
+      headers: authHeaders(token),
+    });
+    const signed = await handleResponse<SignedDownloadUrl>(response);
+    return { ...signed, url: new URL(signed.url, API_BASE_URL).toString() };
   },
 
   async getATSAnalysis(token: string, resumeId: number): Promise<ATSAnalysis> {
@@ -344,4 +484,44 @@ export const resumeApi = {
     });
     return handleResponse<FilledTemplateData>(response);
   },
+
+  async streamAISuggestions(
+    token: string,
+    resumeId: number,
+    handlers?: StreamHandlers<AISuggestionsResponse>
+  ): Promise<AISuggestionsResponse> {
+    const response = await fetch(`${API_BASE_URL}/resumes/${resumeId}/suggestions/stream`, {
+      headers: authHeaders(token),
+    });
+    return readEventStream<AISuggestionsResponse>(response, handlers);
+  },
+
+  async streamReextractData(
+    token: string,
+    resumeId: number,
+    handlers?: StreamHandlers<ExtractedResumeData>
+  ): Promise<ExtractedResumeData> {
+    const response = await fetch(`${API_BASE_URL}/resumes/${resumeId}/extracted/reextract/stream`, {
+      method: "POST",
+      headers: authHeaders(token),
+    });
+    return readEventStream<ExtractedResumeData>(response, handlers);
+  },
+
+  async streamFillTemplate(
+    token: string,
+    resumeId: number,
+    templateSchema: TemplateSchema,
+    handlers?: StreamHandlers<FilledTemplateData>
+  ): Promise<FilledTemplateData> {
+    const response = await fetch(`${API_BASE_URL}/resumes/${resumeId}/fill-template/stream`, {
+      method: "POST",
+      headers: {
+        ...authHeaders(token),
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify(templateSchema),
+    });
+    return readEventStream<FilledTemplateData>(response, handlers);
+  },
 };